@@ -0,0 +1,137 @@
+"""
+Агент: отдаёт компактные снимки метрик сервера по HTTP.
+
+Запускается на каждом сервере парка вместо отдельного бота::
+
+    python agent.py
+
+Адрес задаётся ``AGENT_LISTEN`` («host:port» или «unix:/путь»), доступ —
+токеном ``AGENT_TOKEN`` в заголовке ``Authorization: Bearer``. Бот с
+``AGENTS`` в .env опрашивает агентов и показывает их в /fleet.
+"""
+import asyncio
+import hmac
+import json
+import logging
+from typing import Optional, Tuple
+
+from aiohttp import web
+
+from config import AGENT_LISTEN, AGENT_TOKEN
+from utils.disks import busiest_devices
+from utils.hostfacts import install_sighup_handler
+from utils.processes import process_table
+from utils.prometheus import exporter
+from utils.sampler import Snapshot, sampler
+from utils.stats import stats_cache
+from utils.web import make_site
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Сколько интерфейсов и устройств отдавать (самые нагруженные)
+TOP_INTERFACES = 10
+TOP_DEVICES = 8
+
+
+def encode_snapshot(snapshot: Snapshot, disks: list, processes: list) -> bytes:
+    """Компактный JSON снимка: только то, что нужно для экранов бота."""
+    network = dict(snapshot.network)
+    network["interfaces"] = dict(
+        sorted(
+            network["interfaces"].items(),
+            key=lambda item: item[1]["bytes_sent"] + item[1]["bytes_recv"],
+            reverse=True,
+        )[:TOP_INTERFACES]
+    )
+    payload = {
+        "timestamp": snapshot.timestamp,
+        "cpu": snapshot.cpu,
+        "ram": snapshot.ram,
+        "swap": snapshot.swap,
+        "root_disk": snapshot.root_disk,
+        "disk_io": dict(busiest_devices(snapshot.disk_io, TOP_DEVICES)),
+        "network": network,
+        "system": snapshot.system,
+        "disks": disks,
+        "processes": processes,
+    }
+    return json.dumps(payload, default=dict, separators=(",", ":")).encode()
+
+
+class AgentServer:
+    """HTTP-сервер агента; ответ кодируется один раз на снимок."""
+
+    def __init__(self, token: str = AGENT_TOKEN):
+        self.token = token
+        self._cached: Optional[Tuple[tuple, bytes]] = None
+
+    def _authorized(self, request: web.Request) -> bool:
+        if not self.token:
+            return True
+        header = request.headers.get("Authorization", "")
+        return hmac.compare_digest(header, f"Bearer {self.token}")
+
+    async def _cached_value(self, name: str) -> list:
+        try:
+            return await stats_cache.get(name)
+        except asyncio.TimeoutError:
+            return stats_cache.peek(name) or []
+
+    async def handle_snapshot(self, request: web.Request) -> web.Response:
+        if not self._authorized(request):
+            raise web.HTTPUnauthorized()
+
+        snapshot = await sampler.wait_latest()
+        disks = await self._cached_value("disk")
+        processes = await self._cached_value("processes_memory")
+
+        # Те же объекты из кэшей — тот же ответ: повторно не кодируем
+        key = (snapshot.timestamp, id(disks), id(processes))
+        if self._cached is None or self._cached[0] != key:
+            self._cached = (key, encode_snapshot(snapshot, disks, processes))
+        return web.Response(body=self._cached[1], content_type="application/json")
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/snapshot", self.handle_snapshot)
+        app.router.add_get("/health", self.handle_health)
+        # Тот же снимок в формате Prometheus
+        app.router.add_get("/metrics", exporter.handle_metrics)
+        return app
+
+
+async def main():
+    """Основная функция запуска агента."""
+    server = AgentServer()
+    runner = web.AppRunner(server.app(), access_log=None)
+    await runner.setup()
+
+    install_sighup_handler()
+    sampler.start()
+    process_table.start()
+    # Диски для /metrics обновляются в фоне, как у бота
+    exporter.start_refresh()
+    try:
+        await make_site(runner, AGENT_LISTEN).start()
+        logger.info(f"🛰️ Агент слушает {AGENT_LISTEN}")
+        await asyncio.Event().wait()
+    finally:
+        await sampler.stop()
+        await process_table.stop()
+        await exporter.stop()
+        await runner.cleanup()
+        logger.info("👋 Агент остановлен")
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
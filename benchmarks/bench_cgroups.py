@@ -0,0 +1,62 @@
+"""
+Бенчмарк разбивки по cgroup v2 (utils.cgroups) на синтетическом /sys/fs/cgroup.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_cgroups [--units 500] [--repeat 20] [--output result.json]
+
+Каталог-фикстура повторяет /sys/fs/cgroup: ``--units`` сервисов,
+пользовательских slice и контейнеров с вложенными cgroup. Кроме времени
+прохода проверяется, что скорости посчитаны по разнице счётчиков.
+"""
+import argparse
+import shutil
+
+from benchmarks.fixtures import cgroup_path, build_cgroupfs, fixture_dir, write_cgroup_counters
+from benchmarks.report import emit, time_call
+from utils.cgroups import CgroupTable
+
+
+def run(units: int, repeat: int) -> dict:
+    root = fixture_dir(f"cgroup-{units}")
+    shutil.rmtree(root, ignore_errors=True)
+    build_cgroupfs(root, units)
+
+    table = CgroupTable(root=str(root), depth=2, rescan_interval=3600)
+    scan = time_call(table.scan, max(3, repeat // 4))
+
+    # Два прохода с разницей в секунду: скорости известны заранее
+    table.update(now=0.0)
+    write_cgroup_counters(root, units, tick=1)
+    table.update(now=1.0)
+    top = table.top(5, "cpu")
+    by_path = {row.path: row for row in table.rows}
+    deltas_ok = all(
+        by_path[cgroup_path(i)].cpu_percent == (i % 100) / 10 and by_path[cgroup_path(i)].io_read_bps == i * 1024
+        for i in range(units)
+    )
+
+    update = time_call(table.update, repeat)
+    return {
+        "benchmark": "cgroups",
+        "units": units,
+        "found": len(table.rows),
+        "repeat": repeat,
+        "scan": scan,
+        "update": update,
+        "per_unit_us": round(update["median_ms"] * 1000 / max(1, len(table.rows)), 1),
+        "deltas_ok": deltas_ok,
+        "top_cpu": [(row["name"], row["kind"], row["cpu_percent"]) for row in top],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--units", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="записать JSON в файл")
+    args = parser.parse_args()
+    emit(run(args.units, args.repeat), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Бенчмарк сборщиков utils.stats и форматтеров на синтетическом хосте.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_collectors [--processes 10000] [--mounts 500] [--nics 200]
+                                          [--repeat 20] [--output result.json]
+
+psutil подменяется синтетическим хостом (benchmarks.fixtures.SyntheticHost),
+поэтому результаты не зависят от машины, на которой идёт замер.
+"""
+import argparse
+
+from benchmarks.fixtures import SyntheticHost
+from benchmarks.report import emit, time_call
+from handlers import commands
+from utils import stats
+from utils.disks import mount_table
+from utils.history import HistoryStore
+from utils.processes import ProcessTable
+
+
+def run(processes: int, mounts: int, nics: int, repeat: int) -> dict:
+    host = SyntheticHost(processes=processes, mounts=mounts, nics=nics)
+    collectors = {}
+    formatters = {}
+
+    with host.patch():
+        mount_table.invalidate()
+        table = ProcessTable(fastpath=False)
+        table.update()
+
+        collectors["get_cpu_stats"] = time_call(lambda: stats.get_cpu_stats(interval=None), repeat)
+        collectors["get_ram_stats"] = time_call(stats.get_ram_stats, repeat)
+        collectors["get_swap_stats"] = time_call(stats.get_swap_stats, repeat)
+        collectors["get_disk_stats"] = time_call(stats.get_disk_stats, repeat)
+        collectors["get_disk_io_stats"] = time_call(stats.get_disk_io_stats, repeat)
+        collectors["get_network_stats"] = time_call(stats.get_network_stats, repeat)
+        collectors["get_system_info"] = time_call(stats.get_system_info, repeat)
+        collectors["process_table_update"] = time_call(table.update, max(3, repeat // 4))
+        collectors["process_table_top_memory"] = time_call(lambda: table.top(15, "memory"), repeat)
+        collectors["process_table_top_cpu_running"] = time_call(
+            lambda: table.top(15, "cpu", status="running"), repeat
+        )
+        for by in ("name", "exe", "tree"):
+            collectors[f"process_table_groups_{by}"] = time_call(lambda: table.groups(by, 15, "memory"), repeat)
+
+        cpu = stats.get_cpu_stats(interval=None)
+        ram = stats.get_ram_stats()
+        disks = stats.get_disk_stats()
+        disk_io = stats.get_disk_io_stats()
+        network = stats.get_network_stats()
+        system = stats.get_system_info()
+        top = table.top(15, "memory")
+
+    history = HistoryStore()
+    for second in range(3600):
+        history.add("cpu", 1_700_000_000 + second, second % 100)
+    _, buckets = history.query("cpu", 3600, now=1_700_000_000 + 3600)
+
+    formatters["format_general_status"] = time_call(lambda: commands.format_general_status(cpu, ram, system), repeat)
+    formatters["format_cpu_stats"] = time_call(lambda: commands.format_cpu_stats(cpu), repeat)
+    formatters["format_ram_stats"] = time_call(lambda: commands.format_ram_stats(ram), repeat)
+    formatters["format_disk_stats"] = time_call(lambda: commands.format_disk_stats(disks, disk_io), repeat)
+    formatters["format_network_stats"] = time_call(lambda: commands.format_network_stats(network), repeat)
+    formatters["format_system_info"] = time_call(lambda: commands.format_system_info(system), repeat)
+    formatters["format_running_processes"] = time_call(lambda: commands.format_running_processes(top), repeat)
+    formatters["format_history"] = time_call(lambda: commands.format_history("cpu", "1h", 1, buckets), repeat)
+
+    return {
+        "benchmark": "collectors",
+        "host": {"processes": processes, "mounts": mounts, "nics": nics, "devices": len(host.devices)},
+        "repeat": repeat,
+        "collectors": collectors,
+        "formatters": formatters,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", type=int, default=10_000)
+    parser.add_argument("--mounts", type=int, default=500)
+    parser.add_argument("--nics", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="записать JSON в файл")
+    args = parser.parse_args()
+    emit(run(args.processes, args.mounts, args.nics, args.repeat), args.output)
+
+
+if __name__ == "__main__":
+    main()
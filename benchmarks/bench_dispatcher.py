@@ -0,0 +1,236 @@
+"""
+Нагрузочный тест конвейера обработчиков через Dispatcher.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_dispatcher [--updates 5000] [--concurrency 200] [--chats 500]
+                                          [--api-latency 0.0] [--telegram-limits] [--webhook]
+                                          [--output result.json]
+
+Сообщения и нажатия кнопок подаются в ``Dispatcher.feed_update`` с
+поддельной сессией Bot API (запросы не уходят в сеть), psutil подменён
+синтетическим хостом. Задержка обработчика меряется от подачи обновления
+до завершения его отправок. По умолчанию лимиты очереди исходящих
+сообщений сняты, чтобы мерить сам конвейер; ``--telegram-limits``
+оставляет настройки из .env.
+
+С ``--webhook`` обновления отправляются JSON-запросами во встроенный
+webhook-сервер (utils.webhook) через unix-сокет — проверка всего пути
+от HTTP до отправки ответа. Задержка тогда — время ответа сервера, а
+пропускная способность считается до завершения всех обработчиков.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+import aiohttp
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import SendMessage
+from aiogram.types import CallbackQuery, Chat, Message, Update, User
+
+from benchmarks.fixtures import SyntheticHost
+from benchmarks.report import emit, percentile
+from config import ALLOWED_USERS
+from handlers.commands import router
+from utils.disks import mount_table
+from utils.outbound import outbound
+from utils.processes import process_table
+from utils.webhook import SECRET_HEADER, WebhookServer
+
+# (название, текст сообщения или None, callback_data или None)
+SCENARIOS = (
+    ("cmd_status", "/status", None),
+    ("btn_cpu", "🔥 CPU", None),
+    ("btn_disk", "💿 Диски", None),
+    ("btn_network", "🌐 Сеть", None),
+    ("cmd_processes", "/processes", None),
+    ("cmd_history", "/history cpu 1h", None),
+    ("cb_status_cpu", None, "status_cpu"),
+    ("cb_status_disk", None, "status_disk"),
+    ("cb_processes_cpu", None, "processes_cpu"),
+    ("cb_refresh", None, "refresh"),
+)
+
+
+class FakeSession(BaseSession):
+    """Сессия Bot API без сети: отвечает правдоподобными объектами."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.calls: Counter = Counter()
+        self._message_ids = itertools.count(1_000_000)
+
+    async def make_request(self, bot, method, timeout=None):
+        self.calls[type(method).__name__] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if isinstance(method, SendMessage):
+            return Message(
+                message_id=next(self._message_ids),
+                date=datetime.now(),
+                chat=Chat(id=method.chat_id, type="private"),
+                text=method.text,
+            )
+        return True
+
+    async def close(self):
+        pass
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+
+def build_updates(count: int, chats: int) -> list:
+    """Обновления по кругу сценариев, равномерно по ``chats`` чатам."""
+    user_id = ALLOWED_USERS[0] if ALLOWED_USERS else 42
+    user = User(id=user_id, is_bot=False, first_name="Bench")
+    updates = []
+    for i in range(count):
+        name, text, data = SCENARIOS[i % len(SCENARIOS)]
+        chat = Chat(id=100_000 + i % chats, type="private")
+        message = Message(message_id=i % chats + 1, date=datetime.now(), chat=chat, from_user=user, text=text or "📊")
+        if data is None:
+            update = Update(update_id=i, message=message)
+        else:
+            update = Update(
+                update_id=i,
+                callback_query=CallbackQuery(
+                    id=str(i), from_user=user, chat_instance="bench", data=data, message=message
+                ),
+            )
+        updates.append((name, update))
+    return updates
+
+
+async def run_async(updates: int, concurrency: int, chats: int, api_latency: float, telegram_limits: bool,
+                    webhook: bool = False) -> dict:
+    session = FakeSession(api_latency)
+    bot = Bot("123456:" + "A" * 35, session=session)
+    dp = Dispatcher()
+    dp.include_router(router)
+
+    if not telegram_limits:
+        outbound.global_rate = outbound.chat_rate = outbound.chat_burst = 1e9
+    outbound.attach(bot)
+
+    latencies = defaultdict(list)
+    errors: Counter = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def feed(name: str, update: Update) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await dp.feed_update(bot, update)
+            except Exception as e:  # noqa: BLE001 — считаем любые ошибки обработчиков
+                errors[f"{name}: {type(e).__name__}"] += 1
+            latencies[name].append(time.perf_counter() - started)
+
+    batch = build_updates(updates, chats)
+    if webhook:
+        elapsed = await run_webhook(dp, bot, batch, concurrency, latencies, errors)
+    else:
+        started = time.perf_counter()
+        await asyncio.gather(*(feed(name, update) for name, update in batch))
+        elapsed = time.perf_counter() - started
+
+    await outbound.stop()
+    await bot.session.close()
+
+    def summary(samples: list) -> dict:
+        return {
+            "count": len(samples),
+            "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+            "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+            "max_ms": round(max(samples) * 1000, 3),
+        }
+
+    every = [value for samples in latencies.values() for value in samples]
+    return {
+        "updates": updates,
+        "elapsed_s": round(elapsed, 3),
+        "updates_per_s": round(updates / elapsed, 1),
+        "latency": summary(every),
+        "by_scenario": {name: summary(samples) for name, samples in sorted(latencies.items())},
+        "api_calls": dict(session.calls),
+        "outbound": dict(outbound.stats),
+        "errors": dict(errors),
+    }
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot, batch: list, concurrency: int, latencies, errors) -> float:
+    """Отправить обновления POST-запросами в webhook-сервер и дождаться обработки."""
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "webhook.sock")
+        server = WebhookServer(dp, bot, secret="bench", concurrency=concurrency)
+        await server.start(listen=f"unix:{socket_path}", url="")
+        semaphore = asyncio.Semaphore(concurrency)
+        headers = {SECRET_HEADER: "bench", "Content-Type": "application/json"}
+
+        async with aiohttp.ClientSession(connector=aiohttp.UnixConnector(path=socket_path)) as http:
+            async def post(name: str, update: Update) -> None:
+                body = update.model_dump_json(by_alias=True, exclude_none=True)
+                async with semaphore:
+                    started = time.perf_counter()
+                    async with http.post(f"http://bot{server.path}", data=body, headers=headers) as response:
+                        if response.status != 200:
+                            errors[f"{name}: HTTP {response.status}"] += 1
+                    latencies[name].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(post(name, update) for name, update in batch))
+            # Остановка сервера дожидается всех начатых обработчиков
+            await server.stop()
+            elapsed = time.perf_counter() - started
+
+        errors.update({f"webhook: {key}": value for key, value in server.stats.items() if key != "received" and value})
+        return elapsed
+
+
+def run(updates: int, concurrency: int, chats: int, api_latency: float, telegram_limits: bool,
+        processes: int, mounts: int, nics: int, webhook: bool = False) -> dict:
+    host = SyntheticHost(processes=processes, mounts=mounts, nics=nics)
+    with host.patch():
+        mount_table.invalidate()
+        process_table.fastpath = False
+        process_table.update()
+        result = asyncio.run(run_async(updates, concurrency, chats, api_latency, telegram_limits, webhook))
+    return {
+        "benchmark": "dispatcher",
+        "host": {"processes": processes, "mounts": mounts, "nics": nics},
+        "concurrency": concurrency,
+        "chats": chats,
+        "api_latency_s": api_latency,
+        "telegram_limits": telegram_limits,
+        "transport": "webhook" if webhook else "feed_update",
+        **result,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--chats", type=int, default=500)
+    parser.add_argument("--api-latency", type=float, default=0.0, help="задержка ответа Bot API, с")
+    parser.add_argument("--telegram-limits", action="store_true", help="не снимать лимиты очереди отправки")
+    parser.add_argument("--webhook", action="store_true", help="подавать обновления через webhook-сервер")
+    parser.add_argument("--processes", type=int, default=10_000)
+    parser.add_argument("--mounts", type=int, default=500)
+    parser.add_argument("--nics", type=int, default=200)
+    parser.add_argument("--output", help="записать JSON в файл")
+    args = parser.parse_args()
+    emit(run(
+        args.updates, args.concurrency, args.chats, args.api_latency, args.telegram_limits,
+        args.processes, args.mounts, args.nics, args.webhook,
+    ), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Бенчмарк опроса парка: локальные агенты на 127.0.0.1 и ``utils.fleet``.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_fleet [--agents 20] [--repeat 10] [--output result.json]
+
+Запускает ``--agents`` процессов ``agent.py`` на свободных портах
+127.0.0.1 с общим токеном, дожидается их /health и опрашивает всех через
+``Fleet.poll``, как это делает бот. Перед опросом проверяет, что /metrics каждого
+агента сам отдаёт данные по файловым системам.
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+from benchmarks.report import emit, percentile
+from utils.fleet import Fleet, Host
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn_agents(count: int, token: str) -> list:
+    """Запустить агентов; вернуть пары (процесс, адрес)."""
+    agents = []
+    for _ in range(count):
+        address = f"127.0.0.1:{_free_port()}"
+        env = dict(os.environ, AGENT_LISTEN=address, AGENT_TOKEN=token)
+        process = subprocess.Popen(
+            [sys.executable, str(ROOT / "agent.py")], cwd=ROOT, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        agents.append((process, address))
+    return agents
+
+
+async def wait_ready(session: aiohttp.ClientSession, addresses: list, timeout: float = 30) -> None:
+    """Дождаться /health у всех агентов."""
+    deadline = time.monotonic() + timeout
+    pending = set(addresses)
+    while pending:
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"агенты не поднялись: {sorted(pending)}")
+        for address in list(pending):
+            try:
+                async with session.get(f"http://{address}/health") as response:
+                    if response.status == 200:
+                        pending.discard(address)
+            except aiohttp.ClientError:
+                pass
+        await asyncio.sleep(0.1)
+
+
+async def metrics_with_disks(session: aiohttp.ClientSession, addresses: list, token: str) -> int:
+    """Сколько агентов отдают в /metrics размеры файловых систем."""
+    headers = {"Authorization": f"Bearer {token}"}
+    ok = 0
+    for address in addresses:
+        for _ in range(50):
+            async with session.get(f"http://{address}/metrics", headers=headers) as response:
+                body = await response.text() if response.status == 200 else ""
+            if "server_stat_filesystem_size_bytes" in body:
+                ok += 1
+                break
+            await asyncio.sleep(0.1)
+    return ok
+
+
+async def run_async(count: int, repeat: int) -> dict:
+    token = secrets.token_hex(16)
+    started = time.perf_counter()
+    agents = spawn_agents(count, token)
+    addresses = [address for _, address in agents]
+    try:
+        async with aiohttp.ClientSession() as session:
+            await wait_ready(session, addresses)
+            startup = time.perf_counter() - started
+            # До опроса /snapshot: диски в /metrics должны обновляться сами
+            metrics_ok = await metrics_with_disks(session, addresses, token)
+
+            fleet = Fleet(
+                [Host(f"agent{i}", f"http://{address}") for i, address in enumerate(addresses)],
+                timeout=5, token=token,
+            )
+            await fleet.poll()  # прогрев: первый снимок и соединения
+            samples = []
+            for _ in range(repeat):
+                poll_started = time.perf_counter()
+                await fleet.poll()
+                samples.append(time.perf_counter() - poll_started)
+            latencies = [host.latency for host in fleet.hosts]
+            responding = sum(1 for host in fleet.hosts if host.error is None and host.data is not None)
+            with_disks = sum(1 for host in fleet.hosts if host.data and host.data.get("disks"))
+            await fleet.stop()
+    finally:
+        for process, _ in agents:
+            process.terminate()
+        for process, _ in agents:
+            process.wait()
+
+    return {
+        "benchmark": "fleet",
+        "agents": count,
+        "repeat": repeat,
+        "startup_s": round(startup, 2),
+        "poll": {
+            "min_ms": round(min(samples) * 1000, 2),
+            "median_ms": round(percentile(samples, 0.5) * 1000, 2),
+            "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+        },
+        "host_latency_p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "responding": responding,
+        "snapshots_with_disks": with_disks,
+        "metrics_with_disks": metrics_ok,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="записать JSON в файл")
+    args = parser.parse_args()
+    emit(asyncio.run(run_async(args.agents, args.repeat)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Бенчмарк обхода процессов: /proc напрямую против psutil.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_procfs [--processes 10000] [--repeat 5]
+
+Результат печатается в JSON: время одного обхода и пересчёт на 10k процессов.
+"""
+import argparse
+import shutil
+import time
+
+import psutil
+
+from benchmarks.fixtures import build_procfs, fixture_dir
+from benchmarks.report import emit
+from utils.processes import ProcessTable
+
+
+def _time_updates(table: ProcessTable, repeat: int) -> float:
+    # Первый проход заполняет таблицу, дальше меряем установившийся режим
+    table.update()
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        table.update()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(processes: int, repeat: int) -> dict:
+    root = fixture_dir(f"proc-{processes}")
+    if not (root / str(1000 + processes - 1)).exists():
+        shutil.rmtree(root, ignore_errors=True)
+        build_procfs(root, processes)
+
+    procfs_seconds = _time_updates(ProcessTable(fastpath=True, procfs_root=str(root)), repeat)
+
+    saved_path = psutil.PROCFS_PATH
+    psutil.PROCFS_PATH = str(root)
+    try:
+        psutil_seconds = _time_updates(ProcessTable(fastpath=False), repeat)
+    finally:
+        psutil.PROCFS_PATH = saved_path
+
+    per_10k = 10_000 / processes
+    return {
+        "benchmark": "process_scan",
+        "processes": processes,
+        "repeat": repeat,
+        "procfs_ms": round(procfs_seconds * 1000, 2),
+        "psutil_ms": round(psutil_seconds * 1000, 2),
+        "procfs_ms_per_10k": round(procfs_seconds * 1000 * per_10k, 2),
+        "psutil_ms_per_10k": round(psutil_seconds * 1000 * per_10k, 2),
+        "speedup": round(psutil_seconds / procfs_seconds, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="записать JSON в файл")
+    args = parser.parse_args()
+    emit(run(args.processes, args.repeat), args.output)
+
+
+if __name__ == "__main__":
+    main()
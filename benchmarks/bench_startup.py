@@ -0,0 +1,106 @@
+"""
+Время запуска: импорт модулей бота и агента (``python -X importtime``).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_startup [--module main --module agent] [--repeat 5]
+                                       [--max-ms 0] [--max-own-ms 0] [--output result.json]
+
+Каждый замер — отдельный интерпретатор, так что кэш модулей не мешает.
+Отдельно считается собственное время модулей проекта (без aiogram,
+aiohttp и прочих зависимостей). С ``--max-ms`` / ``--max-own-ms``
+бенчмарк завершается с ненулевым кодом, если медиана превышает порог, —
+его можно запускать в CI как проверку на регрессию.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.report import emit
+
+ROOT = Path(__file__).resolve().parent.parent
+# Пакеты и модули проекта (верхний уровень имени модуля)
+OWN_PACKAGES = {"config", "main", "agent", "handlers", "keyboards", "middlewares", "utils"}
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """Строки ``-X importtime``: (модуль, глубина, собственное, суммарное время, мкс)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module: str) -> List[Tuple[str, int, int, int]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} завершился с ошибкой:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def run(modules: List[str], repeat: int, top: int) -> dict:
+    results: Dict[str, dict] = {}
+    for module in modules:
+        totals, own_totals = [], []
+        self_time: Dict[str, List[int]] = defaultdict(list)
+        for _ in range(repeat):
+            rows = measure(module)
+            # Суммарное время корневого модуля покрывает всё его дерево импортов
+            totals.append(next(cumulative for name, depth, _, cumulative in rows if name == module and depth == 0))
+            own_totals.append(sum(
+                self_us for name, _, self_us, _ in rows if name.split(".")[0] in OWN_PACKAGES
+            ))
+            for name, _, self_us, _ in rows:
+                self_time[name].append(self_us)
+
+        slowest = sorted(self_time.items(), key=lambda item: statistics.median(item[1]), reverse=True)[:top]
+        own = sorted(
+            ((name, samples) for name, samples in self_time.items() if name.split(".")[0] in OWN_PACKAGES),
+            key=lambda item: statistics.median(item[1]), reverse=True,
+        )[:top]
+        results[module] = {
+            "import_ms": round(statistics.median(totals) / 1000, 1),
+            "own_ms": round(statistics.median(own_totals) / 1000, 1),
+            "modules": len(self_time),
+            "slowest_self_ms": {name: round(statistics.median(s) / 1000, 2) for name, s in slowest},
+            "own_self_ms": {name: round(statistics.median(s) / 1000, 2) for name, s in own},
+        }
+    return {"benchmark": "startup", "repeat": repeat, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", action="append", help="модуль для импорта (можно несколько)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="сколько самых медленных модулей показать")
+    parser.add_argument("--max-ms", type=float, default=0, help="порог полного импорта, мс (0 — без проверки)")
+    parser.add_argument("--max-own-ms", type=float, default=0, help="порог модулей проекта, мс (0 — без проверки)")
+    parser.add_argument("--output", help="записать JSON в файл")
+    args = parser.parse_args()
+
+    result = run(args.module or ["main", "agent"], args.repeat, args.top)
+    emit(result, args.output)
+
+    failed = [
+        f"{module}: {key} {values[key]} мс > {limit} мс"
+        for module, values in result["results"].items()
+        for key, limit in (("import_ms", args.max_ms), ("own_ms", args.max_own_ms))
+        if limit and values[key] > limit
+    ]
+    if failed:
+        print("Время запуска превысило порог:\n" + "\n".join(failed), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
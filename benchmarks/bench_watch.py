@@ -0,0 +1,58 @@
+"""
+Бенчмарк опроса наблюдаемых процессов (utils.watch) за один шаг сборщика.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_watch [--pids 50] [--repeat 20] [--output result.json]
+
+Запускает ``--pids`` дочерних процессов и замеряет ``ProcessWatcher.sample``
+на настоящем psutil: USS и ввод-вывод читаются из /proc, подменить их
+синтетическим хостом нельзя.
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+
+from benchmarks.report import emit, time_call
+from utils.watch import ProcessWatcher
+
+
+def run(pids: int, repeat: int) -> dict:
+    children = [
+        subprocess.Popen([sys.executable, "-c", "import time; time.sleep(600)"])
+        for _ in range(pids)
+    ]
+    try:
+        watcher = ProcessWatcher(limit=pids)
+
+        async def watch_all():
+            for child in children:
+                await watcher.add(child.pid)
+
+        asyncio.run(watch_all())
+        tick = time_call(watcher.sample, repeat)
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+
+    return {
+        "benchmark": "watch",
+        "pids": pids,
+        "repeat": repeat,
+        "tick": tick,
+        "per_pid_us": round(tick["median_ms"] * 1000 / max(1, pids), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pids", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="записать JSON в файл")
+    args = parser.parse_args()
+    emit(run(args.pids, args.repeat), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Синтетические данные для бенчмарков.
+"""
+import contextlib
+import os
+import socket
+import time
+from collections import namedtuple
+from pathlib import Path
+from unittest import mock
+
+import psutil
+
+from utils.hostfacts import host_facts
+
+_COMMS = ("php-fpm", "chrome", "postgres", "nginx", "python3", "java", "node", "sshd")
+
+
+def _parent(index: int) -> int:
+    """Первый процесс каждого имени — мастер, остальные — его рабочие."""
+    return 1 if index < len(_COMMS) else 1000 + index % len(_COMMS)
+
+
+def build_procfs(root: Path, processes: int = 10_000) -> Path:
+    """Создать каталог, повторяющий /proc с ``processes`` процессами.
+
+    Файлов хватает и для ``utils.procfs.scan_proc``, и для psutil
+    (через ``psutil.PROCFS_PATH``).
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "self").mkdir(exist_ok=True)
+    (root / "self" / "stat").write_text("1 (self) S 0\n")
+    (root / "stat").write_text(
+        "cpu  100 0 100 1000 0 0 0 0 0 0\n"
+        "cpu0 100 0 100 1000 0 0 0 0 0 0\n"
+        "btime 1700000000\n"
+    )
+    (root / "meminfo").write_text(
+        "MemTotal:       16384000 kB\n"
+        "MemFree:         8192000 kB\n"
+        "MemAvailable:   12288000 kB\n"
+        "Buffers:          102400 kB\n"
+        "Cached:          2048000 kB\n"
+        "Shmem:             10240 kB\n"
+        "Active:          4096000 kB\n"
+        "Inactive:        2048000 kB\n"
+        "SReclaimable:     204800 kB\n"
+    )
+    (root / "uptime").write_text("100000.00 90000.00\n")
+
+    for i in range(processes):
+        pid = 1000 + i
+        comm = _COMMS[i % len(_COMMS)]
+        state = "R" if i % 50 == 0 else "S"
+        utime, stime, rss = i * 3, i, 1000 + i % 5000
+        # 52 поля, как в современных ядрах
+        fields = [str(pid), f"({comm})", state, str(_parent(i)), str(pid), str(pid), "0", "-1", "4194560",
+                  "100", "0", "0", "0", str(utime), str(stime), "0", "0", "20", "0", "1", "0",
+                  "500", str(rss * 4096 * 4), str(rss)] + ["0"] * 28
+        proc_dir = root / str(pid)
+        proc_dir.mkdir(exist_ok=True)
+        (proc_dir / "stat").write_text(" ".join(fields) + "\n")
+        (proc_dir / "statm").write_text(f"{rss * 4} {rss} 100 10 0 {rss} 0\n")
+        (proc_dir / "cmdline").write_bytes(comm.encode() + b"\0")
+        if not (proc_dir / "exe").is_symlink():
+            (proc_dir / "exe").symlink_to(f"/usr/bin/{comm}")
+        (proc_dir / "status").write_text(f"Name:\t{comm}\nState:\t{state}\nUid:\t0\t0\t0\t0\n")
+    return root
+
+
+def write_cgroup_counters(root: Path, units: int = 200, tick: int = 1) -> None:
+    """Записать счётчики cgroup так, будто прошло ``tick`` шагов.
+
+    На каждом шаге cgroup номер ``i`` тратит ``i % 100`` мс CPU и читает
+    ``i`` КБ — по этим числам удобно проверять посчитанные скорости.
+    """
+    root = Path(root)
+    for i in range(units):
+        unit = root / cgroup_path(i)
+        (unit / "cpu.stat").write_text(
+            f"usage_usec {tick * (i % 100) * 1000}\nuser_usec 0\nsystem_usec 0\n"
+            "nr_periods 0\nnr_throttled 0\nthrottled_usec 0\n"
+        )
+        (unit / "memory.current").write_text(f"{(i + 1) * 1024 * 1024}\n")
+        (unit / "memory.stat").write_text(
+            f"anon {(i + 1) * 786432}\nfile {(i + 1) * 262144}\nkernel 0\nsock 0\nshmem 0\n"
+        )
+        (unit / "io.stat").write_text(
+            f"8:0 rbytes={tick * i * 1024} wbytes={tick * i * 512} rios=0 wios=0 dbytes=0 dios=0\n"
+            f"8:16 rbytes=0 wbytes=0 rios=0 wios=0 dbytes=0 dios=0\n"
+        )
+
+
+def cgroup_path(i: int) -> str:
+    if i % 4 == 0:
+        return f"system.slice/docker-{i * 2654435761 % 16**12:012x}{'0' * 52}.scope"
+    if i % 4 == 1:
+        return f"user.slice/user-{1000 + i}.slice"
+    return f"system.slice/{_COMMS[i % len(_COMMS)]}-{i}.service"
+
+
+def build_cgroupfs(root: Path, units: int = 200) -> Path:
+    """Создать каталог, повторяющий /sys/fs/cgroup (cgroup v2) с ``units`` листьями.
+
+    Внутри листьев — вложенные cgroup (как у systemd и контейнеров), чтобы
+    проверить, что обход обрезается на заданной глубине.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "cgroup.controllers").write_text("cpuset cpu io memory pids\n")
+    (root / "init.scope").mkdir(exist_ok=True)
+    (root / "init.scope" / "cpu.stat").write_text("usage_usec 0\n")
+    for i in range(units):
+        unit = root / cgroup_path(i)
+        (unit / "nested" / "deeper").mkdir(parents=True, exist_ok=True)
+    write_cgroup_counters(root, units, tick=0)
+    return root
+
+
+def fixture_dir(name: str) -> Path:
+    """Каталог для фикстур во временной директории."""
+    base = Path(os.environ.get("TMPDIR", "/tmp")) / "server-monitor-bench"
+    return base / name
+
+
+# Те же поля, что у структур psutil
+_Partition = namedtuple("sdiskpart", "device mountpoint fstype opts")
+_Usage = namedtuple("sdiskusage", "total used free percent")
+_NetIO = namedtuple("snetio", "bytes_sent bytes_recv packets_sent packets_recv errin errout dropin dropout")
+_DiskIO = namedtuple("sdiskio", "read_count write_count read_bytes write_bytes read_time write_time")
+_Addr = namedtuple("snicaddr", "family address netmask broadcast ptp")
+_Freq = namedtuple("scpufreq", "current min max")
+_Memory = namedtuple("svmem", "total available percent used free")
+_Swap = namedtuple("sswap", "total used free percent sin sout")
+_MemInfo = namedtuple("pmem", "rss vms")
+
+GB = 1024**3
+
+
+class _FakeProcess:
+    """Процесс синтетического хоста с интерфейсом psutil.Process."""
+
+    def __init__(self, pid: int, host: "SyntheticHost"):
+        if pid not in host.pid_set:
+            raise psutil.NoSuchProcess(pid)
+        self.pid = pid
+        self._index = pid - 1000
+        self._host = host
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+    def create_time(self) -> float:
+        return 1_700_000_000.0 + self._index
+
+    def cpu_percent(self, interval=None) -> float:
+        return (self._index * 7 + self._host.tick) % 400 / 10
+
+    def memory_info(self):
+        rss = (1000 + self._index % 5000) * 4096 * 16
+        return _MemInfo(rss, rss * 2)
+
+    def name(self) -> str:
+        return _COMMS[self._index % len(_COMMS)]
+
+    def ppid(self) -> int:
+        return _parent(self._index)
+
+    def exe(self) -> str:
+        return f"/usr/bin/{self.name()}"
+
+    def status(self) -> str:
+        return psutil.STATUS_RUNNING if self._index % 50 == 0 else psutil.STATUS_SLEEPING
+
+
+class SyntheticHost:
+    """Хост с заданным числом процессов, точек монтирования и интерфейсов.
+
+    ``patch()`` подменяет функции psutil, которыми пользуются сборщики;
+    счётчики растут с каждым вызовом, чтобы скорости были ненулевыми.
+    """
+
+    def __init__(self, processes: int = 10_000, mounts: int = 500, nics: int = 200, devices: int = 32):
+        self.processes = processes
+        self.pids = list(range(1000, 1000 + processes))
+        self.pid_set = frozenset(self.pids)
+        self.partitions = [_Partition("/dev/vda1", "/", "ext4", "rw")] + [
+            _Partition(f"/dev/sd{i}", f"/srv/volume{i}", "xfs", "rw") for i in range(1, mounts)
+        ]
+        self.nics = ["eth0"] + [f"veth{i:04x}" if i % 2 else f"ens{i}" for i in range(1, nics)]
+        self.devices = ["vda"] + [f"sd{i}" for i in range(1, devices)]
+        self.tick = 0
+
+    def _advance(self) -> int:
+        self.tick += 1
+        return self.tick
+
+    def disk_usage(self, path: str):
+        used = (hash(path) % 90 + 5) * GB
+        return _Usage(100 * GB, used, 100 * GB - used, used / GB)
+
+    def net_io_counters(self, pernic: bool = False):
+        tick = self._advance()
+        counters = {
+            name: _NetIO(tick * 1000 * (i + 1), tick * 2000 * (i + 1), tick * (i + 1), tick * 2 * (i + 1), 0, 0, 0, 0)
+            for i, name in enumerate(self.nics)
+        }
+        if pernic:
+            return counters
+        return _NetIO(*(sum(column) for column in zip(*counters.values())))
+
+    def net_if_addrs(self):
+        return {
+            name: [_Addr(socket.AF_INET, f"10.{i // 256}.{i % 256}.1", "255.255.255.0", None, None)]
+            for i, name in enumerate(self.nics)
+        }
+
+    def disk_io_counters(self, perdisk: bool = False):
+        tick = self._advance()
+        counters = {
+            name: _DiskIO(tick * 10, tick * 20, tick * 40960, tick * 81920, tick * 5, tick * 9)
+            for name in self.devices
+        }
+        if perdisk:
+            return counters
+        return _DiskIO(*(sum(column) for column in zip(*counters.values())))
+
+    def patch(self) -> contextlib.ExitStack:
+        """Подменить psutil на время блока ``with``."""
+        replacements = {
+            "cpu_percent": lambda interval=None, percpu=False: 37.5,
+            "cpu_freq": lambda percpu=False: _Freq(2400.0, 800.0, 3600.0),
+            "cpu_count": lambda logical=True: 64 if logical else 32,
+            "virtual_memory": lambda: _Memory(256 * GB, 128 * GB, 50.0, 120 * GB, 100 * GB),
+            "swap_memory": lambda: _Swap(8 * GB, 1 * GB, 7 * GB, 12.5, 0, 0),
+            "disk_partitions": lambda all=False: list(self.partitions),
+            "disk_usage": self.disk_usage,
+            "disk_io_counters": self.disk_io_counters,
+            "net_io_counters": self.net_io_counters,
+            "net_if_addrs": self.net_if_addrs,
+            "boot_time": lambda: time.time() - 86_400 * 42,
+            "sensors_temperatures": lambda: {},
+            "pids": lambda: list(self.pids),
+            "Process": lambda pid: _FakeProcess(pid, self),
+        }
+        stack = contextlib.ExitStack()
+        for name, replacement in replacements.items():
+            stack.enter_context(mock.patch.object(psutil, name, replacement))
+        # Сведения о сервере кэшируются: перечитываем их у подменённого psutil
+        host_facts.invalidate()
+        stack.callback(host_facts.invalidate)
+        return stack
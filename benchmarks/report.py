@@ -0,0 +1,51 @@
+"""
+Общие помощники бенчмарков: замер времени и вывод результата в JSON.
+"""
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional, Sequence
+
+
+def time_call(func: Callable, repeat: int = 20, warmup: int = 1) -> dict:
+    """Время вызова ``func()``: минимум и медиана в миллисекундах."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return {
+        "min_ms": round(min(samples) * 1000, 4),
+        "median_ms": round(statistics.median(samples) * 1000, 4),
+    }
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Перцентиль по отсортированной выборке (ближайший ранг)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def emit(result: dict, output: Optional[str] = None) -> None:
+    """Напечатать результат (и записать в файл) с описанием окружения."""
+    result = {
+        "meta": {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        **result,
+    }
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    print(text)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
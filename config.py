@@ -5,19 +5,147 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+# Файл с переменными окружения (перечитывается ботом при изменении)
+ENV_FILE = Path(os.getenv("ENV_FILE", Path(__file__).resolve().parent / ".env"))
+
 # Загрузка переменных окружения
-load_dotenv()
+load_dotenv(ENV_FILE)
+
+
+def parse_user_ids(raw: str) -> list:
+    """Список Telegram ID из строки «id1,id2»."""
+    return [int(user_id.strip()) for user_id in raw.split(",") if user_id.strip().isdigit()]
+
 
 # Токен бота
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 
+# Получение обновлений: polling (long polling) или webhook
+BOT_MODE = os.getenv("BOT_MODE", "polling").strip().lower()
+
+# Webhook: внешний адрес (https://host), путь, локальный адрес сервера
+# («host:port» или «unix:/путь»), секрет, число одновременно обрабатываемых
+# обновлений и сколько ждать начатые при остановке (секунды)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "127.0.0.1:8080")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY", "32"))
+WEBHOOK_DRAIN_TIMEOUT = float(os.getenv("WEBHOOK_DRAIN_TIMEOUT", "8"))
+
 # Разрешённые пользователи (список ID)
 ALLOWED_USERS_RAW = os.getenv("ALLOWED_USERS", "")
-ALLOWED_USERS = [
-    int(user_id.strip())
-    for user_id in ALLOWED_USERS_RAW.split(",")
-    if user_id.strip().isdigit()
-]
+ALLOWED_USERS = parse_user_ids(ALLOWED_USERS_RAW)
 
 # Пути проекта
 BASE_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(os.getenv("DATA_DIR", Path(__file__).resolve().parent / "data"))
+
+# Интервал фонового сбора метрик (секунды)
+SAMPLER_INTERVAL = float(os.getenv("SAMPLER_INTERVAL", "1"))
+
+# Пул потоков для сборщиков и таймауты (секунды)
+COLLECTOR_WORKERS = int(os.getenv("COLLECTOR_WORKERS", "4"))
+COLLECTOR_TIMEOUT = float(os.getenv("COLLECTOR_TIMEOUT", "10"))
+MOUNT_WORKERS = int(os.getenv("MOUNT_WORKERS", "4"))
+MOUNT_TIMEOUT = float(os.getenv("MOUNT_TIMEOUT", "2"))
+
+# Точка монтирования пропускается после MOUNT_FAILURES таймаутов подряд
+MOUNT_FAILURES = int(os.getenv("MOUNT_FAILURES", "3"))
+MOUNT_COOLDOWN = float(os.getenv("MOUNT_COOLDOWN", "300"))
+
+# Ступени истории метрик: (шаг в секундах, число корзин).
+# По умолчанию: 1 с за час, 1 мин за сутки, 1 ч за 30 дней.
+HISTORY_TIERS = tuple(
+    (int(step), int(size))
+    for step, size in (
+        tier.split(":") for tier in os.getenv("HISTORY_TIERS", "1:3600,60:1440,3600:720").split(",")
+    )
+)
+
+# Постоянное хранилище метрик (кольцевой файл, отображённый в память)
+METRICS_STORE_PATH = Path(os.getenv("METRICS_STORE_PATH", DATA_DIR / "metrics.bin"))
+STORE_INTERVAL = float(os.getenv("STORE_INTERVAL", "10"))
+STORE_RETENTION_DAYS = float(os.getenv("STORE_RETENTION_DAYS", "30"))
+STORE_FLUSH_INTERVAL = float(os.getenv("STORE_FLUSH_INTERVAL", "5"))
+
+# Выгрузка /export: записей хранилища в одной порции сжатия
+EXPORT_CHUNK = int(os.getenv("EXPORT_CHUNK", "4096"))
+
+# Интервал обхода таблицы процессов (секунды)
+PROCESS_SCAN_INTERVAL = float(os.getenv("PROCESS_SCAN_INTERVAL", "5"))
+
+# Быстрый обход процессов через /proc: auto (на Linux), 1 — включить, 0 — выключить
+PROC_FASTPATH = os.getenv("PROC_FASTPATH", "auto").strip().lower()
+
+# Фильтр сетевых интерфейсов (glob-шаблоны через запятую; пустой include — все)
+NET_INCLUDE = [p.strip() for p in os.getenv("NET_INCLUDE", "").split(",") if p.strip()]
+NET_EXCLUDE = [p.strip() for p in os.getenv("NET_EXCLUDE", "lo,veth*,docker*").split(",") if p.strip()]
+
+# Диски: исключаемые типы ФС и устройства (glob), шаг перечитывания точек
+# монтирования там, где нет уведомлений об изменениях
+DISK_FSTYPES_EXCLUDE = [p.strip() for p in os.getenv(
+    "DISK_FSTYPES_EXCLUDE", "overlay,tmpfs,devtmpfs,squashfs,nsfs,proc,sysfs,cgroup,cgroup2"
+).split(",") if p.strip()]
+DISK_DEVICES_EXCLUDE = [p.strip() for p in os.getenv("DISK_DEVICES_EXCLUDE", "loop*,ram*").split(",") if p.strip()]
+MOUNT_TABLE_TTL = float(os.getenv("MOUNT_TABLE_TTL", "60"))
+
+# Алерты: правила через «;», пауза между уведомлениями (с), гистерезис (доля порога)
+ALERT_RULES = os.getenv("ALERT_RULES", "")
+ALERT_COOLDOWN = float(os.getenv("ALERT_COOLDOWN", "600"))
+ALERT_HYSTERESIS = float(os.getenv("ALERT_HYSTERESIS", "0.05"))
+
+# Исходящие сообщения: общий темп (сообщений/с), темп и запас на один чат
+OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "25"))
+OUTBOUND_CHAT_RATE = float(os.getenv("OUTBOUND_CHAT_RATE", "1"))
+OUTBOUND_CHAT_BURST = float(os.getenv("OUTBOUND_CHAT_BURST", "3"))
+
+# Live-панель: шаг обновления и остановка без действий пользователя (секунды)
+LIVE_INTERVAL = float(os.getenv("LIVE_INTERVAL", "5"))
+LIVE_IDLE_TIMEOUT = float(os.getenv("LIVE_IDLE_TIMEOUT", "900"))
+
+# Агент (python agent.py): адрес «host:port» или «unix:/путь», токен доступа
+AGENT_LISTEN = os.getenv("AGENT_LISTEN", "127.0.0.1:9101")
+AGENT_TOKEN = os.getenv("AGENT_TOKEN", "")
+
+# Парк серверов: агенты «имя=http://host:port» или «имя=unix:/путь» через запятую,
+# шаг опроса, таймаут запроса и число одновременных запросов
+AGENTS = [a.strip() for a in os.getenv("AGENTS", "").split(",") if a.strip()]
+FLEET_INTERVAL = float(os.getenv("FLEET_INTERVAL", "10"))
+FLEET_TIMEOUT = float(os.getenv("FLEET_TIMEOUT", "3"))
+FLEET_CONCURRENCY = int(os.getenv("FLEET_CONCURRENCY", "64"))
+
+# Экспорт метрик для Prometheus: адрес «host:port» или «unix:/путь» (пусто — выключен)
+METRICS_LISTEN = os.getenv("METRICS_LISTEN", "")
+
+# Встроенные замеры производительности (/perf): включение, шаг проверки
+# задержки event loop и порог, после которого вызов считается блокирующим (с)
+PERF_ENABLED = os.getenv("PERF_ENABLED", "0").strip().lower() in ("1", "true", "yes")
+PERF_LAG_INTERVAL = float(os.getenv("PERF_LAG_INTERVAL", "0.05"))
+PERF_LAG_THRESHOLD = float(os.getenv("PERF_LAG_THRESHOLD", "0.1"))
+
+# Администраторы (служебные команды вроде /perf); пусто — все из ALLOWED_USERS
+ADMIN_USERS = parse_user_ids(os.getenv("ADMIN_USERS", ""))
+
+# Как часто проверять изменение .env (списки пользователей применяются без перезапуска)
+ACCESS_RELOAD_INTERVAL = float(os.getenv("ACCESS_RELOAD_INTERVAL", "2"))
+
+# Защита от флуда: запросов в секунду от одного пользователя и допустимый всплеск
+USER_RATE_LIMIT = float(os.getenv("USER_RATE_LIMIT", "1"))
+USER_RATE_BURST = float(os.getenv("USER_RATE_BURST", "5"))
+
+# Графики /chart: процессов отрисовки (0 — рисовать в потоке), точек на графике,
+# сколько готовых графиков держать в кэше
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", "1"))
+CHART_POINTS = int(os.getenv("CHART_POINTS", "120"))
+CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "64"))
+
+# Наблюдение за процессами (/watch): сколько процессов опрашивать на каждом шаге сборщика
+WATCH_LIMIT = int(os.getenv("WATCH_LIMIT", "50"))
+
+# Разбивка по сервисам и контейнерам (cgroup v2): корень иерархии, глубина
+# обхода, шаг прохода и как часто перечитывать список cgroup (секунды)
+CGROUP_ROOT = os.getenv("CGROUP_ROOT", "/sys/fs/cgroup")
+CGROUP_DEPTH = int(os.getenv("CGROUP_DEPTH", "2"))
+CGROUP_SCAN_INTERVAL = float(os.getenv("CGROUP_SCAN_INTERVAL", "5"))
+CGROUP_RESCAN_INTERVAL = float(os.getenv("CGROUP_RESCAN_INTERVAL", "30"))
@@ -0,0 +1,63 @@
+"""
+Выгрузка истории метрик из файла хранилища без запуска бота.
+
+    python export.py 7d
+    python export.py 30d --format columns --output metrics.smbc.gz
+    python export.py all --output - | zcat | head
+
+Файл хранилища (``METRICS_STORE_PATH``) открывается только для чтения,
+поэтому выгрузку можно делать и при работающем боте. Формат — как у
+команды /export (см. utils/export.py).
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from config import METRICS_STORE_PATH
+from utils.export import FORMATS, export_chunks
+from utils.history import parse_window
+from utils.storage import load_storage
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("window", nargs="?", default="1d", help="окно: 1h, 1d, 7d, 30d или all")
+    parser.add_argument("--format", choices=tuple(FORMATS), default="csv")
+    parser.add_argument("--store", type=Path, default=METRICS_STORE_PATH, help="файл хранилища")
+    parser.add_argument("--output", help="файл выгрузки («-» — stdout)")
+    args = parser.parse_args()
+
+    window = None if args.window == "all" else parse_window(args.window)
+    if window is None and args.window != "all":
+        parser.error(f"непонятное окно: {args.window}")
+
+    try:
+        storage = load_storage(args.store)
+    except (OSError, ValueError) as e:
+        print(f"❌ Хранилище недоступно: {e}", file=sys.stderr)
+        return 1
+
+    now = time.time()
+    since = 0.0 if window is None else now - window
+    output = args.output or f"metrics-{datetime.fromtimestamp(now).strftime('%Y%m%d-%H%M')}-{args.window}.{FORMATS[args.format]}"
+    try:
+        if output == "-":
+            for data in export_chunks(storage, since, now, args.format):
+                sys.stdout.buffer.write(data)
+            sys.stdout.buffer.flush()
+        else:
+            size = 0
+            with open(output, "wb") as fh:
+                for data in export_chunks(storage, since, now, args.format):
+                    fh.write(data)
+                    size += len(data)
+            print(f"📦 {output}: {size / 1024:.1f} KB", file=sys.stderr)
+    finally:
+        storage.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Команда /chart: PNG-график истории метрики.
+"""
+from datetime import datetime
+
+from aiogram import Router, types
+from aiogram.filters import Command, CommandObject
+
+from handlers.commands import check_user_access, format_metric_value, reply
+from utils.charts import Chart, charts
+from utils.history import METRICS, parse_window
+
+router = Router()
+
+
+def format_chart_caption(chart: Chart, window_text: str) -> str:
+    """Подпись к графику: сводка за окно."""
+    metric = chart.key[0]
+    label, unit = METRICS[metric]
+    fmt = "%d.%m %H:%M"
+    return (
+        f"📈 {label} за {window_text}\n"
+        f"🔻 {format_metric_value(chart.low, unit)}  "
+        f"🔸 {format_metric_value(chart.avg, unit)}  "
+        f"🔺 {format_metric_value(chart.high, unit)}\n"
+        f"🕒 {datetime.fromtimestamp(chart.first).strftime(fmt)} — "
+        f"{datetime.fromtimestamp(chart.last).strftime(fmt)} (точка {chart.interval} с)"
+    )
+
+
+@router.message(Command("chart"))
+async def cmd_chart(message: types.Message, command: CommandObject):
+    """Обработчик команды /chart <метрика> <окно>."""
+    if not check_user_access(message.from_user.id):
+        await reply(message, "❌ У вас нет доступа к этому боту.")
+        return
+
+    args = (command.args or "").split()
+    metric = args[0].lower() if args else "cpu"
+    window_text = args[1] if len(args) > 1 else "1h"
+    window = parse_window(window_text)
+
+    if metric not in METRICS or window is None:
+        await reply(message,
+            "ℹ️ Использование: /chart <метрика> <окно>\n\n"
+            f"Метрики: {', '.join(METRICS)}\n"
+            "Окно: 15m, 1h, 6h, 7d"
+        )
+        return
+
+    chart = await charts.get(metric, window)
+    if chart is None:
+        await reply(message, f"📈 {METRICS[metric][0]} за {window_text}\n\nДанных пока нет.")
+        return
+    await charts.send(message.chat.id, chart, format_chart_caption(chart, window_text))
@@ -1,27 +1,48 @@
 """
 Обработчики команд и сообщений бота.
 """
+import html
+from datetime import datetime
+from functools import partial
+
 from aiogram import Router, F, types
-from aiogram.filters import Command
-
-from config import ALLOWED_USERS
-from utils.stats import (
-    get_cpu_stats,
-    get_ram_stats,
-    get_disk_stats,
-    get_network_stats,
-    get_system_info,
-    get_top_processes,
-    get_all_running_processes,
-)
-from keyboards.main_kb import get_main_keyboard, get_inline_keyboard, get_back_keyboard, get_processes_keyboard
+from aiogram.filters import Command, CommandObject
+from aiogram.utils.callback_answer import CallbackAnswerMiddleware
+
+from utils.history import METRICS, history, parse_window, downsample
+from utils.disks import busiest_devices
+from utils.access import access
+from utils.alerts import alert_engine, format_value, FIRING, PENDING
+from utils.outbound import outbound
+from utils.processes import GROUP_MODES
+from handlers.views import View, views
+from keyboards.main_kb import BACK_KEYBOARD, CGROUPS_KEYBOARD, INLINE_KEYBOARD, PROCESSES_KEYBOARD, get_apps_keyboard, get_main_keyboard, get_inline_keyboard
 
 router = Router()
+# Нажатие подтверждается сразу, до сбора данных: у клиента не висят «часики»
+router.callback_query.middleware(CallbackAnswerMiddleware(pre=True))
 
 
 def check_user_access(user_id: int) -> bool:
     """Проверка доступа пользователя."""
-    return not ALLOWED_USERS or user_id in ALLOWED_USERS
+    return access.allowed(user_id)
+
+
+def check_admin_access(user_id: int) -> bool:
+    """Проверка прав на служебные команды (ADMIN_USERS, иначе ALLOWED_USERS)."""
+    return access.is_admin(user_id)
+
+
+async def reply(message: types.Message, text: str, **kwargs):
+    """Ответ в чат через очередь исходящих сообщений."""
+    return await outbound.send(message.chat.id, text, **kwargs)
+
+
+async def show(callback: types.CallbackQuery, text: str, **kwargs):
+    """Показать экран в сообщении с кнопками (правки схлопываются в очереди)."""
+    if callback.message is None:
+        return None
+    return await outbound.edit(callback.message.chat.id, callback.message.message_id, text, **kwargs)
 
 
 def format_cpu_stats(cpu: dict) -> str:
@@ -49,11 +70,21 @@ def format_ram_stats(ram: dict) -> str:
     )
 
 
-def format_disk_stats(disks: list) -> str:
+def format_disk_stats(disks: list, disk_io: dict = None, limit: int = 15) -> str:
     """Форматирование статистики дисков."""
     text = "💿 Статистика дисков\n\n"
 
-    for disk in disks:
+    for disk in disks[:limit]:
+        if disk.get("status") == "timeout":
+            text += f"⏳ {disk['mountpoint']} ({disk['device']})\n   Нет ответа (таймаут)\n\n"
+            continue
+        if disk.get("status") == "queued":
+            text += f"⏳ {disk['mountpoint']} ({disk['device']})\n   Ждёт очереди: потоки заняты зависшими дисками\n\n"
+            continue
+        if disk.get("status") == "skipped":
+            text += f"⏸️ {disk['mountpoint']} ({disk['device']})\n   Пропущен после повторных таймаутов\n\n"
+            continue
+
         status_emoji = "🟢" if disk["percent"] < 50 else "🟡" if disk["percent"] < 80 else "🔴"
         text += (
             f"{status_emoji} {disk['mountpoint']} ({disk['device']})\n"
@@ -62,21 +93,56 @@ def format_disk_stats(disks: list) -> str:
             f"   Свободно: {disk['free']:.2f} GB\n"
             f"   Загрузка: {disk['percent']}%\n\n"
         )
+    if len(disks) > limit:
+        text += f"… и ещё {len(disks) - limit} точек монтирования\n\n"
+
+    if disk_io:
+        text += "📊 Ввод-вывод:\n"
+        for name, io in busiest_devices(disk_io):
+            text += (
+                f"  • {name}: 📖 {format_metric_value(io['read_bytes'], 'B/s')} ({io['read_iops']:.0f} IOPS) "
+                f"✏️ {format_metric_value(io['write_bytes'], 'B/s')} ({io['write_iops']:.0f} IOPS), "
+                f"ожидание {io['await_ms']:.1f} мс\n"
+            )
 
     return text.strip()
 
 
 def format_network_stats(network: dict) -> str:
     """Форматирование статистики сети."""
-    return (
+    rates = network["rates"]
+    text = (
         "🌐 Статистика сети\n\n"
-        f"📤 Отправлено: {network['bytes_sent']:.2f} MB\n"
-        f"📥 Получено: {network['bytes_recv']:.2f} MB\n"
+        f"📤 Отдача: {format_metric_value(rates['bytes_sent'], 'B/s')}\n"
+        f"📥 Приём: {format_metric_value(rates['bytes_recv'], 'B/s')}\n"
+        f"📤 Отправлено всего: {network['bytes_sent']:.2f} MB\n"
+        f"📥 Получено всего: {network['bytes_recv']:.2f} MB\n"
         f"📦 Пакетов отправлено: {network['packets_sent']:,}\n"
         f"📦 Пакетов получено: {network['packets_recv']:,}\n\n"
-        f"Интерфейсы:\n"
-        + "\n".join(f"  • {ip}" for ip in network["ip_addresses"][:5])
+        "Интерфейсы:\n"
+    )
+
+    # Самые нагруженные интерфейсы сверху
+    busiest = sorted(
+        network["interfaces"].items(),
+        key=lambda item: item[1]["bytes_sent"] + item[1]["bytes_recv"],
+        reverse=True,
     )
+    for name, nic in busiest[:10]:
+        text += (
+            f"  • {name}: ↑ {format_metric_value(nic['bytes_sent'], 'B/s')} "
+            f"↓ {format_metric_value(nic['bytes_recv'], 'B/s')} "
+            f"({nic['packets_sent']:.0f}/{nic['packets_recv']:.0f} пак/с)\n"
+        )
+        if nic["errors"] or nic["drops"]:
+            text += f"    ⚠️ Ошибки: {nic['errors']:.1f}/с, отброшено: {nic['drops']:.1f}/с\n"
+    if len(busiest) > 10:
+        text += f"  … и ещё {len(busiest) - 10}\n"
+
+    if network["ip_addresses"]:
+        text += "\nIP-адреса:\n" + "\n".join(f"  • {ip}" for ip in network["ip_addresses"][:5])
+
+    return text.strip()
 
 
 def format_system_info(sys_info: dict) -> str:
@@ -114,6 +180,49 @@ def format_running_processes(processes: list, sort_by: str = "memory") -> str:
     return text
 
 
+APP_GROUP_LABELS = {"name": "имени", "exe": "программе", "tree": "дереву процессов"}
+
+
+def format_app_groups(groups: list, by: str = "name", sort_by: str = "memory") -> str:
+    """Форматирование сводки по приложениям."""
+    if not groups:
+        return "🗂 Нет данных о процессах"
+
+    sort_label = "памяти" if sort_by == "memory" else "CPU"
+    text = f"🗂 Приложения по {APP_GROUP_LABELS.get(by, 'имени')}, топ по {sort_label}\n\n"
+    for i, group in enumerate(groups, 1):
+        text += f"{i}. <code>{html.escape(group['label'][-40:])}</code> × {group['count']}\n"
+        text += (
+            f"   CPU: {group['cpu_percent']:.1f}% | RAM: {group['memory_percent']:.1f}%"
+            f" ({group['rss'] / 1024**2:.0f} MB)\n\n"
+        )
+    return text
+
+
+CGROUP_SORT_LABELS = {"cpu": "CPU", "memory": "памяти", "io": "диску"}
+CGROUP_KIND_EMOJI = {"service": "⚙️", "container": "📦", "scope": "🔸", "slice": "🗂️"}
+
+
+def format_cgroups(units: list, sort_by: str = "cpu") -> str:
+    """Форматирование разбивки по сервисам и контейнерам (cgroup v2)."""
+    if not units:
+        return "🧩 Нет данных cgroup v2 (нужна единая иерархия в CGROUP_ROOT)"
+
+    text = f"🧩 Сервисы и контейнеры по {CGROUP_SORT_LABELS.get(sort_by, 'CPU')}\n\n"
+    for i, unit in enumerate(units, 1):
+        cpu = "…" if unit["cpu_percent"] is None else f"{unit['cpu_percent']:.1f}%"
+        memory = "—" if unit["memory"] is None else f"{unit['memory'] / 1024**2:.0f} MB"
+        text += f"{i}. {CGROUP_KIND_EMOJI.get(unit['kind'], '▫️')} <code>{html.escape(unit['name'][:40])}</code>\n"
+        text += f"   CPU: {cpu} | RAM: {memory}"
+        if unit["io_read_bps"] is not None:
+            text += (
+                f" | 💿 ↓{format_metric_value(unit['io_read_bps'], 'B/s')}"
+                f" ↑{format_metric_value(unit['io_write_bps'], 'B/s')}"
+            )
+        text += "\n\n"
+    return text
+
+
 def format_general_status(cpu: dict, ram: dict, sys_info: dict) -> str:
     """Форматирование общего статуса."""
     cpu_status = "🟢" if cpu["percent"] < 50 else "🟡" if cpu["percent"] < 80 else "🔴"
@@ -130,14 +239,159 @@ def format_general_status(cpu: dict, ram: dict, sys_info: dict) -> str:
     )
 
 
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def format_metric_value(value: float, unit: str) -> str:
+    """Форматирование значения метрики с единицей измерения."""
+    if unit == "B/s":
+        for suffix in ("B/s", "KB/s", "MB/s"):
+            if value < 1024:
+                return f"{value:.1f} {suffix}"
+            value /= 1024
+        return f"{value:.1f} GB/s"
+    return f"{value:.1f}{unit}"
+
+
+def format_history(metric: str, window_text: str, step: int, buckets: list) -> str:
+    """Форматирование истории метрики: сводка и спарклайн."""
+    label, unit = METRICS[metric]
+    if not buckets:
+        return f"📈 История {label} за {window_text}\n\nДанных пока нет."
+
+    low = min(b[1] for b in buckets)
+    high = max(b[3] for b in buckets)
+    avg = sum(b[2] for b in buckets) / len(buckets)
+
+    # Проценты рисуем в шкале 0–100, скорости — от минимума до максимума
+    points = downsample(buckets, 30)
+    scale_low, scale_high = (0.0, 100.0) if unit == "%" else (low, high)
+    span = (scale_high - scale_low) or 1.0
+    spark = "".join(
+        SPARK_CHARS[min(len(SPARK_CHARS) - 1, max(0, int((b[2] - scale_low) / span * len(SPARK_CHARS))))]
+        for b in points
+    )
+
+    start = datetime.fromtimestamp(buckets[0][0]).strftime("%d.%m %H:%M")
+    end = datetime.fromtimestamp(buckets[-1][0]).strftime("%d.%m %H:%M")
+    return (
+        f"📈 История {label} за {window_text}\n\n"
+        f"<code>{spark}</code>\n\n"
+        f"🔻 Мин: {format_metric_value(low, unit)}\n"
+        f"🔸 Сред: {format_metric_value(avg, unit)}\n"
+        f"🔺 Макс: {format_metric_value(high, unit)}\n\n"
+        f"🕒 {start} — {end} (шаг {step} с)"
+    )
+
+
+# Экраны: одна запись на вид вместо команды, кнопки и callback-обработчика
+REFRESHED = "🔄 Данные обновлены\n\n"
+
+views.register(
+    View("status", ("cpu", "ram", "system"), format_general_status, INLINE_KEYBOARD),
+    commands=("status",), buttons=("📊 Общий статус",), callbacks=("status_general",),
+)
+views.register(
+    View("refresh", ("cpu", "ram", "system"), format_general_status, INLINE_KEYBOARD, force=True, header=REFRESHED),
+    buttons=("🔄 Обновить",), callbacks=("refresh",),
+)
+views.register(
+    View("cpu", ("cpu",), format_cpu_stats, BACK_KEYBOARD),
+    commands=("cpu",), buttons=("🔥 CPU",), callbacks=("status_cpu",),
+)
+views.register(
+    View("ram", ("ram",), format_ram_stats, BACK_KEYBOARD),
+    commands=("ram",), buttons=("💾 RAM",), callbacks=("status_ram",),
+)
+views.register(
+    View("disk", ("disk", "disk_io"), format_disk_stats, BACK_KEYBOARD),
+    commands=("disk",), buttons=("💿 Диски",), callbacks=("status_disk",),
+)
+views.register(
+    View("network", ("network",), format_network_stats, BACK_KEYBOARD),
+    commands=("network",), buttons=("🌐 Сеть",), callbacks=("status_network",),
+)
+views.register(
+    View("system", ("system",), format_system_info, BACK_KEYBOARD),
+    commands=("system",), buttons=("⚙️ Система",), callbacks=("status_system",),
+)
+views.register(
+    View("processes", ("processes_memory",), format_running_processes, PROCESSES_KEYBOARD, "HTML"),
+    commands=("processes",), buttons=("📋 Процессы",), callbacks=("processes_memory",),
+)
+views.register(
+    View(
+        "processes_cpu", ("processes_cpu",), partial(format_running_processes, sort_by="cpu"),
+        PROCESSES_KEYBOARD, "HTML",
+    ),
+    callbacks=("processes_cpu",),
+)
+views.register(
+    View(
+        "processes_refresh", ("processes_memory",), format_running_processes,
+        PROCESSES_KEYBOARD, "HTML", force=True, header=REFRESHED,
+    ),
+    callbacks=("processes_refresh",),
+)
+
+for _by in GROUP_MODES:
+    for _sort_by in ("memory", "cpu"):
+        views.register(
+            View(
+                f"apps_{_by}_{_sort_by}", (f"apps_{_by}_{_sort_by}",),
+                partial(format_app_groups, by=_by, sort_by=_sort_by),
+                get_apps_keyboard(_by, _sort_by), "HTML",
+            ),
+            commands=("apps",) if (_by, _sort_by) == ("name", "memory") else (),
+            callbacks=(f"apps_{_by}_{_sort_by}",),
+        )
+
+views.register(
+    View("cgroups", ("cgroups_cpu",), format_cgroups, CGROUPS_KEYBOARD, "HTML"),
+    commands=("cgroups",), callbacks=("cgroups_cpu",),
+)
+views.register(
+    View("cgroups_memory", ("cgroups_memory",), partial(format_cgroups, sort_by="memory"), CGROUPS_KEYBOARD, "HTML"),
+    callbacks=("cgroups_memory",),
+)
+views.register(
+    View("cgroups_io", ("cgroups_io",), partial(format_cgroups, sort_by="io"), CGROUPS_KEYBOARD, "HTML"),
+    callbacks=("cgroups_io",),
+)
+views.register(
+    View(
+        "cgroups_refresh", ("cgroups_cpu",), format_cgroups,
+        CGROUPS_KEYBOARD, "HTML", force=True, header=REFRESHED,
+    ),
+    callbacks=("cgroups_refresh",),
+)
+
+
+@router.message(views.match_message)
+async def msg_view(message: types.Message, view: View, is_command: bool):
+    """Команда или кнопка основной клавиатуры, привязанная к виду."""
+    if not check_user_access(message.from_user.id):
+        if is_command:
+            await reply(message, "❌ У вас нет доступа к этому боту.")
+        return
+
+    await reply(message, await views.render(view), **view.options)
+
+
+@router.callback_query(views.match_callback)
+async def cb_view(callback: types.CallbackQuery, view: View):
+    """Инлайн-кнопка, привязанная к виду."""
+    await show(callback, await views.render(view), **view.options)
+
+
 @router.message(Command("start"))
 async def cmd_start(message: types.Message):
     """Обработчик команды /start."""
     if not check_user_access(message.from_user.id):
-        await message.answer("❌ У вас нет доступа к этому боту.")
+        await reply(message, "❌ У вас нет доступа к этому боту.")
         return
 
-    await message.answer(
+    await reply(message, 
         f"👋 Привет, {message.from_user.first_name}!\n\n"
         "Я бот для мониторинга вашего сервера.\n"
         "Выберите команду в меню ниже:",
@@ -145,28 +399,11 @@ async def cmd_start(message: types.Message):
     )
 
 
-@router.message(Command("status"))
-async def cmd_status(message: types.Message):
-    """Обработчик команды /status - общий статус."""
-    if not check_user_access(message.from_user.id):
-        await message.answer("❌ У вас нет доступа к этому боту.")
-        return
-
-    cpu = get_cpu_stats()
-    ram = get_ram_stats()
-    sys_info = get_system_info()
-
-    await message.answer(
-        format_general_status(cpu, ram, sys_info),
-        reply_markup=get_inline_keyboard(),
-    )
-
-
 @router.message(Command("help"))
 async def cmd_help(message: types.Message):
     """Обработчик команды /help."""
     if not check_user_access(message.from_user.id):
-        await message.answer("❌ У вас нет доступа к этому боту.")
+        await reply(message, "❌ У вас нет доступа к этому боту.")
         return
 
     help_text = (
@@ -179,219 +416,76 @@ async def cmd_help(message: types.Message):
         "/network - Статистика сети\n"
         "/system - Информация о системе\n"
         "/processes - Список запущенных процессов\n"
+        "/apps - Процессы, сгруппированные по приложениям\n"
+        "/cgroups - Сервисы и контейнеры (cgroup v2)\n"
+        "/proc <PID|имя> - Подробности о процессе\n"
+        "/watch [PID|имя] - Список наблюдения или добавить процесс\n"
+        "/unwatch <PID> - Убрать процесс из наблюдения\n"
+        "/history <метрика> <окно> - История метрики (например, /history cpu 6h)\n"
+        "/chart <метрика> <окно> - График метрики (например, /chart net_recv 1h)\n"
+        "/export <окно> [csv|columns] - Выгрузить историю метрик файлом (например, /export 7d)\n"
+        "/alerts - Правила алертов и их состояние\n"
+        "/live [вид] - Live-панель с автообновлением (status, cpu, ram, network)\n"
+        "/fleet - Обзор серверов с агентами\n"
+        "/perf - Замеры производительности (для администраторов)\n"
         "/help - Эта справка\n\n"
         "Также вы можете использовать кнопки в меню."
     )
 
-    await message.answer(help_text)
-
-
-@router.message(F.text == "📊 Общий статус")
-async def msg_general_status(message: types.Message):
-    """Обработчик кнопки «Общий статус»."""
-    if not check_user_access(message.from_user.id):
-        return
-
-    cpu = get_cpu_stats()
-    ram = get_ram_stats()
-    sys_info = get_system_info()
-
-    await message.answer(
-        format_general_status(cpu, ram, sys_info),
-        reply_markup=get_inline_keyboard(),
-    )
-
-
-@router.message(F.text == "🔥 CPU")
-async def msg_cpu(message: types.Message):
-    """Обработчик кнопки «CPU»."""
-    if not check_user_access(message.from_user.id):
-        return
-
-    cpu = get_cpu_stats()
-    await message.answer(format_cpu_stats(cpu), reply_markup=get_back_keyboard())
+    await reply(message, help_text)
 
 
-@router.message(F.text == "💾 RAM")
-async def msg_ram(message: types.Message):
-    """Обработчик кнопки «RAM»."""
+@router.message(Command("history"))
+async def cmd_history(message: types.Message, command: CommandObject):
+    """Обработчик команды /history <метрика> <окно>."""
     if not check_user_access(message.from_user.id):
+        await reply(message, "❌ У вас нет доступа к этому боту.")
         return
 
-    ram = get_ram_stats()
-    await message.answer(format_ram_stats(ram), reply_markup=get_back_keyboard())
+    args = (command.args or "").split()
+    metric = args[0].lower() if args else "cpu"
+    window_text = args[1] if len(args) > 1 else "1h"
+    window = parse_window(window_text)
 
-
-@router.message(F.text == "💿 Диски")
-async def msg_disk(message: types.Message):
-    """Обработчик кнопки «Диски»."""
-    if not check_user_access(message.from_user.id):
-        return
-
-    disks = get_disk_stats()
-    await message.answer(format_disk_stats(disks), reply_markup=get_back_keyboard())
-
-
-@router.message(F.text == "🌐 Сеть")
-async def msg_network(message: types.Message):
-    """Обработчик кнопки «Сеть»."""
-    if not check_user_access(message.from_user.id):
-        return
-
-    network = get_network_stats()
-    await message.answer(format_network_stats(network), reply_markup=get_back_keyboard())
-
-
-@router.message(F.text == "⚙️ Система")
-async def msg_system(message: types.Message):
-    """Обработчик кнопки «Система»."""
-    if not check_user_access(message.from_user.id):
+    if metric not in METRICS or window is None:
+        await reply(message, 
+            "ℹ️ Использование: /history <метрика> <окно>\n\n"
+            f"Метрики: {', '.join(METRICS)}\n"
+            "Окно: 90s, 15m, 6h, 7d"
+        )
         return
 
-    sys_info = get_system_info()
-    await message.answer(format_system_info(sys_info), reply_markup=get_back_keyboard())
-
+    step, buckets = history.query(metric, window)
+    await reply(message, format_history(metric, window_text, step, buckets), parse_mode="HTML")
 
-@router.message(Command("processes"))
-async def cmd_processes(message: types.Message):
-    """Обработчик команды /processes - список запущенных процессов."""
-    if not check_user_access(message.from_user.id):
-        await message.answer("❌ У вас нет доступа к этому боту.")
-        return
-
-    processes = get_all_running_processes(sort_by="memory", limit=15)
-    await message.answer(
-        format_running_processes(processes, sort_by="memory"),
-        reply_markup=get_processes_keyboard(),
-        parse_mode="HTML"
-    )
 
+def format_alerts(rules: list) -> str:
+    """Форматирование списка правил алертов."""
+    if not rules:
+        return "🚨 Правила алертов не заданы (ALERT_RULES в .env)"
 
-@router.message(F.text == "📋 Процессы")
-async def msg_processes(message: types.Message):
-    """Обработчик кнопки «Процессы»."""
-    if not check_user_access(message.from_user.id):
-        return
-
-    processes = get_all_running_processes(sort_by="memory", limit=15)
-    await message.answer(
-        format_running_processes(processes, sort_by="memory"),
-        reply_markup=get_processes_keyboard(),
-        parse_mode="HTML"
-    )
+    text = "🚨 Правила алертов\n\n"
+    for rule in rules:
+        emoji = "🔴" if rule.state == FIRING else "🟡" if rule.state == PENDING else "🟢"
+        value = format_value(rule.metric, rule.last_value) if rule.last_value is not None else "нет данных"
+        text += f"{emoji} {rule.text}\n   Сейчас: {value}\n"
+    return text.strip()
 
 
-@router.message(F.text == "🔄 Обновить")
-async def msg_refresh(message: types.Message):
-    """Обработчик кнопки «Обновить»."""
+@router.message(Command("alerts"))
+async def cmd_alerts(message: types.Message):
+    """Обработчик команды /alerts."""
     if not check_user_access(message.from_user.id):
+        await reply(message, "❌ У вас нет доступа к этому боту.")
         return
 
-    cpu = get_cpu_stats()
-    ram = get_ram_stats()
-    sys_info = get_system_info()
-
-    await message.answer(
-        f"🔄 Данные обновлены\n\n" + format_general_status(cpu, ram, sys_info),
-        reply_markup=get_inline_keyboard(),
-    )
+    await reply(message, format_alerts(alert_engine.rules))
 
 
 @router.callback_query(F.data == "back_menu")
 async def cb_back_menu(callback: types.CallbackQuery):
     """Обработчик кнопки «Назад в меню»."""
-    await callback.message.edit_reply_markup(reply_markup=get_inline_keyboard())
-
-
-@router.callback_query(F.data == "refresh")
-async def cb_refresh(callback: types.CallbackQuery):
-    """Обработчик кнопки «Обновить» (inline)."""
-    cpu = get_cpu_stats()
-    ram = get_ram_stats()
-    sys_info = get_system_info()
-
-    await callback.message.edit_text(
-        f"🔄 Данные обновлены\n\n" + format_general_status(cpu, ram, sys_info),
-        reply_markup=get_inline_keyboard(),
-    )
-
-
-@router.callback_query(F.data == "status_general")
-async def cb_status_general(callback: types.CallbackQuery):
-    """Обработчик кнопки «Общий статус» (inline)."""
-    cpu = get_cpu_stats()
-    ram = get_ram_stats()
-    sys_info = get_system_info()
-
-    await callback.message.edit_text(
-        format_general_status(cpu, ram, sys_info),
-        reply_markup=get_inline_keyboard(),
-    )
-
-
-@router.callback_query(F.data == "status_cpu")
-async def cb_status_cpu(callback: types.CallbackQuery):
-    """Обработчик кнопки «CPU» (inline)."""
-    cpu = get_cpu_stats()
-    await callback.message.edit_text(format_cpu_stats(cpu), reply_markup=get_back_keyboard())
-
-
-@router.callback_query(F.data == "status_ram")
-async def cb_status_ram(callback: types.CallbackQuery):
-    """Обработчик кнопки «RAM» (inline)."""
-    ram = get_ram_stats()
-    await callback.message.edit_text(format_ram_stats(ram), reply_markup=get_back_keyboard())
-
-
-@router.callback_query(F.data == "status_disk")
-async def cb_status_disk(callback: types.CallbackQuery):
-    """Обработчик кнопки «Диски» (inline)."""
-    disks = get_disk_stats()
-    await callback.message.edit_text(format_disk_stats(disks), reply_markup=get_back_keyboard())
-
-
-@router.callback_query(F.data == "status_network")
-async def cb_status_network(callback: types.CallbackQuery):
-    """Обработчик кнопки «Сеть» (inline)."""
-    network = get_network_stats()
-    await callback.message.edit_text(format_network_stats(network), reply_markup=get_back_keyboard())
-
-
-@router.callback_query(F.data == "status_system")
-async def cb_status_system(callback: types.CallbackQuery):
-    """Обработчик кнопки «Система» (inline)."""
-    sys_info = get_system_info()
-    await callback.message.edit_text(format_system_info(sys_info), reply_markup=get_back_keyboard())
-
-
-@router.callback_query(F.data == "processes_memory")
-async def cb_processes_memory(callback: types.CallbackQuery):
-    """Обработчик кнопки «По памяти» для процессов."""
-    processes = get_all_running_processes(sort_by="memory", limit=15)
-    await callback.message.edit_text(
-        format_running_processes(processes, sort_by="memory"),
-        reply_markup=get_processes_keyboard(),
-        parse_mode="HTML"
-    )
-
-
-@router.callback_query(F.data == "processes_cpu")
-async def cb_processes_cpu(callback: types.CallbackQuery):
-    """Обработчик кнопки «По CPU» для процессов."""
-    processes = get_all_running_processes(sort_by="cpu", limit=15)
-    await callback.message.edit_text(
-        format_running_processes(processes, sort_by="cpu"),
-        reply_markup=get_processes_keyboard(),
-        parse_mode="HTML"
-    )
-
-
-@router.callback_query(F.data == "processes_refresh")
-async def cb_processes_refresh(callback: types.CallbackQuery):
-    """Обработчик кнопки «Обновить» для процессов."""
-    processes = get_all_running_processes(sort_by="memory", limit=15)
-    await callback.message.edit_text(
-        "🔄 Данные обновлены\n\n" + format_running_processes(processes, sort_by="memory"),
-        reply_markup=get_processes_keyboard(),
-        parse_mode="HTML"
-    )
+    if callback.message is not None:
+        await outbound.edit_markup(
+            callback.message.chat.id, callback.message.message_id, reply_markup=get_inline_keyboard()
+        )
@@ -0,0 +1,61 @@
+"""
+Команда /export: выгрузка истории метрик файлом.
+"""
+import time
+from datetime import datetime
+
+from aiogram import Router, types
+from aiogram.filters import Command, CommandObject
+
+from config import STORE_INTERVAL
+from handlers.commands import check_user_access, reply
+from utils.export import FORMATS, ExportFile
+from utils.history import history, parse_window
+from utils.outbound import outbound
+
+router = Router()
+
+
+def format_export_caption(window_text: str, first: float, last: float) -> str:
+    """Подпись к выгрузке: интервал и шаг записей."""
+    fmt = "%d.%m %H:%M"
+    return (
+        f"📦 Метрики за {window_text}\n"
+        f"🕒 {datetime.fromtimestamp(first).strftime(fmt)} — "
+        f"{datetime.fromtimestamp(last).strftime(fmt)} (шаг {STORE_INTERVAL:g} с)"
+    )
+
+
+@router.message(Command("export"))
+async def cmd_export(message: types.Message, command: CommandObject):
+    """Обработчик команды /export <окно> [csv|columns]."""
+    if not check_user_access(message.from_user.id):
+        await reply(message, "❌ У вас нет доступа к этому боту.")
+        return
+
+    args = (command.args or "").split()
+    window_text = args[0] if args else "1d"
+    fmt = args[1].lower() if len(args) > 1 else "csv"
+    window = parse_window(window_text)
+
+    if window is None or fmt not in FORMATS:
+        await reply(message,
+            "ℹ️ Использование: /export <окно> [формат]\n\n"
+            "Окно: 1h, 1d, 7d, 30d\n"
+            "Формат: csv (gzip) или columns (двоичный поколоночный, gzip)"
+        )
+        return
+
+    storage = history.storage
+    span = storage.span() if storage is not None else None
+    now = time.time()
+    if span is None or span[1] < now - window:
+        await reply(message, f"📦 Метрики за {window_text}\n\nДанных в хранилище пока нет.")
+        return
+
+    filename = f"metrics-{datetime.fromtimestamp(now).strftime('%Y%m%d-%H%M')}-{window_text}.{FORMATS[fmt]}"
+    await outbound.send_document(
+        message.chat.id,
+        ExportFile(storage, now - window, now, fmt, filename),
+        caption=format_export_caption(window_text, max(span[0], now - window), span[1]),
+    )
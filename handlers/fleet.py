@@ -0,0 +1,146 @@
+"""
+Обзор парка серверов (/fleet) и просмотр отдельного сервера.
+"""
+import html
+import time
+from typing import Callable, Dict
+
+from aiogram import F, Router, types
+from aiogram.filters import Command
+from aiogram.utils.callback_answer import CallbackAnswerMiddleware
+
+from handlers.commands import (
+    check_user_access,
+    format_cpu_stats,
+    format_disk_stats,
+    format_general_status,
+    format_network_stats,
+    format_ram_stats,
+    format_running_processes,
+    format_system_info,
+    reply,
+    show,
+)
+from keyboards.main_kb import get_fleet_keyboard, get_host_keyboard
+from utils.fleet import Host, fleet
+
+router = Router()
+router.callback_query.middleware(CallbackAnswerMiddleware(pre=True))
+
+# Серверов на странице обзора
+PAGE_SIZE = 20
+
+# Вид → рендер текста из ответа агента
+HOST_VIEWS: Dict[str, Callable[[dict], str]] = {
+    "status": lambda d: format_general_status(d["cpu"], d["ram"], d["system"]),
+    "cpu": lambda d: format_cpu_stats(d["cpu"]),
+    "ram": lambda d: format_ram_stats(d["ram"]),
+    "disk": lambda d: format_disk_stats(d["disks"], d["disk_io"]),
+    "network": lambda d: format_network_stats(d["network"]),
+    "system": lambda d: format_system_info(d["system"]),
+    "processes": lambda d: format_running_processes(d["processes"], sort_by="memory"),
+}
+
+
+def is_down(host: Host) -> bool:
+    """Нет свежих данных за три шага опроса."""
+    return host.stale(fleet.interval * 3)
+
+
+def host_emoji(host: Host) -> str:
+    if is_down(host):
+        return "⚫"
+    load = host.load
+    return "🟢" if load < 50 else "🟡" if load < 80 else "🔴"
+
+
+def format_host_line(host: Host) -> str:
+    """Строка сервера в обзоре."""
+    if is_down(host):
+        return f"⚫ {host.name} — недоступен: {host.error or 'нет данных'}"
+    data = host.data
+    root = data.get("root_disk") or {}
+    return (
+        f"{host_emoji(host)} {host.name} — CPU {data['cpu']['percent']:.0f}% · "
+        f"RAM {data['ram']['percent']:.0f}% · / {root.get('percent', 0):.0f}%"
+    )
+
+
+def fleet_overview(page: int):
+    """Текст и клавиатура страницы обзора: проблемные серверы сверху."""
+    order = sorted(
+        range(len(fleet.hosts)),
+        key=lambda i: float("inf") if is_down(fleet.hosts[i]) else fleet.hosts[i].load,
+        reverse=True,
+    )
+    pages = max(1, -(-len(order) // PAGE_SIZE))
+    page = min(max(page, 0), pages - 1)
+
+    counts = {"🟢": 0, "🟡": 0, "🔴": 0, "⚫": 0}
+    for host in fleet.hosts:
+        counts[host_emoji(host)] += 1
+
+    text = (
+        f"🛰️ Парк серверов: {len(fleet.hosts)}\n"
+        + " · ".join(f"{emoji} {count}" for emoji, count in counts.items())
+        + "\n\n"
+    )
+    chunk = order[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+    text += "\n".join(format_host_line(fleet.hosts[i]) for i in chunk)
+
+    buttons = [(i, f"{host_emoji(fleet.hosts[i])} {fleet.hosts[i].name}") for i in chunk]
+    return text, get_fleet_keyboard(buttons, page, pages)
+
+
+def format_host_view(host: Host, view: str) -> str:
+    """Экран сервера парка (HTML: имя экранируется)."""
+    header = f"🖥️ {html.escape(host.name)}"
+    if host.data is None:
+        return f"{header}\n\n⚫ Недоступен: {html.escape(host.error or 'нет данных')}"
+    age = time.monotonic() - host.updated
+    header += f" · данные {age:.0f} с назад"
+    if host.error:
+        header += f"\n⚠️ Последний опрос: {html.escape(host.error)}"
+    body = HOST_VIEWS[view](host.data)
+    if view != "processes":
+        body = html.escape(body)
+    return f"{header}\n\n{body}"
+
+
+@router.message(Command("fleet"))
+async def cmd_fleet(message: types.Message):
+    """Обработчик команды /fleet - обзор парка серверов."""
+    if not check_user_access(message.from_user.id):
+        await reply(message, "❌ У вас нет доступа к этому боту.")
+        return
+
+    if not fleet.hosts:
+        await reply(message, "🛰️ Агенты не заданы (AGENTS в .env)")
+        return
+
+    text, keyboard = fleet_overview(0)
+    await reply(message, text, reply_markup=keyboard)
+
+
+@router.callback_query(F.data.startswith("fleet:"))
+async def cb_fleet(callback: types.CallbackQuery):
+    """Листание обзора и экраны отдельного сервера."""
+    if not check_user_access(callback.from_user.id):
+        return
+
+    parts = callback.data.split(":")
+    if parts[1] == "p":
+        text, keyboard = fleet_overview(int(parts[2]))
+        await show(callback, text, reply_markup=keyboard)
+        return
+
+    index = int(parts[2])
+    if not 0 <= index < len(fleet.hosts):
+        return
+    view = parts[3] if len(parts) > 3 and parts[3] in HOST_VIEWS else "status"
+    await show(
+        callback,
+        format_host_view(fleet.hosts[index], view),
+        reply_markup=get_host_keyboard(index),
+        parse_mode="HTML",
+    )
@@ -0,0 +1,193 @@
+"""
+Live-панель: одно закреплённое сообщение, обновляемое по снимкам сборщика.
+
+Панель не запускает сбор сама: каждые ``LIVE_INTERVAL`` секунд она берёт
+последний снимок ``sampler``, рендерит каждый используемый вид один раз и
+раздаёт готовый текст всем чатам с этим видом. Неизменившийся текст не
+отправляется, панель без действий пользователя останавливается сама.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from aiogram import Bot, F, Router, types
+from aiogram.exceptions import TelegramAPIError
+from aiogram.filters import Command, CommandObject
+from aiogram.utils.callback_answer import CallbackAnswerMiddleware
+
+from config import LIVE_INTERVAL, LIVE_IDLE_TIMEOUT
+from handlers.commands import (
+    check_user_access,
+    format_cpu_stats,
+    format_general_status,
+    format_network_stats,
+    format_ram_stats,
+    reply,
+)
+from keyboards.main_kb import LIVE_VIEWS, get_live_keyboard
+from utils.outbound import outbound
+from utils.sampler import Snapshot, sampler
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+router.callback_query.middleware(CallbackAnswerMiddleware(pre=True))
+
+# Вид → рендер текста из снимка
+RENDERERS: Dict[str, Callable[[Snapshot], str]] = {
+    "status": lambda s: format_general_status(s.cpu, s.ram, s.system),
+    "cpu": lambda s: format_cpu_stats(s.cpu),
+    "ram": lambda s: format_ram_stats(s.ram),
+    "network": lambda s: format_network_stats(s.network),
+}
+
+
+@dataclass
+class LiveSession:
+    """Live-панель в одном чате."""
+
+    chat_id: int
+    message_id: int
+    view: str
+    active_at: float
+    last_text: Optional[str] = None
+
+
+def _log_failure(future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.debug(f"Live-панель: правка не отправлена: {future.exception()}")
+
+
+class LiveDashboard:
+    """Сессии live-панелей и их обновление по снимкам."""
+
+    def __init__(self, interval: float = LIVE_INTERVAL, idle_timeout: float = LIVE_IDLE_TIMEOUT):
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.sessions: Dict[int, LiveSession] = {}
+        self._tick: Optional[int] = None
+        self._keyboards = {view: get_live_keyboard(view) for view, _ in LIVE_VIEWS}
+        # Незавершённые открепления: держим ссылки до окончания задач
+        self._unpins: set = set()
+        # Счётчики для диагностики
+        self.stats = {"ticks": 0, "renders": 0, "edits": 0, "suppressed": 0}
+
+    def render(self, view: str, snapshot: Snapshot) -> str:
+        self.stats["renders"] += 1
+        return (
+            f"🔴 Live · обновление каждые {self.interval:g} с\n\n"
+            + RENDERERS[view](snapshot)
+        )
+
+    def _push(self, session: LiveSession, text: str) -> None:
+        if text == session.last_text:
+            self.stats["suppressed"] += 1
+            return
+        session.last_text = text
+        self.stats["edits"] += 1
+        outbound.edit(
+            session.chat_id, session.message_id, text, reply_markup=self._keyboards[session.view]
+        ).add_done_callback(_log_failure)
+
+    def on_snapshot(self, snapshot: Snapshot) -> None:
+        """Подписчик ``sampler``: один рендер на вид за шаг на все чаты."""
+        if not self.sessions:
+            return
+        # Шаги выровнены по часам: все панели обновляются одновременно
+        tick = int(snapshot.timestamp // self.interval)
+        if tick == self._tick:
+            return
+        self._tick = tick
+        self.stats["ticks"] += 1
+
+        now = time.monotonic()
+        rendered: Dict[str, str] = {}
+        for session in list(self.sessions.values()):
+            if now - session.active_at >= self.idle_timeout:
+                self.stop(session.chat_id, "⏹ Live-панель остановлена: нет активности")
+                continue
+            text = rendered.get(session.view)
+            if text is None:
+                text = rendered[session.view] = self.render(session.view, snapshot)
+            self._push(session, text)
+
+    async def start(self, bot: Bot, chat_id: int, view: str) -> None:
+        """Открыть панель в чате (предыдущая панель чата останавливается)."""
+        if chat_id in self.sessions:
+            self.stop(chat_id, "⏹ Live-панель заменена новой")
+
+        snapshot = await sampler.wait_latest()
+        text = self.render(view, snapshot)
+        message = await outbound.send(chat_id, text, reply_markup=self._keyboards[view])
+        self.sessions[chat_id] = LiveSession(chat_id, message.message_id, view, time.monotonic(), text)
+
+        try:
+            await bot.pin_chat_message(chat_id, message.message_id, disable_notification=True)
+        except TelegramAPIError as e:
+            logger.debug(f"Live-панель: не удалось закрепить сообщение: {e}")
+
+    def switch(self, chat_id: int, message_id: int, view: str) -> None:
+        """Сменить вид панели (или подхватить панель после перезапуска бота)."""
+        session = self.sessions.get(chat_id)
+        if session is None or session.message_id != message_id:
+            session = self.sessions[chat_id] = LiveSession(chat_id, message_id, view, 0.0)
+        session.view = view
+        session.active_at = time.monotonic()
+        if sampler.latest is not None:
+            self._push(session, self.render(view, sampler.latest))
+
+    def stop(self, chat_id: int, text: str = "⏹ Live-панель остановлена", message_id: Optional[int] = None) -> None:
+        """Остановить панель: убрать кнопки и открепить сообщение.
+
+        С ``message_id`` останавливается именно это сообщение; текущая
+        панель чата — только если это она.
+        """
+        session = self.sessions.get(chat_id)
+        if session is not None and message_id in (None, session.message_id):
+            del self.sessions[chat_id]
+            message_id = session.message_id
+        if message_id is None:
+            return
+        outbound.edit(chat_id, message_id, text).add_done_callback(_log_failure)
+        if outbound.bot is not None:
+            task = asyncio.ensure_future(
+                outbound.bot.unpin_chat_message(chat_id=chat_id, message_id=message_id)
+            )
+            self._unpins.add(task)
+            task.add_done_callback(self._unpins.discard)
+            task.add_done_callback(_log_failure)
+
+
+live_dashboard = LiveDashboard()
+
+
+@router.message(Command("live"))
+async def cmd_live(message: types.Message, command: CommandObject, bot: Bot):
+    """Обработчик команды /live [вид]."""
+    if not check_user_access(message.from_user.id):
+        await reply(message, "❌ У вас нет доступа к этому боту.")
+        return
+
+    view = (command.args or "status").strip().lower()
+    if view not in RENDERERS:
+        await reply(message, f"ℹ️ Использование: /live [вид]\n\nВиды: {', '.join(RENDERERS)}")
+        return
+
+    await live_dashboard.start(bot, message.chat.id, view)
+
+
+@router.callback_query(F.data.startswith("live:"))
+async def cb_live(callback: types.CallbackQuery):
+    """Кнопки live-панели: смена вида и остановка."""
+    if callback.message is None or not check_user_access(callback.from_user.id):
+        return
+
+    action = callback.data.split(":", 1)[1]
+    chat_id = callback.message.chat.id
+    if action == "stop":
+        # Панель могла остаться от прошлого запуска бота: останавливаем по сообщению
+        live_dashboard.stop(chat_id, message_id=callback.message.message_id)
+    elif action in RENDERERS:
+        live_dashboard.switch(chat_id, callback.message.message_id, action)
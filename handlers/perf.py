@@ -0,0 +1,74 @@
+"""
+Служебная команда /perf: самые медленные обработчики, сборщики и запросы.
+"""
+import time
+
+from aiogram import Router, types
+from aiogram.filters import Command, CommandObject
+
+from handlers.commands import check_admin_access, reply
+from utils.perf import perf
+
+router = Router()
+
+SECTIONS = (
+    ("handler.", "🤖 Обработчики"),
+    ("collector.", "📊 Сборщики"),
+    ("api.", "📨 Bot API"),
+)
+
+
+def format_duration(ns: float) -> str:
+    """Длительность в удобных единицах."""
+    if ns < 1_000_000:
+        return f"{ns / 1000:.0f} мкс"
+    if ns < 1_000_000_000:
+        return f"{ns / 1_000_000:.1f} мс"
+    return f"{ns / 1_000_000_000:.2f} с"
+
+
+def format_perf(limit: int = 5) -> str:
+    """Отчёт о производительности по гистограммам."""
+    if not perf.enabled:
+        return "ℹ️ Замеры выключены (PERF_ENABLED=1 в .env)"
+
+    minutes = (time.time() - perf.started) / 60
+    text = f"⏱️ Производительность за {minutes:.0f} мин\n(p50 / p99 / макс, число вызовов)\n"
+    for prefix, title in SECTIONS:
+        rows = perf.top(limit, prefix)
+        if not rows:
+            continue
+        text += f"\n{title}:\n"
+        for name, histogram in rows:
+            text += (
+                f"  • {name[len(prefix):]}: {format_duration(histogram.percentile(0.5))} / "
+                f"{format_duration(histogram.percentile(0.99))} / {format_duration(histogram.max_ns)} "
+                f"×{histogram.count}\n"
+            )
+
+    lag = perf.histograms.get("loop.lag")
+    if lag is not None and lag.count:
+        text += (
+            f"\n🔄 Задержка event loop: p99 {format_duration(lag.percentile(0.99))}, "
+            f"макс {format_duration(lag.max_ns)}\n"
+        )
+    if perf.blockers:
+        text += "\n🐢 Где блокировался event loop:\n"
+        for place, count in perf.blockers.most_common(limit):
+            text += f"  • {place} ×{count}\n"
+    return text.strip()
+
+
+@router.message(Command("perf"))
+async def cmd_perf(message: types.Message, command: CommandObject):
+    """Обработчик команды /perf [reset] (только для администраторов)."""
+    if not check_admin_access(message.from_user.id):
+        await reply(message, "❌ Команда доступна только администраторам.")
+        return
+
+    if (command.args or "").strip().lower() == "reset":
+        perf.reset()
+        await reply(message, "🧹 Замеры сброшены")
+        return
+
+    await reply(message, format_perf())
@@ -0,0 +1,197 @@
+"""
+Экран отдельного процесса (/proc) и список наблюдения (/watch, /unwatch).
+"""
+from datetime import datetime
+from functools import partial
+from typing import List, Optional, Tuple, Union
+
+import psutil
+from aiogram import F, Router, types
+from aiogram.filters import Command, CommandObject
+from aiogram.utils.callback_answer import CallbackAnswerMiddleware
+
+from handlers.commands import check_user_access, format_metric_value, reply, show
+from keyboards.main_kb import get_proc_keyboard, get_proc_list_keyboard
+from utils.processes import process_table
+from utils.stats import get_process_info, run_collector
+from utils.watch import WatchedProcess, process_watcher
+
+router = Router()
+router.callback_query.middleware(CallbackAnswerMiddleware(pre=True))
+
+
+def format_bytes(value: Optional[float]) -> str:
+    if value is None:
+        return "—"
+    for suffix in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.1f} {suffix}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
+
+def _rate(value: Optional[float], unit: str = "B/s") -> str:
+    return "—" if value is None else format_metric_value(value, unit)
+
+
+def format_watched_process(watched: WatchedProcess) -> str:
+    """Экран наблюдаемого процесса по последнему замеру."""
+    sample = watched.sample
+    header = f"👁 {watched.name} (PID {sample.pid})"
+    if watched.username:
+        header += f" · {watched.username}"
+    cpu = "…" if sample.cpu_percent is None else f"{sample.cpu_percent}%"
+    ctx = (
+        "—" if sample.ctx_voluntary is None
+        else f"добровольных {sample.ctx_voluntary:.0f}/с · вынужденных {sample.ctx_involuntary:.0f}/с"
+    )
+    text = (
+        f"{header}\n\n"
+        f"🔹 Состояние: {sample.status}\n"
+        f"🔥 CPU: {cpu}\n"
+        f"💾 RSS: {format_bytes(sample.rss)} · USS: {format_bytes(sample.uss)}\n"
+        f"🧵 Потоки: {sample.threads} · Файлы: {'—' if sample.fds is None else sample.fds}\n"
+        f"💿 Чтение: {_rate(sample.read_bps)} · Запись: {_rate(sample.write_bps)}\n"
+        f"🔀 Переключения: {ctx}\n"
+        f"🕒 Запущен: {datetime.fromtimestamp(watched.create_time).strftime('%d.%m %H:%M')}"
+    )
+    if watched.cmdline:
+        text += f"\n\n{watched.cmdline[:300]}"
+    return text + f"\n\nЗамер {datetime.fromtimestamp(sample.timestamp).strftime('%H:%M:%S')}"
+
+
+def format_process_info(info: dict) -> str:
+    """Экран процесса вне списка наблюдения."""
+    cpu = "…" if info["cpu_percent"] is None else f"{info['cpu_percent']}%"
+    return (
+        f"⚙️ {info['name']} (PID {info['pid']})\n\n"
+        f"🔹 Состояние: {info['status']}\n"
+        f"🔥 CPU: {cpu}\n"
+        f"💾 Память: {info['memory_info']:.1f} MB ({info['memory_percent']:.1f}%)\n"
+        f"🧵 Потоки: {info['num_threads']}\n"
+        f"🕒 Запущен: {datetime.fromtimestamp(info['create_time']).strftime('%d.%m %H:%M')}\n\n"
+        "👁 «Следить» — ввод-вывод, USS и переключения на каждом шаге сборщика"
+    )
+
+
+async def render_process(pid: int) -> Tuple[str, Optional[types.InlineKeyboardMarkup]]:
+    """Текст и клавиатура экрана процесса."""
+    watched = process_watcher.get(pid)
+    if watched is not None and watched.sample is not None:
+        return format_watched_process(watched), get_proc_keyboard(pid, True)
+    info = await run_collector(partial(get_process_info, pid))
+    if info is None:
+        return f"❌ Процесс {pid} не найден или нет доступа", None
+    return format_process_info(info), get_proc_keyboard(pid, False)
+
+
+async def resolve(query: str) -> Union[int, List[Tuple[int, str]]]:
+    """PID по аргументу команды или список найденных по имени (PID, подпись)."""
+    if query.isdigit():
+        return int(query)
+    if not len(process_table):
+        await run_collector(process_table.ensure_updated)
+    rows = process_table.search(query)
+    if len(rows) == 1:
+        return rows[0].pid
+    return [(row.pid, f"{row.name} ({row.pid})") for row in rows]
+
+
+async def _resolve_or_reply(message: types.Message, query: str) -> Optional[int]:
+    target = await resolve(query)
+    if isinstance(target, int):
+        return target
+    if not target:
+        await reply(message, f"❌ Процессы «{query}» не найдены")
+    else:
+        await reply(message, f"🔎 Найдено процессов «{query}»: {len(target)}", reply_markup=get_proc_list_keyboard(target))
+    return None
+
+
+def format_watch_list() -> str:
+    """Сводка по всем наблюдаемым процессам."""
+    watched = process_watcher.watched()
+    if not watched:
+        return "👁 Список наблюдения пуст\n\nДобавить: /watch <PID или имя>"
+    lines = [f"👁 Наблюдение: {len(watched)} из {process_watcher.limit}\n"]
+    for item in sorted(watched, key=lambda w: w.proc.pid):
+        sample = item.sample
+        cpu = "…" if sample is None or sample.cpu_percent is None else f"{sample.cpu_percent}%"
+        rss = "—" if sample is None else format_bytes(sample.rss)
+        lines.append(f"• {item.name} ({item.proc.pid}) — CPU {cpu} · RSS {rss}")
+    return "\n".join(lines) + "\n\nПодробнее: /proc <PID>"
+
+
+@router.message(Command("proc"))
+async def cmd_proc(message: types.Message, command: CommandObject):
+    """Обработчик команды /proc <PID|имя>."""
+    if not check_user_access(message.from_user.id):
+        await reply(message, "❌ У вас нет доступа к этому боту.")
+        return
+    if not command.args:
+        await reply(message, "ℹ️ Использование: /proc <PID или имя процесса>")
+        return
+
+    pid = await _resolve_or_reply(message, command.args.strip())
+    if pid is not None:
+        text, keyboard = await render_process(pid)
+        await reply(message, text, reply_markup=keyboard)
+
+
+@router.message(Command("watch"))
+async def cmd_watch(message: types.Message, command: CommandObject):
+    """Обработчик команды /watch [PID|имя]: список наблюдения или добавление."""
+    if not check_user_access(message.from_user.id):
+        await reply(message, "❌ У вас нет доступа к этому боту.")
+        return
+    if not command.args:
+        await reply(message, format_watch_list())
+        return
+
+    pid = await _resolve_or_reply(message, command.args.strip())
+    if pid is None:
+        return
+    try:
+        await process_watcher.add(pid)
+    except ValueError as e:
+        await reply(message, f"❌ {e}")
+        return
+    except psutil.Error:
+        await reply(message, f"❌ Процесс {pid} не найден или нет доступа")
+        return
+    text, keyboard = await render_process(pid)
+    await reply(message, text, reply_markup=keyboard)
+
+
+@router.message(Command("unwatch"))
+async def cmd_unwatch(message: types.Message, command: CommandObject):
+    """Обработчик команды /unwatch <PID>."""
+    if not check_user_access(message.from_user.id):
+        await reply(message, "❌ У вас нет доступа к этому боту.")
+        return
+    args = (command.args or "").strip()
+    if not args.isdigit():
+        await reply(message, "ℹ️ Использование: /unwatch <PID>")
+        return
+    removed = process_watcher.remove(int(args))
+    await reply(message, f"✅ Процесс {args} убран из наблюдения" if removed else f"ℹ️ Процесс {args} не в списке")
+
+
+@router.callback_query(F.data.startswith("proc:"))
+async def cb_proc(callback: types.CallbackQuery):
+    """Кнопки экрана процесса: обновить, следить, не следить."""
+    if not check_user_access(callback.from_user.id):
+        return
+
+    _, action, pid_text = callback.data.split(":", 2)
+    pid = int(pid_text)
+    if action == "watch":
+        try:
+            await process_watcher.add(pid)
+        except (ValueError, psutil.Error):
+            pass  # экран ниже покажет, что процесса нет
+    elif action == "unwatch":
+        process_watcher.remove(pid)
+
+    text, keyboard = await render_process(pid)
+    await show(callback, text, reply_markup=keyboard)
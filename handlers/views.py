@@ -0,0 +1,104 @@
+"""
+Реестр экранов бота: вид → сборщики, форматтер, клавиатура, режим разметки.
+
+Команды, тексты кнопок основной клавиатуры и callback_data ищутся в
+словарях, поэтому маршрутизация не зависит от числа видов, а новый вид —
+это одна запись ``register``. Готовый текст кэшируется на вид, пока
+значения его сборщиков в ``stats_cache`` те же (фоновый сборщик кладёт
+новые объекты на каждый снимок — это и есть версия данных).
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from aiogram import Bot, types
+
+from utils.stats import stats_cache
+
+
+@dataclass(frozen=True)
+class View:
+    """Экран бота."""
+
+    id: str
+    # Имена сборщиков stats_cache; их значения передаются в ``render`` по порядку
+    sources: Tuple[str, ...]
+    render: Callable[..., str]
+    keyboard: Optional[types.InlineKeyboardMarkup] = None
+    parse_mode: Optional[str] = None
+    # Собрать заново, не глядя на TTL (кнопки «Обновить»)
+    force: bool = False
+    header: str = ""
+    # Параметры отправки, собранные один раз
+    options: dict = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        options = {}
+        if self.keyboard is not None:
+            options["reply_markup"] = self.keyboard
+        if self.parse_mode is not None:
+            options["parse_mode"] = self.parse_mode
+        object.__setattr__(self, "options", options)
+
+
+class ViewRegistry:
+    """Виды и их привязки к командам, кнопкам и callback_data."""
+
+    def __init__(self):
+        self.views: Dict[str, View] = {}
+        self.by_command: Dict[str, View] = {}
+        self.by_button: Dict[str, View] = {}
+        self.by_callback: Dict[str, View] = {}
+        # Вид → (значения сборщиков, готовый текст)
+        self._rendered: Dict[str, Tuple[tuple, str]] = {}
+
+    def register(
+        self,
+        view: View,
+        commands: Tuple[str, ...] = (),
+        buttons: Tuple[str, ...] = (),
+        callbacks: Tuple[str, ...] = (),
+    ) -> View:
+        for index, keys in ((self.by_command, commands), (self.by_button, buttons), (self.by_callback, callbacks)):
+            for key in keys:
+                if key in index:
+                    raise ValueError(f"{key!r} уже привязан к виду {index[key].id!r}")
+                index[key] = view
+        self.views[view.id] = view
+        return view
+
+    async def render(self, view: View) -> str:
+        """Текст вида; повторно не форматируется, пока данные те же."""
+        values = tuple(await stats_cache.get_many(*view.sources, force=view.force))
+        cached = self._rendered.get(view.id)
+        if cached is not None and all(a is b for a, b in zip(cached[0], values)):
+            return cached[1]
+        text = view.header + view.render(*values)
+        self._rendered[view.id] = (values, text)
+        return text
+
+    async def match_message(self, message: types.Message, bot: Bot) -> Union[bool, dict]:
+        """Фильтр сообщений: кнопка основной клавиатуры или команда вида."""
+        text = message.text
+        if not text:
+            return False
+        view = self.by_button.get(text)
+        if view is not None:
+            return {"view": view, "is_command": False}
+        words = text[1:].split(maxsplit=1) if text[0] == "/" else None
+        if not words:
+            return False
+        command, _, mention = words[0].partition("@")
+        view = self.by_command.get(command.lower())
+        if view is None:
+            return False
+        if mention and mention.lower() != ((await bot.me()).username or "").lower():
+            return False
+        return {"view": view, "is_command": True}
+
+    def match_callback(self, callback: types.CallbackQuery) -> Union[bool, dict]:
+        """Фильтр нажатий инлайн-кнопок."""
+        view = self.by_callback.get(callback.data)
+        return {"view": view} if view is not None else False
+
+
+views = ViewRegistry()
@@ -1,83 +1,250 @@
 """
 Модуль клавиатур для бота.
+
+Постоянные клавиатуры собираются один раз при импорте и неизменяемы
+(``frozen``): обработчики получают общий объект, а не строят его заново.
 """
+from functools import cached_property, lru_cache
+
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, KeyboardButton, ReplyKeyboardMarkup
+from pydantic import ConfigDict
+
+
+class FrozenInlineKeyboard(InlineKeyboardMarkup):
+    """Неизменяемая инлайн-клавиатура с однажды посчитанным JSON."""
+
+    model_config = ConfigDict(frozen=True)
+
+    @cached_property
+    def json_text(self) -> str:
+        return self.model_dump_json()
+
+
+class FrozenReplyKeyboard(ReplyKeyboardMarkup):
+    """Неизменяемая основная клавиатура."""
+
+    model_config = ConfigDict(frozen=True)
+
+
+MAIN_KEYBOARD = FrozenReplyKeyboard(
+    keyboard=[
+        [
+            KeyboardButton(text="📊 Общий статус"),
+            KeyboardButton(text="🔥 CPU"),
+        ],
+        [
+            KeyboardButton(text="💾 RAM"),
+            KeyboardButton(text="💿 Диски"),
+        ],
+        [
+            KeyboardButton(text="🌐 Сеть"),
+            KeyboardButton(text="⚙️ Система"),
+        ],
+        [
+            KeyboardButton(text="📋 Процессы"),
+            KeyboardButton(text="🔄 Обновить"),
+        ],
+    ],
+    resize_keyboard=True,
+    one_time_keyboard=False,
+)
+
+INLINE_KEYBOARD = FrozenInlineKeyboard(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="📊 Общий статус", callback_data="status_general"),
+            InlineKeyboardButton(text="🔥 CPU", callback_data="status_cpu"),
+        ],
+        [
+            InlineKeyboardButton(text="💾 RAM", callback_data="status_ram"),
+            InlineKeyboardButton(text="💿 Диски", callback_data="status_disk"),
+        ],
+        [
+            InlineKeyboardButton(text="🌐 Сеть", callback_data="status_network"),
+            InlineKeyboardButton(text="⚙️ Система", callback_data="status_system"),
+        ],
+        [
+            InlineKeyboardButton(text="📋 Процессы", callback_data="processes_memory"),
+        ],
+        [
+            InlineKeyboardButton(text="🔄 Обновить", callback_data="refresh"),
+        ],
+    ]
+)
+
+BACK_KEYBOARD = FrozenInlineKeyboard(
+    inline_keyboard=[
+        [InlineKeyboardButton(text="↩️ Назад в меню", callback_data="back_menu")],
+    ]
+)
+
+PROCESSES_KEYBOARD = FrozenInlineKeyboard(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="🔥 По CPU", callback_data="processes_cpu"),
+            InlineKeyboardButton(text="💾 По памяти", callback_data="processes_memory"),
+        ],
+        [InlineKeyboardButton(text="🔄 Обновить", callback_data="processes_refresh")],
+        [
+            InlineKeyboardButton(text="🗂 По приложениям", callback_data="apps_name_memory"),
+            InlineKeyboardButton(text="🧩 Сервисы и контейнеры", callback_data="cgroups_cpu"),
+        ],
+        [InlineKeyboardButton(text="↩️ Назад в меню", callback_data="back_menu")],
+    ]
+)
+
+CGROUPS_KEYBOARD = FrozenInlineKeyboard(
+    inline_keyboard=[
+        [
+            InlineKeyboardButton(text="🔥 По CPU", callback_data="cgroups_cpu"),
+            InlineKeyboardButton(text="💾 По памяти", callback_data="cgroups_memory"),
+            InlineKeyboardButton(text="💿 По диску", callback_data="cgroups_io"),
+        ],
+        [InlineKeyboardButton(text="🔄 Обновить", callback_data="cgroups_refresh")],
+        [InlineKeyboardButton(text="📋 Процессы", callback_data="processes_memory")],
+        [InlineKeyboardButton(text="↩️ Назад в меню", callback_data="back_menu")],
+    ]
+)
 
 
 def get_main_keyboard() -> ReplyKeyboardMarkup:
     """Основная клавиатура с командами."""
-    keyboard = ReplyKeyboardMarkup(
-        keyboard=[
-            [
-                KeyboardButton(text="📊 Общий статус"),
-                KeyboardButton(text="🔥 CPU"),
-            ],
+    return MAIN_KEYBOARD
+
+
+def get_inline_keyboard() -> InlineKeyboardMarkup:
+    """Инлайн-клавиатура для быстрых действий."""
+    return INLINE_KEYBOARD
+
+
+def get_back_keyboard() -> InlineKeyboardMarkup:
+    """Клавиатура с кнопкой «Назад»."""
+    return BACK_KEYBOARD
+
+
+def get_processes_keyboard() -> InlineKeyboardMarkup:
+    """Клавиатура для управления процессами."""
+    return PROCESSES_KEYBOARD
+
+
+APP_GROUP_MODES = (
+    ("name", "По имени"),
+    ("exe", "По программе"),
+    ("tree", "По дереву"),
+)
+
+
+@lru_cache(maxsize=16)
+def get_apps_keyboard(by: str, sort_by: str) -> InlineKeyboardMarkup:
+    """Клавиатура сводки по приложениям: способ группировки и сортировка."""
+    return FrozenInlineKeyboard(
+        inline_keyboard=[
             [
-                KeyboardButton(text="💾 RAM"),
-                KeyboardButton(text="💿 Диски"),
+                InlineKeyboardButton(
+                    text=f"• {title}" if mode == by else title,
+                    callback_data=f"apps_{mode}_{sort_by}",
+                )
+                for mode, title in APP_GROUP_MODES
             ],
             [
-                KeyboardButton(text="🌐 Сеть"),
-                KeyboardButton(text="⚙️ Система"),
+                InlineKeyboardButton(text="🔥 По CPU", callback_data=f"apps_{by}_cpu"),
+                InlineKeyboardButton(text="💾 По памяти", callback_data=f"apps_{by}_memory"),
             ],
+            [InlineKeyboardButton(text="📋 Процессы", callback_data="processes_memory")],
+            [InlineKeyboardButton(text="↩️ Назад в меню", callback_data="back_menu")],
+        ]
+    )
+
+
+LIVE_VIEWS = (
+    ("status", "📊 Статус"),
+    ("cpu", "🔥 CPU"),
+    ("ram", "💾 RAM"),
+    ("network", "🌐 Сеть"),
+)
+
+
+@lru_cache(maxsize=16)
+def get_live_keyboard(current: str) -> InlineKeyboardMarkup:
+    """Клавиатура live-панели: переключение вида и остановка."""
+    return FrozenInlineKeyboard(
+        inline_keyboard=[
             [
-                KeyboardButton(text="📋 Процессы"),
-                KeyboardButton(text="🔄 Обновить"),
+                InlineKeyboardButton(
+                    text=f"• {title}" if view == current else title,
+                    callback_data=f"live:{view}",
+                )
+                for view, title in LIVE_VIEWS
             ],
-        ],
-        resize_keyboard=True,
-        one_time_keyboard=False,
+            [InlineKeyboardButton(text="⏹ Остановить", callback_data="live:stop")],
+        ]
     )
-    return keyboard
 
 
-def get_inline_keyboard() -> InlineKeyboardMarkup:
-    """Инлайн-клавиатура для быстрых действий."""
-    keyboard = InlineKeyboardMarkup(
+def get_fleet_keyboard(hosts: list, page: int, pages: int) -> InlineKeyboardMarkup:
+    """Клавиатура парка: серверы страницы (индекс, подпись) и листание."""
+    rows = [
+        [InlineKeyboardButton(text=title, callback_data=f"fleet:h:{index}") for index, title in hosts[i:i + 2]]
+        for i in range(0, len(hosts), 2)
+    ]
+    navigation = []
+    if page > 0:
+        navigation.append(InlineKeyboardButton(text="◀️", callback_data=f"fleet:p:{page - 1}"))
+    navigation.append(InlineKeyboardButton(text=f"🔄 {page + 1}/{pages}", callback_data=f"fleet:p:{page}"))
+    if page < pages - 1:
+        navigation.append(InlineKeyboardButton(text="▶️", callback_data=f"fleet:p:{page + 1}"))
+    rows.append(navigation)
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+
+@lru_cache(maxsize=1024)
+def get_host_keyboard(index: int) -> InlineKeyboardMarkup:
+    """Инлайн-клавиатура сервера парка (как основная, с адресом сервера)."""
+    prefix = f"fleet:h:{index}"
+    return FrozenInlineKeyboard(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text="📊 Общий статус", callback_data="status_general"),
-                InlineKeyboardButton(text="🔥 CPU", callback_data="status_cpu"),
+                InlineKeyboardButton(text="📊 Общий статус", callback_data=f"{prefix}:status"),
+                InlineKeyboardButton(text="🔥 CPU", callback_data=f"{prefix}:cpu"),
             ],
             [
-                InlineKeyboardButton(text="💾 RAM", callback_data="status_ram"),
-                InlineKeyboardButton(text="💿 Диски", callback_data="status_disk"),
+                InlineKeyboardButton(text="💾 RAM", callback_data=f"{prefix}:ram"),
+                InlineKeyboardButton(text="💿 Диски", callback_data=f"{prefix}:disk"),
             ],
             [
-                InlineKeyboardButton(text="🌐 Сеть", callback_data="status_network"),
-                InlineKeyboardButton(text="⚙️ Система", callback_data="status_system"),
+                InlineKeyboardButton(text="🌐 Сеть", callback_data=f"{prefix}:network"),
+                InlineKeyboardButton(text="⚙️ Система", callback_data=f"{prefix}:system"),
             ],
             [
-                InlineKeyboardButton(text="📋 Процессы", callback_data="processes_memory"),
+                InlineKeyboardButton(text="📋 Процессы", callback_data=f"{prefix}:processes"),
             ],
             [
-                InlineKeyboardButton(text="🔄 Обновить", callback_data="refresh"),
+                InlineKeyboardButton(text="↩️ К списку серверов", callback_data="fleet:p:0"),
             ],
         ]
     )
-    return keyboard
 
 
-def get_back_keyboard() -> InlineKeyboardMarkup:
-    """Клавиатура с кнопкой «Назад»."""
-    keyboard = InlineKeyboardMarkup(
+@lru_cache(maxsize=1024)
+def get_proc_keyboard(pid: int, watched: bool) -> InlineKeyboardMarkup:
+    """Клавиатура экрана процесса: обновить, следить или перестать."""
+    watch = (
+        InlineKeyboardButton(text="🚫 Не следить", callback_data=f"proc:unwatch:{pid}")
+        if watched
+        else InlineKeyboardButton(text="👁 Следить", callback_data=f"proc:watch:{pid}")
+    )
+    return FrozenInlineKeyboard(
         inline_keyboard=[
+            [InlineKeyboardButton(text="🔄 Обновить", callback_data=f"proc:show:{pid}"), watch],
             [InlineKeyboardButton(text="↩️ Назад в меню", callback_data="back_menu")],
         ]
     )
-    return keyboard
 
 
-def get_processes_keyboard() -> InlineKeyboardMarkup:
-    """Клавиатура для управления процессами."""
-    keyboard = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [
-                InlineKeyboardButton(text="🔥 По CPU", callback_data="processes_cpu"),
-                InlineKeyboardButton(text="💾 По памяти", callback_data="processes_memory"),
-            ],
-            [InlineKeyboardButton(text="🔄 Обновить", callback_data="processes_refresh")],
-            [InlineKeyboardButton(text="↩️ Назад в меню", callback_data="back_menu")],
-        ]
-    )
-    return keyboard
+def get_proc_list_keyboard(processes: list) -> InlineKeyboardMarkup:
+    """Выбор процесса из найденных по имени: (PID, подпись)."""
+    rows = [
+        [InlineKeyboardButton(text=title, callback_data=f"proc:show:{pid}") for pid, title in processes[i:i + 2]]
+        for i in range(0, len(processes), 2)
+    ]
+    return InlineKeyboardMarkup(inline_keyboard=rows)
@@ -60,7 +60,8 @@ print_config_menu() {
     echo "  3. 📝 Редактировать .env файл"
     echo "  4. 🔍 Просмотреть текущую конфигурацию"
     echo "  5. 🔄 Сбросить конфигурацию"
-    echo "  6. ◀️  Назад в главное меню"
+    echo "  6. 🪝 Режим получения обновлений (polling/webhook)"
+    echo "  7. ◀️  Назад в главное меню"
 }
 
 print_users_menu() {
@@ -234,6 +235,7 @@ add_admin_user() {
     success "Администратор добавлен"
     info "ID: $user_id"
     info "Подпись: $user_name"
+    info "Запущенный бот применит изменение без перезапуска"
 }
 
 edit_env_file() {
@@ -243,6 +245,42 @@ edit_env_file() {
     success "Файл сохранён"
 }
 
+set_bot_mode() {
+    local current_mode
+    current_mode=$(get_env_value "BOT_MODE")
+    info "Текущий режим: ${current_mode:-polling}"
+
+    echo -e "\n${CYAN}Выберите режим (1 - polling, 2 - webhook):${NC}"
+    read -r mode_choice
+
+    case $mode_choice in
+        1)
+            set_env_value "BOT_MODE" "polling"
+            success "Режим: polling"
+            ;;
+        2)
+            echo -e "\n${CYAN}Внешний адрес бота (https://bot.example.com, пусто — только локально):${NC}"
+            read -r webhook_url
+            echo -e "\n${CYAN}Локальный адрес сервера (host:port) [127.0.0.1:8080]:${NC}"
+            read -r webhook_listen
+
+            set_env_value "BOT_MODE" "webhook"
+            set_env_value "WEBHOOK_URL" "$webhook_url"
+            set_env_value "WEBHOOK_LISTEN" "${webhook_listen:-127.0.0.1:8080}"
+            if [ -z "$(get_env_value "WEBHOOK_SECRET")" ]; then
+                set_env_value "WEBHOOK_SECRET" "$(head -c 24 /dev/urandom | base64 | tr '+/' '-_' | tr -d '=')"
+            fi
+            success "Режим: webhook"
+            info "Перенаправьте HTTPS-запросы на ${webhook_listen:-127.0.0.1:8080} (nginx, caddy и т.п.)"
+            ;;
+        *)
+            warning "Операция отменена"
+            return
+            ;;
+    esac
+    info "Режим применится после перезапуска бота"
+}
+
 reset_config() {
     echo -e "\n${YELLOW}⚠️  Вы уверены, что хотите сбросить конфигурацию? (y/n)${NC}"
     read -r confirm
@@ -534,6 +572,14 @@ run_bot() {
     python main.py
 }
 
+export_metrics() {
+    # Выгрузка истории метрик из хранилища без запуска бота: окно и опции export.py
+    if [ -d "$VENV_DIR" ]; then
+        source "$VENV_DIR/bin/activate"
+    fi
+    python export.py "$@"
+}
+
 run_bot_background() {
     init_env_file
     
@@ -613,8 +659,8 @@ stop_bot() {
     # Попытка мягкой остановки
     kill -TERM "$bot_pid" 2>/dev/null || true
     
-    # Ждём 5 секунд
-    for i in {1..5}; do
+    # Ждём до 10 секунд: в режиме webhook бот дорабатывает начатые обновления
+    for i in {1..10}; do
         if ! ps -p "$bot_pid" > /dev/null 2>&1; then
             success "Бот остановлен"
             rm -f "$BOT_PID_FILE"
@@ -679,7 +725,8 @@ config_menu_handler() {
             3) edit_env_file ;;
             4) show_config ;;
             5) reset_config ;;
-            6) break ;;
+            6) set_bot_mode ;;
+            7) break ;;
             *) error "Неверный выбор" ;;
         esac
     done
@@ -789,6 +836,7 @@ if [ $# -gt 0 ]; then
             echo "  --logs           Показать логи бота"
             echo "  --config         Открыть меню конфигурации"
             echo "  --users          Открыть меню пользователей"
+            echo "  --export [окно]  Выгрузить историю метрик (например: --export 7d --format columns)"
             echo "  (пусто)          Открыть интерактивное меню"
             echo ""
             ;;
@@ -823,6 +871,10 @@ if [ $# -gt 0 ]; then
         --users)
             users_menu_handler
             ;;
+        --export)
+            shift
+            export_metrics "$@"
+            ;;
         *)
             error "Неизвестная опция: $1"
             echo "Используйте --help для справки"
@@ -3,12 +3,34 @@
 """
 import logging
 import asyncio
+import signal
 from aiogram import Bot, Dispatcher
+from aiogram.exceptions import TelegramAPIError
 from aiogram.filters import Command
 from aiogram.types import Message
 
-from config import BOT_TOKEN, ALLOWED_USERS
+from config import BOT_TOKEN, BOT_MODE, METRICS_LISTEN
 from handlers.commands import router
+from handlers.live import router as live_router, live_dashboard
+from handlers.fleet import router as fleet_router
+from handlers.perf import router as perf_router
+from handlers.charts import router as chart_router
+from handlers.proc import router as proc_router
+from handlers.export import router as export_router
+from utils.sampler import sampler
+from utils.history import METRICS, history
+from utils.charts import charts
+from utils.storage import open_default_storage
+from utils.processes import process_table
+from utils.watch import process_watcher
+from utils.cgroups import cgroup_table
+from utils.alerts import alert_engine
+from utils.outbound import outbound
+from utils.access import access
+from middlewares.access import AccessMiddleware
+from utils.fleet import fleet
+from utils.hostfacts import install_sighup_handler
+from utils.perf import perf, loop_monitor
 
 # Настройка логирования
 logging.basicConfig(
@@ -19,8 +41,41 @@ logger = logging.getLogger(__name__)
 
 
 async def check_access(user_id: int) -> bool:
-    """Проверка доступа пользователя."""
-    return not ALLOWED_USERS or user_id in ALLOWED_USERS
+    """Проверка доступа пользователя (по списку, перечитываемому из .env)."""
+    return access.allowed(user_id)
+
+
+async def broadcast(text: str) -> None:
+    """Отправить сообщение всем разрешённым пользователям (через общую очередь)."""
+    # Список на момент рассылки: он мог обновиться из .env
+    recipients = sorted(access.users)
+    results = await asyncio.gather(
+        *(outbound.send(user_id, text) for user_id in recipients),
+        return_exceptions=True,
+    )
+    for user_id, result in zip(recipients, results):
+        if isinstance(result, TelegramAPIError):
+            logger.warning(f"⚠️ Не удалось отправить уведомление {user_id}: {result}")
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot) -> None:
+    """Принимать обновления через webhook до SIGTERM/SIGINT, затем дождаться начатых."""
+    from utils.webhook import WebhookServer
+
+    server = WebhookServer(dp, bot)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    await dp.emit_startup(bot=bot)
+    await server.start()
+    try:
+        await stop.wait()
+        logger.info("🛑 Получен сигнал остановки")
+    finally:
+        await server.stop()
+        await dp.emit_shutdown(bot=bot)
 
 
 async def main():
@@ -32,17 +87,118 @@ async def main():
     bot = Bot(token=BOT_TOKEN)
     dp = Dispatcher()
 
+    # Посторонние и флуд отсекаются до маршрутизации
+    dp.update.outer_middleware(AccessMiddleware())
+
     # Регистрация роутера
     dp.include_router(router)
+    dp.include_router(live_router)
+    dp.include_router(fleet_router)
+    dp.include_router(perf_router)
+    dp.include_router(chart_router)
+    dp.include_router(proc_router)
+    dp.include_router(export_router)
+
+    # Замеры обработчиков, запросов к Bot API и задержки event loop
+    if perf.enabled:
+        from middlewares.perf import ApiTimingMiddleware, HandlerTimingMiddleware
+
+        dp.message.middleware(HandlerTimingMiddleware())
+        dp.callback_query.middleware(HandlerTimingMiddleware())
+        bot.session.middleware(ApiTimingMiddleware())
+
+    # Процессы отрисовки графиков форкаются сейчас, до потоков сборщиков
+    charts.start()
 
     logger.info("✅ Бот запущен...")
-    logger.info(f"👥 Разрешённые пользователи: {ALLOWED_USERS or 'Все'}")
+    logger.info(f"👥 Разрешённые пользователи: {sorted(access.users) or 'Все'}")
+
+    # Постоянное хранилище: история переживает перезапуск бота
+    storage = None
+    restore_task = None
+    try:
+        storage = open_default_storage(list(METRICS))
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Хранилище метрик недоступно: {e}")
+    if storage is not None:
+        history.attach_storage(storage)
+        restore_task = asyncio.create_task(history.restore(storage))
+        restore_task.add_done_callback(
+            lambda task: task.cancelled() or task.exception()
+            or logger.info(f"💽 Восстановлено записей истории: {task.result()}")
+        )
+
+    # Все исходящие сообщения идут через очередь с ограничением темпа
+    outbound.attach(bot)
+
+    # Фоновый сбор метрик: обработчики читают готовый снимок,
+    # каждый снимок попадает в историю
+    sampler.subscribe(history.record)
+    sampler.subscribe(live_dashboard.on_snapshot)
+    # Наблюдаемые процессы опрашиваются в такт сборщику, вне event loop
+    sampler.subscribe(process_watcher.on_snapshot)
+
+    # Алерты рассылаются разрешённым пользователям
+    if alert_engine.rules:
+        if not access.users:
+            logger.warning("⚠️ Правила алертов заданы, но ALLOWED_USERS пуст — уведомления некому отправлять")
+        alert_engine.attach(broadcast)
+        sampler.subscribe(alert_engine.on_snapshot)
+        alert_engine.start()
+        logger.info(f"🚨 Правил алертов: {len(alert_engine.rules)}")
+
+    # SIGHUP перечитывает сведения о сервере и таблицу монтирования
+    install_sighup_handler()
+
+    sampler.start()
+    process_table.start()
+    cgroup_table.start()
+    if perf.enabled:
+        loop_monitor.start()
+
+    # Опрос агентов парка серверов
+    if fleet.hosts:
+        fleet.start()
+        logger.info(f"🛰️ Агентов в парке: {len(fleet.hosts)}")
+
+    # Эндпоинт /metrics для Prometheus (aiohttp.web грузится только при нём)
+    exporter = None
+    if METRICS_LISTEN:
+        from utils.prometheus import exporter
+
+        try:
+            await exporter.start(METRICS_LISTEN)
+        except OSError as e:
+            logger.error(f"❌ Не удалось открыть {METRICS_LISTEN} для /metrics: {e}")
 
     try:
-        await dp.start_polling(bot)
+        if BOT_MODE == "webhook":
+            await run_webhook(dp, bot)
+        else:
+            # После работы в режиме webhook getUpdates без этого вернёт конфликт
+            try:
+                await bot.delete_webhook()
+            except TelegramAPIError as e:
+                logger.warning(f"⚠️ Не удалось снять webhook: {e}")
+            await dp.start_polling(bot)
     except KeyboardInterrupt:
         logger.info("🛑 Бот остановлен пользователем")
     finally:
+        await sampler.stop()
+        await process_table.stop()
+        await process_watcher.stop()
+        await cgroup_table.stop()
+        await alert_engine.stop()
+        await fleet.stop()
+        if exporter is not None:
+            await exporter.stop()
+        await loop_monitor.stop()
+        charts.stop()
+        await outbound.stop()
+        if restore_task is not None:
+            restore_task.cancel()
+        if storage is not None:
+            storage.close()
         await bot.session.close()
         logger.info("👋 Сессия бота закрыта")
 
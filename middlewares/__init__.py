@@ -0,0 +1,3 @@
+"""
+Промежуточные обработчики (middleware) бота.
+"""
@@ -0,0 +1,65 @@
+"""
+Проверка доступа и защита от флуда до маршрутизации обновлений.
+"""
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import TelegramObject, Update, User
+
+from utils.access import AccessList, FloodGuard, access, flood_guard
+from utils.outbound import outbound
+
+logger = logging.getLogger(__name__)
+
+
+class AccessMiddleware(BaseMiddleware):
+    """Внешний middleware на ``dp.update``.
+
+    Обновления от посторонних отбрасываются молча (в том числе поддельные
+    нажатия кнопок), обновления сверх лимита пользователя — с одним
+    предупреждением на всплеск.
+    """
+
+    def __init__(self, access_list: AccessList = access, guard: FloodGuard = flood_guard):
+        self.access = access_list
+        self.guard = guard
+        self.stats = {"denied": 0, "limited": 0}
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        self.access.refresh()
+        user: User = data.get("event_from_user")
+        if user is None:
+            # Обновления без пользователя (посты каналов и т.п.) — только для открытого бота
+            return await handler(event, data) if not self.access.users else None
+
+        if not self.access.allowed(user.id):
+            self.stats["denied"] += 1
+            logger.debug(f"🚫 Обновление от {user.id} отброшено: нет доступа")
+            return None
+
+        if not self.guard.allow(user.id):
+            self.stats["limited"] += 1
+            if self.guard.should_warn(user.id):
+                await self._warn(event)
+            return None
+
+        return await handler(event, data)
+
+    @staticmethod
+    async def _warn(event: TelegramObject) -> None:
+        if not isinstance(event, Update):
+            return
+        try:
+            if event.callback_query is not None:
+                await event.callback_query.answer("⏳ Слишком часто, подождите немного")
+            elif event.message is not None:
+                await outbound.send(event.message.chat.id, "⏳ Слишком много запросов, подождите немного")
+        except TelegramAPIError as e:
+            logger.debug(f"Предупреждение о флуде не отправлено: {e}")
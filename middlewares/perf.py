@@ -0,0 +1,45 @@
+"""
+Замеры времени обработчиков и запросов к Bot API.
+"""
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types import TelegramObject
+
+from utils.perf import perf
+
+
+class HandlerTimingMiddleware(BaseMiddleware):
+    """Внутренний middleware: гистограмма на каждый обработчик."""
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        handler_object = data.get("handler")
+        view = data.get("view")
+        if view is not None:
+            # Экраны реестра обслуживает один обработчик — различаем по виду
+            name = "handler.view." + view.id
+        else:
+            name = "handler." + (handler_object.callback.__name__ if handler_object else type(event).__name__)
+        started = time.perf_counter_ns()
+        try:
+            return await handler(event, data)
+        finally:
+            perf.record(name, time.perf_counter_ns() - started)
+
+
+class ApiTimingMiddleware(BaseRequestMiddleware):
+    """Middleware сессии: гистограмма на каждый метод Bot API."""
+
+    async def __call__(self, make_request, bot, method):
+        started = time.perf_counter_ns()
+        try:
+            return await make_request(bot, method)
+        finally:
+            perf.record("api." + type(method).__name__, time.perf_counter_ns() - started)
@@ -0,0 +1,136 @@
+"""
+Списки доступа и защита от флуда.
+
+Разрешённые пользователи и администраторы хранятся во ``frozenset`` и
+перечитываются из .env, когда файл меняется (например, launcher.sh
+добавил пользователя), — без перезапуска бота. Файл проверяется не чаще
+раза в ``ACCESS_RELOAD_INTERVAL`` секунд: проверка — один ``stat``.
+
+Каждому пользователю положен token bucket: ``USER_RATE_LIMIT`` запросов
+в секунду с всплеском до ``USER_RATE_BURST``. Всё, что сверх, отбрасывается
+до маршрутизации и не запускает сборщики.
+"""
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from dotenv import dotenv_values
+
+from config import (
+    ACCESS_RELOAD_INTERVAL,
+    ADMIN_USERS,
+    ALLOWED_USERS,
+    ENV_FILE,
+    USER_RATE_BURST,
+    USER_RATE_LIMIT,
+    parse_user_ids,
+)
+from utils.outbound import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Сверх стольких корзин неактивные (полностью восстановившиеся) удаляются
+_MAX_BUCKETS = 10_000
+
+
+class AccessList:
+    """Разрешённые пользователи и администраторы с перечитыванием .env."""
+
+    def __init__(
+        self,
+        users=ALLOWED_USERS,
+        admins=ADMIN_USERS,
+        env_file: Path = ENV_FILE,
+        reload_interval: float = ACCESS_RELOAD_INTERVAL,
+    ):
+        self.users: FrozenSet[int] = frozenset(users)
+        self.admins: FrozenSet[int] = frozenset(admins)
+        self.env_file = Path(env_file)
+        self.reload_interval = reload_interval
+        self._checked_at = time.monotonic()
+        self._signature = self._stat()
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.env_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def refresh(self, now: Optional[float] = None) -> bool:
+        """Перечитать .env, если он изменился. Возвращает True при перечитывании."""
+        now = time.monotonic() if now is None else now
+        if now - self._checked_at < self.reload_interval:
+            return False
+        self._checked_at = now
+        signature = self._stat()
+        if signature == self._signature or signature is None:
+            return False
+        self._signature = signature
+        self.reload()
+        return True
+
+    def reload(self) -> None:
+        try:
+            values = dotenv_values(self.env_file)
+        except OSError as e:
+            logger.warning(f"⚠️ Не удалось перечитать {self.env_file}: {e}")
+            return
+        # Ключа нет в файле — остаётся прежнее значение (например, из окружения)
+        if "ALLOWED_USERS" in values:
+            self.users = frozenset(parse_user_ids(values["ALLOWED_USERS"] or ""))
+        if "ADMIN_USERS" in values:
+            self.admins = frozenset(parse_user_ids(values["ADMIN_USERS"] or ""))
+        logger.info(f"🔐 Списки доступа перечитаны: пользователей {len(self.users) or 'все'}, "
+                    f"администраторов {len(self.admins) or 'как пользователей'}")
+
+    def allowed(self, user_id: int) -> bool:
+        return not self.users or user_id in self.users
+
+    def is_admin(self, user_id: int) -> bool:
+        return user_id in (self.admins or self.users)
+
+
+class FloodGuard:
+    """Token bucket на пользователя."""
+
+    def __init__(self, rate: float = USER_RATE_LIMIT, burst: float = USER_RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[int, TokenBucket] = {}
+        # Пользователи, уже предупреждённые о текущем всплеске
+        self._warned: set = set()
+
+    def allow(self, user_id: int, now: Optional[float] = None) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            if len(self._buckets) >= _MAX_BUCKETS:
+                self._prune(now)
+            bucket = self._buckets[user_id] = TokenBucket(self.rate, self.burst, now)
+        if bucket.delay(now) > 0:
+            return False
+        bucket.take(now)
+        self._warned.discard(user_id)
+        return True
+
+    def should_warn(self, user_id: int) -> bool:
+        """Предупредить один раз за всплеск, а не на каждое отброшенное обновление."""
+        if user_id in self._warned:
+            return False
+        self._warned.add(user_id)
+        return True
+
+    def _prune(self, now: float) -> None:
+        for user_id, bucket in list(self._buckets.items()):
+            if bucket.delay(now) == 0 and bucket.tokens >= bucket.capacity:
+                del self._buckets[user_id]
+                self._warned.discard(user_id)
+
+
+access = AccessList()
+flood_guard = FloodGuard()
@@ -0,0 +1,278 @@
+"""
+Движок алертов по порогам.
+
+Правила задаются строками вида::
+
+    cpu > 90 for 60s
+    avg(cpu, 5m) > 80
+    disk:/ > 95
+    ram_available < 1GB
+    net_recv > 100MB for 30s
+
+Правила проверяются на каждом шаге фонового сборщика. Состояние каждого
+правила обновляется за O(1): «for» хранит момент начала нарушения,
+``avg(...)`` — скользящую сумму окна. Повторные уведомления подавляются
+гистерезисом и паузой между срабатываниями.
+"""
+import asyncio
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from config import ALERT_RULES, ALERT_COOLDOWN, ALERT_HYSTERESIS
+from utils.history import parse_window
+from utils.stats import stats_cache
+
+logger = logging.getLogger(__name__)
+
+# Метрика → (подпись, функция получения значения из снимка)
+_METRICS: Dict[str, Tuple[str, Callable]] = {
+    "cpu": ("CPU", lambda s: s.cpu["percent"]),
+    "ram": ("RAM", lambda s: s.ram["percent"]),
+    "ram_available": ("Свободно RAM", lambda s: s.ram["available"] * 1024**3),
+    "swap": ("Swap", lambda s: s.swap["percent"]),
+    "disk": ("Диск /", lambda s: s.root_disk["percent"] if s.root_disk else None),
+    "net_sent": ("Сеть ↑", lambda s: s.network["rates"]["bytes_sent"]),
+    "net_recv": ("Сеть ↓", lambda s: s.network["rates"]["bytes_recv"]),
+}
+
+_UNITS = {"": 1, "%": 1, "B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+
+_RULE_RE = re.compile(
+    r"^(?:avg\(\s*(?P<avg_metric>[\w:/.-]+)\s*,\s*(?P<avg_window>\w+)\s*\)|(?P<metric>[\w:/.-]+))"
+    r"\s*(?P<op>>=|<=|>|<)\s*(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>%|[KMGT]?B)?"
+    r"(?:\s+for\s+(?P<duration>\w+))?$",
+    re.IGNORECASE,
+)
+
+OK, PENDING, FIRING = "ok", "pending", "firing"
+
+
+class RuleError(ValueError):
+    """Ошибка разбора правила."""
+
+
+@dataclass
+class Rule:
+    """Правило алерта и его текущее состояние."""
+
+    text: str
+    metric: str
+    op: str
+    threshold: float
+    duration: float = 0.0
+    window: float = 0.0
+
+    state: str = OK
+    since: Optional[float] = None
+    last_value: Optional[float] = None
+    last_notified: float = float("-inf")
+    notified: bool = False
+    _samples: Deque[Tuple[float, float]] = field(default_factory=deque, repr=False)
+    _window_sum: float = 0.0
+
+    @property
+    def label(self) -> str:
+        if self.metric.startswith("disk:"):
+            return f"Диск {self.metric[5:]}"
+        return _METRICS[self.metric][0]
+
+    def breached(self, value: float) -> bool:
+        """Нарушен ли порог (с гистерезисом для уже сработавшего правила)."""
+        threshold = self.threshold
+        if self.state == FIRING:
+            # Возврат в норму только после отступа от порога
+            margin = abs(threshold) * ALERT_HYSTERESIS
+            threshold = threshold - margin if self.op[0] == ">" else threshold + margin
+        if self.op == ">":
+            return value > threshold
+        if self.op == ">=":
+            return value >= threshold
+        if self.op == "<":
+            return value < threshold
+        return value <= threshold
+
+    def aggregate(self, ts: float, value: float) -> float:
+        """Скользящее среднее окна за O(1) амортизированно."""
+        if not self.window:
+            return value
+        self._samples.append((ts, value))
+        self._window_sum += value
+        while self._samples and self._samples[0][0] <= ts - self.window:
+            self._window_sum -= self._samples.popleft()[1]
+        return self._window_sum / len(self._samples)
+
+
+def parse_rule(text: str) -> Rule:
+    """Разобрать строку правила."""
+    match = _RULE_RE.match(text.strip())
+    if not match:
+        raise RuleError(f"Не удалось разобрать правило: {text!r}")
+
+    metric = (match.group("avg_metric") or match.group("metric")).lower()
+    if metric not in _METRICS and not metric.startswith("disk:"):
+        raise RuleError(f"Неизвестная метрика в правиле {text!r}: {metric}")
+
+    unit = (match.group("unit") or "").upper()
+    threshold = float(match.group("value")) * _UNITS[unit]
+
+    duration = 0.0
+    if match.group("duration"):
+        duration = parse_window(match.group("duration"))
+        if duration is None:
+            raise RuleError(f"Неверная длительность в правиле {text!r}")
+
+    window = 0.0
+    if match.group("avg_window"):
+        window = parse_window(match.group("avg_window"))
+        if window is None:
+            raise RuleError(f"Неверное окно в правиле {text!r}")
+
+    return Rule(
+        text=text.strip(),
+        metric=metric,
+        op=match.group("op"),
+        threshold=threshold,
+        duration=float(duration),
+        window=float(window),
+    )
+
+
+def parse_rules(raw: str) -> List[Rule]:
+    """Разобрать правила, разделённые «;» (ошибочные пропускаются с записью в лог)."""
+    rules = []
+    for chunk in raw.split(";"):
+        if not chunk.strip():
+            continue
+        try:
+            rules.append(parse_rule(chunk))
+        except RuleError as e:
+            logger.error(f"❌ {e}")
+    return rules
+
+
+def format_value(metric: str, value: float) -> str:
+    """Значение метрики в единицах, удобных для чтения."""
+    if metric == "ram_available":
+        return f"{value / 1024**3:.2f} GB"
+    if metric.startswith("net_"):
+        return f"{value / 1024**2:.2f} MB/s"
+    return f"{value:.1f}%"
+
+
+class AlertEngine:
+    """Проверка правил на каждом снимке и рассылка уведомлений."""
+
+    def __init__(self, rules: Sequence[Rule] = (), cooldown: float = ALERT_COOLDOWN):
+        self.rules = list(rules)
+        self.cooldown = cooldown
+        self._send: Optional[Callable] = None
+        self._task: Optional[asyncio.Task] = None
+        # Отправляемые уведомления: держим ссылки, пока задачи не завершатся
+        self._sending: set = set()
+
+    def attach(self, send: Callable) -> None:
+        """Указать корутину рассылки уведомлений ``send(text)``."""
+        self._send = send
+
+    @property
+    def needs_disks(self) -> bool:
+        """Есть ли правила по точкам монтирования, кроме корня."""
+        return any(rule.metric.startswith("disk:") and rule.metric != "disk:/" for rule in self.rules)
+
+    def _value(self, rule: Rule, snapshot, disks: Dict[str, float]) -> Optional[float]:
+        if rule.metric == "disk:/":
+            return _METRICS["disk"][1](snapshot)
+        if rule.metric.startswith("disk:"):
+            return disks.get(rule.metric[5:])
+        return _METRICS[rule.metric][1](snapshot)
+
+    @staticmethod
+    def _disk_index() -> Dict[str, float]:
+        # Заполненность точек монтирования из кэша (один проход на шаг)
+        return {
+            disk["mountpoint"]: disk["percent"]
+            for disk in stats_cache.peek("disk") or ()
+            if disk.get("status") == "ok"
+        }
+
+    def evaluate(self, snapshot) -> List[str]:
+        """Проверить все правила по снимку; вернуть тексты уведомлений."""
+        ts = snapshot.timestamp
+        disks = self._disk_index() if self.needs_disks else {}
+        messages = []
+        for rule in self.rules:
+            value = self._value(rule, snapshot, disks)
+            if value is None:
+                continue
+            value = rule.aggregate(ts, value)
+            rule.last_value = value
+            message = self._transition(rule, ts, value)
+            if message:
+                messages.append(message)
+        return messages
+
+    def _transition(self, rule: Rule, ts: float, value: float) -> Optional[str]:
+        if rule.breached(value):
+            if rule.state == OK:
+                rule.state = PENDING
+                rule.since = ts
+            if rule.state == PENDING and ts - rule.since >= rule.duration:
+                rule.state = FIRING
+            # Пауза между срабатываниями: частый «дребезг» не спамит чат.
+            # Сработавший в паузу алерт уведомляет, как только она пройдёт
+            if rule.state == FIRING and not rule.notified:
+                if ts - rule.last_notified >= self.cooldown:
+                    rule.last_notified = ts
+                    rule.notified = True
+                    return f"🚨 Алерт: {rule.text}\n{rule.label}: {format_value(rule.metric, value)}"
+            return None
+
+        was_notified = rule.state == FIRING and rule.notified
+        rule.state = OK
+        rule.since = None
+        rule.notified = False
+        if was_notified:
+            return f"✅ Норма: {rule.text}\n{rule.label}: {format_value(rule.metric, value)}"
+        return None
+
+    def start(self, disk_interval: float = 30) -> None:
+        """Периодически обновлять данные по дискам, если на них есть правила."""
+        if self.needs_disks and self._task is None:
+            self._task = asyncio.create_task(self._refresh_disks(disk_interval), name="alert-disks")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _refresh_disks(self, interval: float) -> None:
+        while True:
+            try:
+                await stats_cache.get("disk")
+            except asyncio.TimeoutError:
+                logger.warning("⏳ Обновление дисков для алертов не уложилось в таймаут")
+            except Exception:
+                logger.exception("Ошибка обновления дисков для алертов")
+            await asyncio.sleep(interval)
+
+    def on_snapshot(self, snapshot) -> None:
+        """Подписчик ``sampler``: проверить правила и разослать уведомления."""
+        if not self.rules:
+            return
+        for message in self.evaluate(snapshot):
+            logger.warning(message.replace("\n", " | "))
+            if self._send is not None:
+                task = asyncio.get_running_loop().create_task(self._send(message))
+                self._sending.add(task)
+                task.add_done_callback(self._sending.discard)
+
+
+alert_engine = AlertEngine(parse_rules(ALERT_RULES))
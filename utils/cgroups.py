@@ -0,0 +1,240 @@
+"""
+Ресурсы сервисов и контейнеров по cgroup v2.
+
+Читаются только файлы дерева cgroup (``cpu.stat``, ``memory.current``,
+``memory.stat``, ``io.stat``), а не каждый процесс. Счётчики cgroup v2
+иерархические, поэтому отчёт строится по листьям дерева, обрезанного на
+глубине ``CGROUP_DEPTH`` (``system.slice/nginx.service``,
+``system.slice/docker-<id>.scope``, ``user.slice/user-1000.slice``):
+так ничего не учитывается дважды. Скорости CPU и ввода-вывода — разница
+счётчиков между проходами; список каталогов перечитывается раз в
+``CGROUP_RESCAN_INTERVAL`` секунд или когда cgroup исчезла.
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+from config import CGROUP_DEPTH, CGROUP_RESCAN_INTERVAL, CGROUP_ROOT, CGROUP_SCAN_INTERVAL
+from utils.perf import timed
+
+logger = logging.getLogger(__name__)
+
+CgroupRow = namedtuple(
+    "CgroupRow", "path name kind cpu_percent memory anon file io_read_bps io_write_bps"
+)
+
+_SORT_KEYS = {
+    "cpu": lambda row: row.cpu_percent or 0.0,
+    "memory": lambda row: row.memory or 0,
+    "io": lambda row: (row.io_read_bps or 0.0) + (row.io_write_bps or 0.0),
+}
+
+
+def is_available(root: str = CGROUP_ROOT) -> bool:
+    """Смонтирована ли по ``root`` единая иерархия cgroup v2."""
+    return os.path.exists(os.path.join(root, "cgroup.controllers"))
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, 65536)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def _keyed(data: Optional[bytes], *keys: bytes) -> Dict[bytes, int]:
+    """Значения ``key value`` из cpu.stat / memory.stat."""
+    result = {}
+    if data:
+        for line in data.splitlines():
+            key, _, value = line.partition(b" ")
+            if key in keys:
+                result[key] = int(value)
+    return result
+
+
+def _io_totals(data: Optional[bytes]) -> Tuple[Optional[int], Optional[int]]:
+    """Сумма rbytes/wbytes по всем устройствам из io.stat."""
+    if data is None:
+        return None, None
+    read = write = 0
+    for line in data.splitlines():
+        for field in line.split()[1:]:
+            if field.startswith(b"rbytes="):
+                read += int(field[7:])
+            elif field.startswith(b"wbytes="):
+                write += int(field[7:])
+    return read, write
+
+
+def _rate(sample: tuple, last: Optional[tuple], index: int) -> Optional[float]:
+    """Скорость счётчика ``index`` между проходами (первый элемент — время)."""
+    if last is None or sample[index] is None or last[index] is None or sample[0] <= last[0]:
+        return None
+    return max(0.0, (sample[index] - last[index]) / (sample[0] - last[0]))
+
+
+def unit_name(path: str) -> Tuple[str, str]:
+    """Короткое имя и вид cgroup: service, scope, slice или container."""
+    name = path.rsplit("/", 1)[-1]
+    for runtime in ("docker-", "libpod-", "cri-containerd-", "crio-"):
+        if name.startswith(runtime) and name.endswith(".scope"):
+            return f"{runtime}{name[len(runtime):len(runtime) + 12]}", "container"
+    parent = path.rsplit("/", 2)[-2] if "/" in path else ""
+    if parent in ("docker", "lxc") or parent.startswith("kubepods"):
+        return f"{parent}/{name[:12]}", "container"
+    for suffix in ("service", "scope", "slice"):
+        if name.endswith("." + suffix):
+            return name, suffix
+    return name, "cgroup"
+
+
+class CgroupTable:
+    """Листья дерева cgroup и их скорости между проходами."""
+
+    def __init__(
+        self,
+        root: str = CGROUP_ROOT,
+        depth: int = CGROUP_DEPTH,
+        interval: float = CGROUP_SCAN_INTERVAL,
+        rescan_interval: float = CGROUP_RESCAN_INTERVAL,
+    ):
+        self.root = root.rstrip("/")
+        self.depth = depth
+        self.interval = interval
+        self.rescan_interval = rescan_interval
+        self.available = is_available(self.root)
+        # (относительный путь, inode каталога): пересозданная cgroup — новый ключ
+        self._units: List[Tuple[str, int]] = []
+        self._scanned_at: Optional[float] = None
+        # ключ → (время, usage_usec, rbytes, wbytes)
+        self._counters: Dict[Tuple[str, int], tuple] = {}
+        self._rows: List[CgroupRow] = []
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def rows(self) -> List[CgroupRow]:
+        """Строки последнего прохода (список заменяется целиком)."""
+        return self._rows
+
+    def scan(self) -> List[Tuple[str, int]]:
+        """Листья дерева до глубины ``depth`` (только каталоги cgroup)."""
+        units = []
+        stack = [(self.root, "", 0, 0)]
+        while stack:
+            path, relative, level, inode = stack.pop()
+            if relative and level >= self.depth:
+                units.append((relative, inode))
+                continue
+            try:
+                with os.scandir(path) as entries:
+                    children = [entry for entry in entries if entry.is_dir(follow_symlinks=False)]
+            except OSError:
+                continue
+            if relative and not children:
+                units.append((relative, inode))
+                continue
+            for entry in children:
+                child = f"{relative}/{entry.name}" if relative else entry.name
+                stack.append((entry.path, child, level + 1, entry.inode()))
+        units.sort()
+        return units
+
+    @timed("collector.cgroups")
+    def update(self, now: Optional[float] = None) -> None:
+        """Прочитать счётчики листьев и пересчитать скорости."""
+        if not self.available:
+            return
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            if self._scanned_at is None or now - self._scanned_at >= self.rescan_interval:
+                self._units = self.scan()
+                self._scanned_at = now
+
+            previous = self._counters
+            counters: Dict[Tuple[str, int], tuple] = {}
+            rows: List[CgroupRow] = []
+            vanished = False
+            for key in self._units:
+                relative = key[0]
+                base = f"{self.root}/{relative}/"
+                cpu_stat = _read(base + "cpu.stat")
+                if cpu_stat is None:
+                    # cgroup удалена (остановили сервис) — перечитаем дерево в следующий раз
+                    vanished = True
+                    continue
+                usage = _keyed(cpu_stat, b"usage_usec").get(b"usage_usec")
+                current = _read(base + "memory.current")
+                memory_stat = _keyed(_read(base + "memory.stat"), b"anon", b"file")
+                read, write = _io_totals(_read(base + "io.stat"))
+
+                sample = (now, usage, read, write)
+                counters[key] = sample
+                last = previous.get(key)
+                cpu_rate = _rate(sample, last, 1)
+                name, kind = unit_name(relative)
+                rows.append(CgroupRow(
+                    path=relative,
+                    name=name,
+                    kind=kind,
+                    cpu_percent=round(cpu_rate / 10_000, 1) if cpu_rate is not None else None,
+                    memory=int(current) if current else None,
+                    anon=memory_stat.get(b"anon"),
+                    file=memory_stat.get(b"file"),
+                    io_read_bps=_rate(sample, last, 2),
+                    io_write_bps=_rate(sample, last, 3),
+                ))
+
+            if vanished:
+                self._scanned_at = None
+            self._counters = counters
+            self._rows = rows
+
+    def top(self, limit: int = 15, sort_by: str = "cpu") -> List[dict]:
+        """Топ-K сервисов и контейнеров по CPU, памяти или вводу-выводу."""
+        key = _SORT_KEYS.get(sort_by, _SORT_KEYS["cpu"])
+        return [row._asdict() for row in sorted(self._rows, key=key, reverse=True)[:limit]]
+
+    def start(self) -> None:
+        """Запустить периодический проход (если cgroup v2 есть)."""
+        if not self.available:
+            logger.info(f"ℹ️ cgroup v2 не найдена в {self.root}: разбивка по сервисам отключена")
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="cgroups")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        from utils.stats import run_collector
+
+        while True:
+            try:
+                await run_collector(self.update)
+            except asyncio.TimeoutError:
+                logger.warning("⏳ Обход cgroup не уложился в таймаут")
+            except Exception:
+                logger.exception("Ошибка обхода cgroup")
+            await asyncio.sleep(self.interval)
+
+
+cgroup_table = CgroupTable()
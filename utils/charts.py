@@ -0,0 +1,241 @@
+"""
+Графики истории метрик (/chart).
+
+Точки графика — корзины истории, выровненные по границам интервала
+«окно / CHART_POINTS» (кратного шагу ступени истории). Пока не закрылась
+следующая корзина, график за то же окно не меняется, поэтому готовые
+изображения кэшируются по (метрика, окно, граница корзины). Рисует
+``utils.plot`` в пуле процессов — event loop не ждёт сжатия PNG. После
+первой отправки в записи кэша запоминается file_id Telegram: повторный
+запрос не рисуется и не загружается заново.
+"""
+import asyncio
+import logging
+import math
+import multiprocessing
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile
+
+from config import CHART_CACHE_SIZE, CHART_POINTS, CHART_WORKERS
+from utils.history import METRICS, history
+from utils.outbound import outbound
+from utils.plot import nice_ceiling, render_chart
+
+logger = logging.getLogger(__name__)
+
+# (метрика, окно в секундах, граница последней корзины)
+ChartKey = Tuple[str, int, float]
+
+
+@dataclass
+class Chart:
+    """Готовый график."""
+
+    key: ChartKey
+    png: bytes
+    # Интервал одной точки графика (секунды)
+    interval: int
+    # Сводка за окно: min, среднее, max
+    low: float
+    avg: float
+    high: float
+    first: float
+    last: float
+    # file_id после первой отправки
+    file_id: Optional[str] = None
+
+
+def _rate_scale(high: float) -> Tuple[float, str]:
+    for divisor, suffix in ((1024 ** 3, "GB/s"), (1024 ** 2, "MB/s"), (1024, "KB/s")):
+        if high >= divisor:
+            return divisor, suffix
+    return 1, "B/s"
+
+
+def _short(value: float) -> str:
+    return f"{value:.0f}" if value >= 10 or value == int(value) else f"{value:.1f}"
+
+
+def axis_y(unit: str, high: float, ticks: int = 4) -> Tuple[float, List[str]]:
+    """Верх оси Y и подписи делений снизу вверх."""
+    if unit == "%":
+        return 100.0, [f"{100 * i // ticks}%" for i in range(ticks + 1)]
+    divisor, suffix = _rate_scale(high)
+    top = nice_ceiling(high / divisor)
+    labels = ["0"] + [f"{_short(top * i / ticks)}{suffix[0] if divisor > 1 else ''}" for i in range(1, ticks + 1)]
+    return top * divisor, labels
+
+
+def axis_x(since: float, until: float, ticks: int = 4) -> List[str]:
+    """Подписи времени оси X (время суток или даты для длинных окон)."""
+    fmt = "%H:%M" if until - since <= 2 * 86400 else "%d.%m"
+    return [datetime.fromtimestamp(since + (until - since) * i / ticks).strftime(fmt) for i in range(ticks + 1)]
+
+
+class ChartRenderer:
+    """Пул процессов для рисования и кэш готовых графиков."""
+
+    def __init__(self, workers: int = CHART_WORKERS, cache_size: int = CHART_CACHE_SIZE, points: int = CHART_POINTS):
+        self.workers = workers
+        self.cache_size = cache_size
+        self.points = points
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[ChartKey, Chart]" = OrderedDict()
+        self._rendering: Dict[ChartKey, asyncio.Future] = {}
+        self.stats = {"rendered": 0, "cached": 0, "reused": 0}
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None  # пул потоков event loop
+        if self._pool is None:
+            # fork: рабочему процессу не нужно заново импортировать main.py с aiogram
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("fork" if "fork" in methods else None)
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=context)
+        return self._pool
+
+    def start(self) -> None:
+        """Запустить рабочие процессы заранее, пока у бота ещё нет потоков."""
+        executor = self._executor()
+        if executor is not None:
+            executor.submit(int)
+
+    def stop(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def interval(self, metric: str, window: int) -> int:
+        """Интервал точки графика: не меньше шага ступени истории и кратен ему."""
+        step = history.step_for(metric, window)
+        return step * max(1, math.ceil(window / self.points / step))
+
+    def key(self, metric: str, window: int, now: Optional[float] = None) -> ChartKey:
+        now = time.time() if now is None else now
+        interval = self.interval(metric, window)
+        return metric, window, (now // interval) * interval
+
+    async def get(self, metric: str, window: int, now: Optional[float] = None) -> Optional[Chart]:
+        """График метрики за окно (None, если данных нет)."""
+        key = self.key(metric, window, now)
+        chart = self._cache.get(key)
+        if chart is not None:
+            self._cache.move_to_end(key)
+            self.stats["cached"] += 1
+            return chart
+        # Одновременные запросы одного графика ждут одну отрисовку
+        pending = self._rendering.get(key)
+        if pending is not None:
+            self.stats["cached"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._rendering[key] = future
+        try:
+            chart = await self._render(key)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # ожидающих может не быть
+            raise
+        finally:
+            self._rendering.pop(key, None)
+        future.set_result(chart)
+        if chart is not None:
+            self._cache[key] = chart
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return chart
+
+    async def send(self, chat_id: int, chart: Chart, caption: str, **kwargs):
+        """Отправить график: по file_id, если он уже загружен, иначе файлом."""
+        if chart.file_id is not None:
+            try:
+                message = await outbound.send_photo(chat_id, chart.file_id, caption=caption, **kwargs)
+                self.stats["reused"] += 1
+                return message
+            except TelegramBadRequest as e:
+                logger.debug(f"file_id графика не принят, загружаем заново: {e}")
+                chart.file_id = None
+
+        metric, window, boundary = chart.key
+        photo = BufferedInputFile(chart.png, filename=f"{metric}-{window}-{int(boundary)}.png")
+        message = await outbound.send_photo(chat_id, photo, caption=caption, **kwargs)
+        if message is not None and message.photo:
+            # Самый крупный размер — исходное изображение
+            chart.file_id = message.photo[-1].file_id
+        return message
+
+    def _series(self, key: ChartKey) -> Tuple[int, float, list]:
+        """Точки (min, среднее, max) по корзинам графика; пропуски — None."""
+        metric, window, boundary = key
+        interval = self.interval(metric, window)
+        count = max(1, window // interval)
+        since = boundary - count * interval
+        _, buckets = history.query(metric, window, now=boundary)
+
+        mins = [math.inf] * count
+        maxs = [-math.inf] * count
+        sums = [0.0] * count
+        counts = [0] * count
+        for start, low, avg, high in buckets:
+            if not since <= start < boundary:
+                continue
+            index = int((start - since) // interval)
+            mins[index] = min(mins[index], low)
+            maxs[index] = max(maxs[index], high)
+            sums[index] += avg
+            counts[index] += 1
+        points = [
+            (mins[i], sums[i] / counts[i], maxs[i]) if counts[i] else None
+            for i in range(count)
+        ]
+        return interval, since, points
+
+    async def _render(self, key: ChartKey) -> Optional[Chart]:
+        metric, window, boundary = key
+        interval, since, points = self._series(key)
+        present = [(i, point) for i, point in enumerate(points) if point is not None]
+        if not present:
+            return None
+
+        unit = METRICS[metric][1]
+        high = max(point[2] for _, point in present)
+        top, y_labels = axis_y(unit, high)
+        x_labels = axis_x(since, boundary)
+
+        loop = asyncio.get_running_loop()
+        try:
+            png = await loop.run_in_executor(
+                self._executor(), render_chart, points, 0.0, top, y_labels, x_labels
+            )
+        except BrokenProcessPool:
+            # Рабочий процесс погиб (например, OOM) — пул пересоздаётся при следующем запросе
+            logger.warning("⚠️ Пул отрисовки графиков сломан, рисуем в потоке")
+            self._pool = None
+            png = await loop.run_in_executor(None, render_chart, points, 0.0, top, y_labels, x_labels)
+        self.stats["rendered"] += 1
+
+        return Chart(
+            key=key,
+            png=png,
+            interval=interval,
+            low=min(point[0] for _, point in present),
+            avg=sum(point[1] for _, point in present) / len(present),
+            high=high,
+            first=since + present[0][0] * interval,
+            last=since + (present[-1][0] + 1) * interval,
+        )
+
+
+charts = ChartRenderer()
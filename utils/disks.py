@@ -0,0 +1,139 @@
+"""
+Точки монтирования и ввод-вывод дисков.
+
+Список разделов кэшируется и перечитывается только при изменении таблицы
+монтирования: на Linux ядро сигналит об этом через poll() по
+/proc/self/mountinfo (POLLPRI), на остальных системах список обновляется
+по TTL. Скорости ввода-вывода считаются по разнице счётчиков
+``psutil.disk_io_counters(perdisk=True)`` между вызовами.
+"""
+import os
+import select
+import threading
+import time
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import psutil
+
+from config import DISK_FSTYPES_EXCLUDE, DISK_DEVICES_EXCLUDE, MOUNT_TABLE_TTL
+from utils.network import NameFilter
+
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+
+IO_FIELDS = ("read_bytes", "write_bytes", "read_iops", "write_iops", "await_ms")
+
+
+class MountTable:
+    """Кэш ``psutil.disk_partitions()`` с перечитыванием при изменениях."""
+
+    def __init__(
+        self,
+        fstypes_exclude: Sequence[str] = DISK_FSTYPES_EXCLUDE,
+        ttl: float = MOUNT_TABLE_TTL,
+        mountinfo: str = MOUNTINFO_PATH,
+    ):
+        self.fstypes_exclude = tuple(fstypes_exclude)
+        self.ttl = ttl
+        self._mountinfo = mountinfo
+        self._partitions: Optional[list] = None
+        self._loaded_at = 0.0
+        self._poller = None
+        self._fd: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _open_poller(self) -> None:
+        if self._poller is not None or not hasattr(select, "poll"):
+            return
+        try:
+            self._fd = os.open(self._mountinfo, os.O_RDONLY)
+        except OSError:
+            return
+        self._poller = select.poll()
+        self._poller.register(self._fd, select.POLLPRI | select.POLLERR)
+        # Первый poll сообщает текущее состояние — сбрасываем его
+        self._poller.poll(0)
+
+    def _changed(self) -> bool:
+        if self._poller is None:
+            return time.monotonic() - self._loaded_at >= self.ttl
+        return bool(self._poller.poll(0))
+
+    def partitions(self) -> list:
+        """Разделы без исключённых типов ФС (из кэша, если ничего не менялось)."""
+        with self._lock:
+            if self._partitions is None:
+                self._open_poller()
+            if self._partitions is None or self._changed():
+                self._partitions = [
+                    partition for partition in psutil.disk_partitions()
+                    if not any(fnmatchcase(partition.fstype, p) for p in self.fstypes_exclude)
+                ]
+                self._loaded_at = time.monotonic()
+            return self._partitions
+
+    def invalidate(self) -> None:
+        """Принудительно перечитать таблицу при следующем обращении."""
+        with self._lock:
+            self._partitions = None
+
+
+class DiskIORates:
+    """Скорости чтения/записи, IOPS и среднее ожидание по устройствам."""
+
+    def __init__(self, device_filter: Optional[NameFilter] = None):
+        self.filter = device_filter or NameFilter(exclude=DISK_DEVICES_EXCLUDE)
+        self._last: Dict[str, Tuple[int, ...]] = {}
+        self._last_time: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update(self) -> Dict[str, Dict[str, float]]:
+        """Снять счётчики и вернуть {устройство: {поле: значение}}."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last_time if self._last_time is not None else 0.0
+            counters = psutil.disk_io_counters(perdisk=True) or {}
+            current: Dict[str, Tuple[int, ...]] = {}
+            rates: Dict[str, Dict[str, float]] = {}
+
+            for name, disk in counters.items():
+                if not self.filter(name):
+                    continue
+                values = (
+                    disk.read_bytes, disk.write_bytes,
+                    disk.read_count, disk.write_count,
+                    disk.read_time, disk.write_time,
+                )
+                current[name] = values
+                previous = self._last.get(name)
+                if previous is None or elapsed <= 0:
+                    rates[name] = dict.fromkeys(IO_FIELDS, 0.0)
+                    continue
+
+                delta = [max(0, value - old) for value, old in zip(values, previous)]
+                operations = delta[2] + delta[3]
+                rates[name] = {
+                    "read_bytes": delta[0] / elapsed,
+                    "write_bytes": delta[1] / elapsed,
+                    "read_iops": delta[2] / elapsed,
+                    "write_iops": delta[3] / elapsed,
+                    # read_time/write_time в мс: время на одну операцию
+                    "await_ms": (delta[4] + delta[5]) / operations if operations else 0.0,
+                }
+
+            self._last = current
+            self._last_time = now
+            return rates
+
+
+def busiest_devices(rates: Dict[str, Dict[str, float]], limit: int = 8) -> List[Tuple[str, Dict[str, float]]]:
+    """Самые нагруженные устройства по суммарному потоку."""
+    return sorted(
+        rates.items(),
+        key=lambda item: item[1]["read_bytes"] + item[1]["write_bytes"],
+        reverse=True,
+    )[:limit]
+
+
+mount_table = MountTable()
+disk_io_rates = DiskIORates()
@@ -0,0 +1,141 @@
+"""
+Выгрузка истории метрик из постоянного хранилища.
+
+Записи читаются из кольца порциями по ``EXPORT_CHUNK`` и сразу сжимаются
+потоковым gzip: выгрузка за 30 дней не собирается в памяти целиком. В боте
+порции уходят прямо в тело запроса к Bot API, в CLI (``export.py``) — в файл.
+
+Форматы:
+
+- ``csv`` — строки ``timestamp,<метрики>``, пропуски пустые;
+- ``columns`` — двоичный поколоночный: заголовок (magic ``SMBC``, версия,
+  имена метрик) и блоки ``uint32 n``, n × float64 время и по n × float32 на
+  каждую метрику (little-endian). Читается ``read_columns``.
+"""
+import gzip
+import struct
+import sys
+import zlib
+from array import array
+from functools import partial
+from itertools import islice
+from typing import BinaryIO, Dict, Iterator, Tuple
+
+from aiogram.types import InputFile
+
+from config import EXPORT_CHUNK
+from utils.storage import MetricsStorage
+
+# формат → расширение файла
+FORMATS = {"csv": "csv.gz", "columns": "smbc.gz"}
+
+COLUMNS_MAGIC = b"SMBC"
+COLUMNS_VERSION = 1
+# magic, версия, длина строки имён метрик
+_COLUMNS_HEADER = struct.Struct("<4sHH")
+_BLOCK = struct.Struct("<I")
+
+
+def _csv_header(metrics: Tuple[str, ...]) -> bytes:
+    return ("timestamp," + ",".join(metrics) + "\n").encode()
+
+
+def _csv_block(rows: list) -> bytes:
+    lines = []
+    for row in rows:
+        values = ["" if value != value else f"{value:.7g}" for value in row[1:]]
+        lines.append(f"{row[0]:.0f}," + ",".join(values))
+    lines.append("")
+    return "\n".join(lines).encode()
+
+
+def _columns_header(metrics: Tuple[str, ...]) -> bytes:
+    names = ",".join(metrics).encode()
+    return _COLUMNS_HEADER.pack(COLUMNS_MAGIC, COLUMNS_VERSION, len(names)) + names
+
+
+def _column(typecode: str, values) -> bytes:
+    column = array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _columns_block(rows: list) -> bytes:
+    columns = list(zip(*rows))
+    parts = [_BLOCK.pack(len(rows)), _column("d", columns[0])]
+    parts.extend(_column("f", values) for values in columns[1:])
+    return b"".join(parts)
+
+
+_ENCODERS = {
+    "csv": (_csv_header, _csv_block),
+    "columns": (_columns_header, _columns_block),
+}
+
+
+def export_chunks(
+    storage: MetricsStorage,
+    since: float = 0.0,
+    until: float = float("inf"),
+    fmt: str = "csv",
+    chunk: int = EXPORT_CHUNK,
+) -> Iterator[bytes]:
+    """Сжатая gzip выгрузка записей за интервал, порция за порцией."""
+    header, block = _ENCODERS[fmt]
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    pending = compressor.compress(header(storage.metrics))
+    rows = storage.read_range(since, until)
+    while True:
+        batch = list(islice(rows, chunk))
+        if not batch:
+            break
+        pending += compressor.compress(block(batch))
+        if pending:
+            yield pending
+            pending = b""
+    yield pending + compressor.flush()
+
+
+def read_columns(stream: BinaryIO) -> Iterator[Tuple[array, Dict[str, array]]]:
+    """Блоки поколоночной выгрузки: (время, {метрика: значения})."""
+    with gzip.GzipFile(fileobj=stream) as fh:
+        magic, version, size = _COLUMNS_HEADER.unpack(fh.read(_COLUMNS_HEADER.size))
+        if magic != COLUMNS_MAGIC or version != COLUMNS_VERSION:
+            raise ValueError("Не поколоночная выгрузка метрик")
+        metrics = fh.read(size).decode().split(",")
+        while True:
+            raw = fh.read(_BLOCK.size)
+            if not raw:
+                return
+            (count,) = _BLOCK.unpack(raw)
+            timestamps = array("d", fh.read(8 * count))
+            values = {metric: array("f", fh.read(4 * count)) for metric in metrics}
+            if sys.byteorder == "big":
+                timestamps.byteswap()
+                for column in values.values():
+                    column.byteswap()
+            yield timestamps, values
+
+
+class ExportFile(InputFile):
+    """Выгрузка для отправки в Telegram: порции сжимаются в потоке
+    сборщиков и сразу уходят в тело запроса. При повторной отправке
+    (ответ 429) выгрузка формируется заново."""
+
+    def __init__(self, storage: MetricsStorage, since: float, until: float, fmt: str, filename: str):
+        super().__init__(filename=filename)
+        self.storage = storage
+        self.since = since
+        self.until = until
+        self.fmt = fmt
+
+    async def read(self, bot):
+        from utils.stats import run_collector
+
+        chunks = export_chunks(self.storage, self.since, self.until, self.fmt)
+        while True:
+            data = await run_collector(partial(next, chunks, None))
+            if data is None:
+                return
+            yield data
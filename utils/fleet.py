@@ -0,0 +1,164 @@
+"""
+Опрос агентов парка серверов.
+
+Бот опрашивает всех агентов из ``AGENTS`` фоновой задачей: запросы идут
+параллельно (не больше ``FLEET_CONCURRENCY`` одновременно) через общий пул
+keep-alive соединений, каждый ограничен ``FLEET_TIMEOUT``. Обработчики
+читают последние ответы и не ждут сеть.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config import AGENTS, AGENT_TOKEN, FLEET_INTERVAL, FLEET_TIMEOUT, FLEET_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Host:
+    """Агент и его последний ответ."""
+
+    name: str
+    address: str
+    data: Optional[dict] = None
+    error: Optional[str] = None
+    updated: float = 0.0
+    latency: float = 0.0
+
+    @property
+    def unix_path(self) -> Optional[str]:
+        return self.address[5:] if self.address.startswith("unix:") else None
+
+    @property
+    def url(self) -> str:
+        if self.unix_path is not None:
+            # Для unix-сокета хост в URL не важен
+            return "http://agent/snapshot"
+        return self.address.rstrip("/") + "/snapshot"
+
+    def stale(self, max_age: float) -> bool:
+        return self.data is None or time.monotonic() - self.updated > max_age
+
+    @property
+    def load(self) -> float:
+        """Наибольшая из загрузок CPU, RAM и корня — для сортировки."""
+        if self.data is None:
+            return float("inf")
+        root = self.data.get("root_disk") or {}
+        return max(self.data["cpu"]["percent"], self.data["ram"]["percent"], root.get("percent", 0))
+
+
+def parse_agents(entries: Sequence[str]) -> List[Host]:
+    """Разобрать «имя=адрес» (имя можно опустить — возьмётся хост из адреса)."""
+    hosts = []
+    for entry in entries:
+        name, sep, address = entry.partition("=")
+        if not sep:
+            address = name
+            name = urlsplit(address).hostname or address.rsplit("/", 1)[-1]
+        if not address.startswith(("http://", "https://", "unix:")):
+            address = f"http://{address}"
+        hosts.append(Host(name.strip(), address.strip()))
+    return hosts
+
+
+class Fleet:
+    """Периодический параллельный опрос агентов."""
+
+    def __init__(
+        self,
+        hosts: Sequence[Host],
+        interval: float = FLEET_INTERVAL,
+        timeout: float = FLEET_TIMEOUT,
+        concurrency: int = FLEET_CONCURRENCY,
+        token: str = AGENT_TOKEN,
+    ):
+        self.hosts = list(hosts)
+        self.interval = interval
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.concurrency = concurrency
+        self._headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._unix_sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _session_for(self, host: Host) -> aiohttp.ClientSession:
+        path = host.unix_path
+        if path is None:
+            if self._session is None:
+                connector = aiohttp.TCPConnector(
+                    limit=self.concurrency,
+                    keepalive_timeout=max(30.0, self.interval * 3),
+                    ttl_dns_cache=300,
+                )
+                self._session = aiohttp.ClientSession(connector=connector, headers=self._headers)
+            return self._session
+        session = self._unix_sessions.get(path)
+        if session is None:
+            session = aiohttp.ClientSession(connector=aiohttp.UnixConnector(path), headers=self._headers)
+            self._unix_sessions[path] = session
+        return session
+
+    async def poll_host(self, host: Host) -> None:
+        """Запросить снимок у одного агента."""
+        async with self._semaphore:
+            started = time.monotonic()
+            try:
+                async with self._session_for(host).get(host.url, timeout=self.timeout) as response:
+                    response.raise_for_status()
+                    host.data = await response.json()
+            except asyncio.TimeoutError:
+                host.error = "таймаут"
+            except (aiohttp.ClientError, ValueError) as e:
+                host.error = str(e) or type(e).__name__
+            else:
+                host.error = None
+                host.updated = time.monotonic()
+            host.latency = time.monotonic() - started
+
+    async def poll(self) -> None:
+        """Опросить всех агентов параллельно."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(self.poll_host(host) for host in self.hosts))
+
+    def start(self) -> None:
+        if self.hosts and self._task is None:
+            self._task = asyncio.create_task(self._run(), name="fleet")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for session in [self._session, *self._unix_sessions.values()]:
+            if session is not None:
+                await session.close()
+        self._session = None
+        self._unix_sessions.clear()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            await self.poll()
+            next_tick += self.interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                # Опрос дольше интервала: не догоняем пропущенные шаги
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+
+fleet = Fleet(parse_agents(AGENTS))
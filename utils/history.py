@@ -0,0 +1,224 @@
+"""
+История метрик в памяти.
+
+Каждая метрика хранится в нескольких ступенях кольцевых буферов на
+``array`` (без списков словарей). Ступень — это корзины фиксированного
+шага с min/сумма/max/количество; значения прибавляются сразу во все
+ступени, поэтому свёртки не требуют пересчёта, а запрос за окно проходит
+только по корзинам этого окна.
+"""
+import asyncio
+import math
+import re
+import time
+from array import array
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from config import HISTORY_TIERS
+
+# Метрика → (подпись, единица измерения)
+METRICS: Dict[str, Tuple[str, str]] = {
+    "cpu": ("CPU", "%"),
+    "ram": ("RAM", "%"),
+    "swap": ("Swap", "%"),
+    "disk": ("Диск /", "%"),
+    "net_sent": ("Сеть ↑", "B/s"),
+    "net_recv": ("Сеть ↓", "B/s"),
+}
+
+_WINDOW_RE = re.compile(r"^(\d+)([smhd]?)$")
+_WINDOW_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Корзина истории: (начало, min, среднее, max)
+Bucket = Tuple[float, float, float, float]
+
+
+def parse_window(text: str) -> Optional[int]:
+    """Разобрать окно вида ``90s``, ``15m``, ``6h``, ``7d`` в секунды."""
+    match = _WINDOW_RE.match(text.strip().lower())
+    if not match:
+        return None
+    seconds = int(match.group(1)) * _WINDOW_UNITS[match.group(2)]
+    return seconds or None
+
+
+class _Tier:
+    """Кольцевой буфер корзин одного шага."""
+
+    __slots__ = ("step", "capacity", "starts", "mins", "maxs", "sums", "counts")
+
+    def __init__(self, step: int, capacity: int):
+        self.step = step
+        self.capacity = capacity
+        self.starts = array("d", bytes(8 * capacity))
+        self.mins = array("f", bytes(4 * capacity))
+        self.maxs = array("f", bytes(4 * capacity))
+        self.sums = array("d", bytes(8 * capacity))
+        self.counts = array("I", bytes(4 * capacity))
+
+    @property
+    def span(self) -> int:
+        return self.step * self.capacity
+
+    def add(self, ts: float, value: float) -> None:
+        bucket = int(ts // self.step)
+        idx = bucket % self.capacity
+        start = float(bucket * self.step)
+        if self.starts[idx] != start:
+            if self.starts[idx] > start:
+                # Значение старше корзины в слоте (восстановление из файла)
+                return
+            # Слот занят старой корзиной — перезаписываем
+            self.starts[idx] = start
+            self.mins[idx] = value
+            self.maxs[idx] = value
+            self.sums[idx] = value
+            self.counts[idx] = 1
+            return
+        if value < self.mins[idx]:
+            self.mins[idx] = value
+        if value > self.maxs[idx]:
+            self.maxs[idx] = value
+        self.sums[idx] += value
+        self.counts[idx] += 1
+
+    def query(self, since: float, until: float) -> List[Bucket]:
+        first = int(since // self.step)
+        last = int(until // self.step)
+        first = max(first, last - self.capacity + 1)
+        result = []
+        for bucket in range(first, last + 1):
+            idx = bucket % self.capacity
+            start = float(bucket * self.step)
+            if self.starts[idx] != start or not self.counts[idx]:
+                continue
+            result.append((start, self.mins[idx], self.sums[idx] / self.counts[idx], self.maxs[idx]))
+        return result
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            buf.itemsize * len(buf)
+            for buf in (self.starts, self.mins, self.maxs, self.sums, self.counts)
+        )
+
+
+class HistoryStore:
+    """Хранилище истории метрик с многоуровневыми свёртками."""
+
+    def __init__(self, tiers: Tuple[Tuple[int, int], ...] = HISTORY_TIERS):
+        self._tiers_config = tiers
+        self._series: Dict[str, List[_Tier]] = {
+            metric: [_Tier(step, size) for step, size in tiers] for metric in METRICS
+        }
+        self._storage = None
+
+    def attach_storage(self, storage) -> None:
+        """Дублировать записываемые значения в постоянное хранилище."""
+        self._storage = storage
+
+    @property
+    def storage(self):
+        """Постоянное хранилище (None, если не подключено)."""
+        return self._storage
+
+    def add(self, metric: str, ts: float, value: float) -> None:
+        """Добавить значение метрики во все ступени."""
+        for tier in self._series[metric]:
+            tier.add(ts, value)
+
+    def record(self, snapshot) -> None:
+        """Записать снимок фонового сборщика (подписчик ``sampler``)."""
+        ts = snapshot.timestamp
+        values = {
+            "cpu": snapshot.cpu["percent"],
+            "ram": snapshot.ram["percent"],
+            "swap": snapshot.swap["percent"],
+        }
+        if snapshot.root_disk is not None:
+            values["disk"] = snapshot.root_disk["percent"]
+        rates = snapshot.network["rates"]
+        values["net_sent"] = rates["bytes_sent"]
+        values["net_recv"] = rates["bytes_recv"]
+
+        for metric, value in values.items():
+            self.add(metric, ts, value)
+        if self._storage is not None:
+            self._storage.accumulate(ts, values)
+
+    async def restore(self, storage, chunk: int = 2000) -> int:
+        """Заполнить ступени записями из постоянного хранилища.
+
+        Читается только интервал, который покрывает самая длинная ступень;
+        работа идёт порциями, чтобы не задерживать event loop.
+        """
+        now = time.time()
+        spans = [(step * size, index) for index, (step, size) in enumerate(self._tiers_config)]
+        since = now - max(span for span, _ in spans)
+        metrics = storage.metrics
+        restored = 0
+
+        rows = storage.read_range(since, now)
+        while True:
+            batch = list(islice(rows, chunk))
+            if not batch:
+                break
+            for row in batch:
+                ts = row[0]
+                # Каждую запись кладём только в ступени, которые её покрывают
+                tiers_for_ts = [index for span, index in spans if ts >= now - span]
+                for metric, value in zip(metrics, row[1:]):
+                    series = self._series.get(metric)
+                    if series is None or math.isnan(value):
+                        continue
+                    for index in tiers_for_ts:
+                        series[index].add(ts, value)
+            restored += len(batch)
+            await asyncio.sleep(0)
+        return restored
+
+    def query(self, metric: str, window: int, now: Optional[float] = None) -> Tuple[int, List[Bucket]]:
+        """Корзины метрики за последние ``window`` секунд.
+
+        Выбирается самая подробная ступень, покрывающая окно.
+        Возвращает (шаг ступени, список корзин).
+        """
+        now = time.time() if now is None else now
+        tier = self._tier_for(metric, window)
+        return tier.step, tier.query(now - window, now)
+
+    def step_for(self, metric: str, window: int) -> int:
+        """Шаг ступени, по которой строится ответ за ``window`` секунд."""
+        return self._tier_for(metric, window).step
+
+    def _tier_for(self, metric: str, window: int) -> _Tier:
+        tiers = self._series[metric]
+        return next((t for t in tiers if t.span >= window), tiers[-1])
+
+    @property
+    def nbytes(self) -> int:
+        """Объём памяти, занятый буферами."""
+        return sum(tier.nbytes for tiers in self._series.values() for tier in tiers)
+
+
+def downsample(buckets: List[Bucket], points: int) -> List[Bucket]:
+    """Сжать корзины до ``points`` точек (min/среднее/max по группам)."""
+    if len(buckets) <= points:
+        return buckets
+    size = len(buckets) / points
+    result = []
+    for i in range(points):
+        group = buckets[int(i * size):int((i + 1) * size)]
+        if not group:
+            continue
+        result.append((
+            group[0][0],
+            min(b[1] for b in group),
+            sum(b[2] for b in group) / len(group),
+            max(b[3] for b in group),
+        ))
+    return result
+
+
+history = HistoryStore()
@@ -0,0 +1,86 @@
+"""
+Неизменные сведения о сервере.
+
+Платформа, имя хоста, время загрузки, число ядер и максимальная частота
+не меняются за время работы бота, поэтому читаются один раз. Кэш
+сбрасывается по SIGHUP (например, после смены hostname или горячего
+подключения CPU) и перечитывается при следующем обращении.
+"""
+import asyncio
+import logging
+import platform
+import signal
+import socket
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import psutil
+
+from utils.disks import mount_table
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HostFacts:
+    platform: str
+    hostname: str
+    boot_time: float
+    cores_logical: Optional[int]
+    cores_physical: Optional[int]
+    freq_max: str
+
+
+class HostFactsCache:
+    """Однократно прочитанные ``HostFacts`` с ручным сбросом."""
+
+    def __init__(self):
+        self._facts: Optional[HostFacts] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> HostFacts:
+        facts = self._facts
+        if facts is None:
+            with self._lock:
+                if self._facts is None:
+                    self._facts = self._load()
+                facts = self._facts
+        return facts
+
+    def invalidate(self) -> None:
+        """Перечитать сведения при следующем обращении."""
+        with self._lock:
+            self._facts = None
+
+    @staticmethod
+    def _load() -> HostFacts:
+        cpu_freq = psutil.cpu_freq()
+        return HostFacts(
+            platform=platform.system(),
+            hostname=socket.gethostname(),
+            boot_time=psutil.boot_time(),
+            cores_logical=psutil.cpu_count(logical=True),
+            cores_physical=psutil.cpu_count(logical=False),
+            freq_max=f"{cpu_freq.max:.0f}" if cpu_freq else "N/A",
+        )
+
+
+host_facts = HostFactsCache()
+
+
+def reload_static() -> None:
+    """Сбросить кэши неизменных сведений (сервер, точки монтирования)."""
+    host_facts.invalidate()
+    mount_table.invalidate()
+    logger.info("🔁 Сведения о сервере будут перечитаны")
+
+
+def install_sighup_handler() -> None:
+    """Сбрасывать кэши по SIGHUP (где сигнал поддерживается)."""
+    if not hasattr(signal, "SIGHUP"):
+        return
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, reload_static)
+    except (NotImplementedError, RuntimeError):
+        pass
@@ -0,0 +1,100 @@
+"""
+Скорости сетевых интерфейсов.
+
+Счётчики psutil накопительные, поэтому скорости (байты, пакеты, ошибки и
+отбрасывания в секунду) считаются по разнице между двумя вызовами.
+Фильтр интерфейсов вычисляется один раз на имя и кэшируется, так что
+сотни veth/docker-интерфейсов не добавляют работы на каждом шаге.
+"""
+import threading
+import time
+from fnmatch import fnmatchcase
+from typing import Dict, Optional, Sequence, Tuple
+
+import psutil
+
+from config import NET_INCLUDE, NET_EXCLUDE
+
+RATE_FIELDS = ("bytes_sent", "bytes_recv", "packets_sent", "packets_recv", "errors", "drops")
+
+
+def _counters(nic) -> Tuple[int, ...]:
+    return (
+        nic.bytes_sent,
+        nic.bytes_recv,
+        nic.packets_sent,
+        nic.packets_recv,
+        nic.errin + nic.errout,
+        nic.dropin + nic.dropout,
+    )
+
+
+class NameFilter:
+    """Фильтр имён (интерфейсов, устройств) по glob-шаблонам с кэшем решений."""
+
+    def __init__(self, include: Sequence[str] = (), exclude: Sequence[str] = ()):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self._decisions: Dict[str, bool] = {}
+
+    def __call__(self, name: str) -> bool:
+        decision = self._decisions.get(name)
+        if decision is None:
+            decision = (
+                (not self.include or any(fnmatchcase(name, p) for p in self.include))
+                and not any(fnmatchcase(name, p) for p in self.exclude)
+            )
+            self._decisions[name] = decision
+        return decision
+
+
+class NetworkRates:
+    """Скорости по интерфейсам, посчитанные по разнице между вызовами."""
+
+    def __init__(self, iface_filter: Optional[NameFilter] = None):
+        self.filter = iface_filter or NameFilter(NET_INCLUDE, NET_EXCLUDE)
+        self._last: Dict[str, Tuple[int, ...]] = {}
+        self._last_time: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update(self) -> Dict[str, Dict[str, float]]:
+        """Снять счётчики и вернуть скорости {интерфейс: {поле: в секунду}}."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last_time if self._last_time is not None else 0.0
+            counters = psutil.net_io_counters(pernic=True)
+            accept = self.filter
+            last = self._last
+            current: Dict[str, Tuple[int, ...]] = {}
+            rates: Dict[str, Dict[str, float]] = {}
+
+            for name, nic in counters.items():
+                if not accept(name):
+                    continue
+                values = _counters(nic)
+                current[name] = values
+                previous = last.get(name)
+                if previous is None or elapsed <= 0:
+                    rates[name] = dict.fromkeys(RATE_FIELDS, 0.0)
+                    continue
+                # Отрицательная разница — счётчик сброшен, считаем скорость нулевой
+                rates[name] = {
+                    field: max(0, value - old) / elapsed
+                    for field, value, old in zip(RATE_FIELDS, values, previous)
+                }
+
+            self._last = current
+            self._last_time = now
+            return rates
+
+
+def total_rates(rates: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    """Суммарные скорости по всем интерфейсам."""
+    total = dict.fromkeys(RATE_FIELDS, 0.0)
+    for nic in rates.values():
+        for field in RATE_FIELDS:
+            total[field] += nic[field]
+    return total
+
+
+network_rates = NetworkRates()
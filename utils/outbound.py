@@ -0,0 +1,344 @@
+"""
+Очередь исходящих сообщений.
+
+Все отправки и редактирования идут через один диспетчер:
+
+- глобальный и поочерёдный (на чат) token bucket держат темп в пределах
+  лимитов Telegram, а очередь одного чата не задерживает остальные;
+- несколько ожидающих правок одного сообщения схлопываются в последнюю;
+- правка пропускается, если текст и клавиатура не изменились;
+- при 429 чат ставится на паузу на ``retry_after`` и задание повторяется.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramBadRequest, TelegramRetryAfter
+
+from config import OUTBOUND_GLOBAL_RATE, OUTBOUND_CHAT_RATE, OUTBOUND_CHAT_BURST
+
+logger = logging.getLogger(__name__)
+
+# Сколько последних отправленных сообщений помнить для сравнения правок
+_HASH_CACHE_SIZE = 10_000
+
+
+class TokenBucket:
+    """Token bucket: ``rate`` токенов в секунду, не больше ``capacity``."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "blocked_until")
+
+    def __init__(self, rate: float, capacity: float, now: float = 0.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Через сколько секунд будет доступен токен."""
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.blocked_until - now)
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def block(self, until: float) -> None:
+        self.blocked_until = max(self.blocked_until, until)
+
+
+@dataclass
+class _Job:
+    kind: str  # send | photo | document | edit | markup
+    chat_id: int
+    message_id: Optional[int]
+    text: Optional[str]
+    kwargs: dict
+    future: asyncio.Future
+    digest: Optional[int] = None
+
+
+def _digest(text: Optional[str], kwargs: dict) -> int:
+    markup = kwargs.get("reply_markup")
+    if markup is None:
+        markup_json = ""
+    else:
+        # Готовые клавиатуры из keyboards.main_kb хранят свой JSON
+        markup_json = getattr(markup, "json_text", None) or markup.model_dump_json()
+    return hash((text, markup_json, kwargs.get("parse_mode")))
+
+
+def _chain(source: asyncio.Future, target: asyncio.Future) -> None:
+    if target.done():
+        return
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())
+    else:
+        target.set_result(source.result())
+
+
+class Outbound:
+    """Диспетчер исходящих сообщений с ограничением темпа."""
+
+    def __init__(
+        self,
+        global_rate: float = OUTBOUND_GLOBAL_RATE,
+        chat_rate: float = OUTBOUND_CHAT_RATE,
+        chat_burst: float = OUTBOUND_CHAT_BURST,
+    ):
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.bot: Optional[Bot] = None
+
+        self._global: Optional[TokenBucket] = None
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._queues: Dict[int, Deque[_Job]] = {}
+        self._heap: List[Tuple[float, int, int]] = []
+        self._seq = itertools.count()
+        # (чат, сообщение, вид правки) → ещё не отправленная правка
+        self._pending_edits: Dict[Tuple[int, int, str], _Job] = {}
+        self._sent_digests: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+
+        # Счётчики для диагностики
+        self.stats = {"sent": 0, "edited": 0, "coalesced": 0, "unchanged": 0, "retry_after": 0, "errors": 0}
+
+    def attach(self, bot: Bot) -> None:
+        """Запустить диспетчер для бота."""
+        self.bot = bot
+        loop = asyncio.get_running_loop()
+        self._global = TokenBucket(self.global_rate, self.global_rate, loop.time())
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="outbound")
+
+    async def stop(self) -> None:
+        """Остановить диспетчер (незавершённые задания отменяются)."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        for queue in self._queues.values():
+            for job in queue:
+                job.future.cancel()
+        self._queues.clear()
+
+    # Публичный интерфейс
+
+    def send(self, chat_id: int, text: str, **kwargs) -> asyncio.Future:
+        """Поставить в очередь отправку сообщения. Future вернёт Message."""
+        return self._enqueue(_Job("send", chat_id, None, text, kwargs, self._future()))
+
+    def send_photo(self, chat_id: int, photo, **kwargs) -> asyncio.Future:
+        """Поставить в очередь отправку фото (файл или file_id). Future вернёт Message."""
+        return self._enqueue(_Job("photo", chat_id, None, None, dict(kwargs, photo=photo), self._future()))
+
+    def send_document(self, chat_id: int, document, **kwargs) -> asyncio.Future:
+        """Поставить в очередь отправку файла. Future вернёт Message."""
+        return self._enqueue(_Job("document", chat_id, None, None, dict(kwargs, document=document), self._future()))
+
+    def edit(self, chat_id: int, message_id: int, text: str, **kwargs) -> asyncio.Future:
+        """Поставить в очередь правку текста (схлопывается с ожидающими)."""
+        return self._enqueue_edit("edit", chat_id, message_id, text, kwargs)
+
+    def edit_markup(self, chat_id: int, message_id: int, **kwargs) -> asyncio.Future:
+        """Поставить в очередь правку клавиатуры сообщения."""
+        return self._enqueue_edit("markup", chat_id, message_id, None, kwargs)
+
+    # Очередь
+
+    def _future(self) -> asyncio.Future:
+        return asyncio.get_running_loop().create_future()
+
+    def _enqueue_edit(self, kind: str, chat_id: int, message_id: int, text: Optional[str], kwargs: dict) -> asyncio.Future:
+        key = (chat_id, message_id)
+        digest = _digest(text, kwargs)
+
+        # Правка текста и правка клавиатуры схлопываются каждая со своей
+        pending = self._pending_edits.get((chat_id, message_id, kind))
+        if pending is not None:
+            # Ещё не отправленная правка заменяется новой
+            pending.text, pending.kwargs, pending.digest = text, kwargs, digest
+            self.stats["coalesced"] += 1
+            return pending.future
+
+        if kind == "edit" and self._sent_digests.get(key) == digest:
+            self.stats["unchanged"] += 1
+            future = self._future()
+            future.set_result(None)
+            return future
+
+        if kind == "markup":
+            # Клавиатура сменится: сохранённый отпечаток текста больше не верен
+            self._sent_digests.pop(key, None)
+
+        job = _Job(kind, chat_id, message_id, text, kwargs, self._future(), digest)
+        self._pending_edits[(chat_id, message_id, kind)] = job
+        return self._enqueue(job)
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.chat_rate, self.chat_burst, asyncio.get_running_loop().time())
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _schedule(self, chat_id: int) -> None:
+        now = asyncio.get_running_loop().time()
+        ready_at = now + self._chat_bucket(chat_id).delay(now)
+        heapq.heappush(self._heap, (ready_at, next(self._seq), chat_id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _enqueue(self, job: _Job) -> asyncio.Future:
+        queue = self._queues.get(job.chat_id)
+        if queue is None:
+            queue = self._queues[job.chat_id] = deque()
+            queue.append(job)
+            self._schedule(job.chat_id)
+        else:
+            queue.append(job)
+        return job.future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            ready_at, _, chat_id = self._heap[0]
+            now = loop.time()
+            delay = max(ready_at - now, self._global.delay(now))
+            if delay > 0:
+                # Ждём, но просыпаемся раньше, если пришло новое задание
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._heap)
+            queue = self._queues.get(chat_id)
+            if not queue:
+                self._queues.pop(chat_id, None)
+                continue
+
+            job = queue.popleft()
+            if job.message_id is not None:
+                key = (job.chat_id, job.message_id, job.kind)
+                if self._pending_edits.get(key) is job:
+                    del self._pending_edits[key]
+            self._global.take(now)
+            self._chat_bucket(chat_id).take(now)
+
+            task = asyncio.create_task(self._execute(job))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+            if queue:
+                self._schedule(chat_id)
+            else:
+                del self._queues[chat_id]
+
+    def _remember(self, key: Tuple[int, int], digest: int) -> None:
+        self._sent_digests[key] = digest
+        self._sent_digests.move_to_end(key)
+        if len(self._sent_digests) > _HASH_CACHE_SIZE:
+            self._sent_digests.popitem(last=False)
+
+    async def _execute(self, job: _Job) -> None:
+        try:
+            if job.kind == "send":
+                result = await self.bot.send_message(job.chat_id, job.text, **job.kwargs)
+                self._remember((job.chat_id, result.message_id), _digest(job.text, job.kwargs))
+                self.stats["sent"] += 1
+            elif job.kind == "photo":
+                result = await self.bot.send_photo(job.chat_id, **job.kwargs)
+                self.stats["sent"] += 1
+            elif job.kind == "document":
+                result = await self.bot.send_document(job.chat_id, **job.kwargs)
+                self.stats["sent"] += 1
+            elif job.kind == "edit":
+                result = await self.bot.edit_message_text(
+                    text=job.text, chat_id=job.chat_id, message_id=job.message_id, **job.kwargs
+                )
+                self._remember((job.chat_id, job.message_id), job.digest)
+                self.stats["edited"] += 1
+            else:
+                result = await self.bot.edit_message_reply_markup(
+                    chat_id=job.chat_id, message_id=job.message_id, **job.kwargs
+                )
+                # Сообщение изменилось: следующая правка текста не «без изменений»
+                self._sent_digests.pop((job.chat_id, job.message_id), None)
+                self.stats["edited"] += 1
+        except TelegramRetryAfter as e:
+            self.stats["retry_after"] += 1
+            logger.warning(f"⏳ Telegram просит подождать {e.retry_after} с (чат {job.chat_id})")
+            loop = asyncio.get_running_loop()
+            self._chat_bucket(job.chat_id).block(loop.time() + e.retry_after)
+            self._requeue(job)
+            return
+        except TelegramBadRequest as e:
+            if "message is not modified" in str(e):
+                self.stats["unchanged"] += 1
+                if job.kind == "edit":
+                    self._remember((job.chat_id, job.message_id), job.digest)
+                result = None
+            else:
+                self.stats["errors"] += 1
+                logger.warning(f"⚠️ Ошибка отправки в чат {job.chat_id}: {e}")
+                if not job.future.done():
+                    job.future.set_exception(e)
+                return
+        except (TelegramAPIError, asyncio.TimeoutError, OSError) as e:
+            self.stats["errors"] += 1
+            logger.warning(f"⚠️ Ошибка отправки в чат {job.chat_id}: {e}")
+            if not job.future.done():
+                job.future.set_exception(e)
+            return
+
+        if not job.future.done():
+            job.future.set_result(result)
+
+    def _requeue(self, job: _Job) -> None:
+        if job.message_id is not None:
+            key = (job.chat_id, job.message_id, job.kind)
+            newer = self._pending_edits.get(key)
+            if newer is not None and newer is not job:
+                # Пока ждали, пришла более свежая правка — она и уйдёт
+                newer.future.add_done_callback(lambda f: _chain(f, job.future))
+                return
+            self._pending_edits[key] = job
+
+        queue = self._queues.get(job.chat_id)
+        if queue is None:
+            self._queues[job.chat_id] = deque([job])
+            self._schedule(job.chat_id)
+        else:
+            queue.appendleft(job)
+
+
+outbound = Outbound()
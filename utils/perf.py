@@ -0,0 +1,212 @@
+"""
+Встроенные замеры производительности.
+
+Гистограммы с фиксированными границами корзин: запись — поиск корзины
+``int.bit_length()`` и пара увеличений счётчиков, без блокировок (сборщики пишут из
+потоков; редкая потеря отсчёта при гонке допустима). ``timed`` при
+выключенном ``PERF_ENABLED`` возвращает функцию без обёртки, так что
+выключенные замеры ничего не стоят.
+
+Монитор задержки event loop спит короткими шагами и меряет опоздание
+пробуждения; сторожевой поток при долгой блокировке снимает стек
+главного потока и запоминает место, где loop стоял.
+"""
+import asyncio
+import functools
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import PERF_ENABLED, PERF_LAG_INTERVAL, PERF_LAG_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# Корзины — степени двойки в наносекундах: индекс корзины равен
+# ``duration_ns.bit_length()``, верхняя граница корзины i — 2**i нс.
+# 65 корзин покрывают любое 64-битное значение без проверки границ.
+BUCKETS = 65
+
+
+class Histogram:
+    """Гистограмма длительностей с фиксированными корзинами (степени двойки)."""
+
+    __slots__ = ("counts", "totals")
+
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        # Сумма длительностей в списке: обёртки меняют её без обращения к атрибутам
+        self.totals = [0]
+
+    def record(self, duration_ns: int) -> None:
+        self.counts[duration_ns.bit_length()] += 1
+        self.totals[0] += duration_ns
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    @property
+    def total_ns(self) -> int:
+        return self.totals[0]
+
+    @property
+    def max_ns(self) -> int:
+        """Верхняя граница самой старшей непустой корзины."""
+        for index in range(BUCKETS - 1, -1, -1):
+            if self.counts[index]:
+                return 1 << index
+        return 0
+
+    def percentile(self, fraction: float) -> int:
+        """Верхняя граница корзины, в которую попадает перцентиль (нс)."""
+        total = self.count
+        if not total:
+            return 0
+        rank = fraction * total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return 1 << index
+        return self.max_ns
+
+    @property
+    def mean_ns(self) -> float:
+        total = self.count
+        return self.totals[0] / total if total else 0.0
+
+
+class PerfRegistry:
+    """Набор именованных гистограмм и найденных блокировок event loop."""
+
+    def __init__(self, enabled: bool = PERF_ENABLED):
+        self.enabled = enabled
+        self.histograms: Dict[str, Histogram] = {}
+        self.blockers: Counter = Counter()
+        self.started = time.time()
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def record(self, name: str, duration_ns: int) -> None:
+        self.histogram(name).record(duration_ns)
+
+    def top(self, limit: int = 10, prefix: str = "") -> List[Tuple[str, Histogram]]:
+        """Самые медленные пути по p99."""
+        items = [
+            (name, histogram) for name, histogram in self.histograms.items()
+            if name.startswith(prefix) and histogram.count
+        ]
+        items.sort(key=lambda item: (item[1].percentile(0.99), item[1].total_ns), reverse=True)
+        return items[:limit]
+
+    def reset(self) -> None:
+        # Обнуляем на месте: обёртки ``timed`` держат ссылки на свои гистограммы
+        for histogram in self.histograms.values():
+            histogram.counts[:] = [0] * BUCKETS
+            histogram.totals[0] = 0
+        self.blockers.clear()
+        self.started = time.time()
+
+
+def timed(name: str) -> Callable:
+    """Декоратор замера синхронной функции (без обёртки, если замеры выключены)."""
+
+    def decorator(func: Callable) -> Callable:
+        if not perf.enabled:
+            return func
+        histogram = perf.histogram(name)
+        counts, totals = histogram.counts, histogram.totals
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - started
+                counts[elapsed.bit_length()] += 1
+                totals[0] += elapsed
+
+        return wrapper
+
+    return decorator
+
+
+class LoopLagMonitor:
+    """Задержка event loop и поиск блокирующих вызовов."""
+
+    def __init__(self, interval: float = PERF_LAG_INTERVAL, threshold: float = PERF_LAG_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run(), name="loop-lag")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        histogram = perf.histogram("loop.lag")
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            histogram.record(int(lag * 1e9))
+            self._heartbeat = time.monotonic()
+            if lag >= self.threshold:
+                logger.warning(f"🐢 Event loop был заблокирован на {lag * 1000:.0f} мс")
+
+    def _watch(self) -> None:
+        # Проверяем чаще порога, чтобы застать блокировку «на месте»
+        period = self.threshold / 2
+        reported_beat = None
+        while not self._stop.wait(period):
+            beat = self._heartbeat
+            if beat == reported_beat or time.monotonic() - beat < self.threshold + self.interval:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            perf.blockers[_describe(frame)] += 1
+            reported_beat = beat
+
+
+def _describe(frame) -> str:
+    """Самый глубокий кадр проекта в стеке (или самый глубокий вообще)."""
+    stack = traceback.extract_stack(frame)
+    own = [entry for entry in stack if "site-packages" not in entry.filename and "/lib/python" not in entry.filename]
+    entry = (own or stack)[-1]
+    return f"{entry.filename.rsplit('/', 1)[-1]}:{entry.lineno} {entry.name}: {entry.line or ''}".strip()
+
+
+perf = PerfRegistry()
+loop_monitor = LoopLagMonitor()
@@ -0,0 +1,195 @@
+"""
+Рисование графиков в PNG без внешних зависимостей.
+
+Изображение — палитровый PNG (байт на пиксель), сжатый ``zlib``. Модуль
+не импортирует ничего из проекта: он выполняется в отдельном процессе,
+и рабочему процессу не нужно тянуть aiogram и psutil.
+"""
+import math
+import struct
+import zlib
+from typing import Optional, Sequence, Tuple
+
+# Индексы палитры
+BG, GRID, BAND, LINE, TEXT = range(5)
+PALETTE = bytes((
+    255, 255, 255,  # фон
+    226, 230, 236,  # сетка
+    196, 218, 246,  # полоса min–max
+    37, 99, 235,    # линия среднего
+    55, 65, 81,     # подписи
+))
+
+# Шрифт 3×5: строка — пиксели слева направо, «#» — закрашено
+_FONT = {
+    "0": ("###", "#.#", "#.#", "#.#", "###"),
+    "1": (".#.", "##.", ".#.", ".#.", "###"),
+    "2": ("###", "..#", "###", "#..", "###"),
+    "3": ("###", "..#", ".##", "..#", "###"),
+    "4": ("#.#", "#.#", "###", "..#", "..#"),
+    "5": ("###", "#..", "###", "..#", "###"),
+    "6": ("###", "#..", "###", "#.#", "###"),
+    "7": ("###", "..#", ".#.", ".#.", ".#."),
+    "8": ("###", "#.#", "###", "#.#", "###"),
+    "9": ("###", "#.#", "###", "..#", "###"),
+    ".": ("...", "...", "...", "...", ".#."),
+    ":": ("...", ".#.", "...", ".#.", "..."),
+    "-": ("...", "...", "###", "...", "..."),
+    "/": ("..#", "..#", ".#.", "#..", "#.."),
+    "%": ("#.#", "..#", ".#.", "#..", "#.#"),
+    "K": ("#.#", "#.#", "##.", "#.#", "#.#"),
+    "M": ("#.#", "###", "###", "#.#", "#.#"),
+    "G": ("###", "#..", "#.#", "#.#", "###"),
+    "B": ("##.", "#.#", "##.", "#.#", "##."),
+    "s": ("...", ".##", ".#.", "..#", "##."),
+    " ": ("...", "...", "...", "...", "..."),
+}
+_SCALE = 2
+_GLYPH_W = 4 * _SCALE  # с промежутком
+_GLYPH_H = 5 * _SCALE
+
+# Поля вокруг области графика (пиксели)
+_LEFT, _RIGHT, _TOP, _BOTTOM = 64, 12, 12, 28
+
+
+def encode_png(width: int, height: int, pixels: bytearray, palette: bytes = PALETTE) -> bytes:
+    """Палитровый PNG из ``pixels`` (``height`` строк по ``width`` байт)."""
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    raw = bytearray()
+    for y in range(height):
+        raw.append(0)  # фильтр None
+        raw += pixels[y * width:(y + 1) * width]
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0))
+        + chunk(b"PLTE", palette)
+        + chunk(b"IDAT", zlib.compress(bytes(raw), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+class _Canvas:
+    __slots__ = ("width", "height", "pixels")
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.pixels = bytearray(width * height)  # заполнено фоном (0)
+
+    def hline(self, x0: int, x1: int, y: int, color: int) -> None:
+        if 0 <= y < self.height:
+            x0, x1 = max(0, min(x0, x1)), min(self.width - 1, max(x0, x1))
+            start = y * self.width
+            self.pixels[start + x0:start + x1 + 1] = bytes((color,)) * (x1 - x0 + 1)
+
+    def vline(self, x: int, y0: int, y1: int, color: int) -> None:
+        if 0 <= x < self.width:
+            for y in range(max(0, min(y0, y1)), min(self.height - 1, max(y0, y1)) + 1):
+                self.pixels[y * self.width + x] = color
+
+    def line(self, x0: int, y0: int, x1: int, y1: int, color: int) -> None:
+        """Отрезок по Брезенхэму толщиной 2 пикселя."""
+        dx, dy = abs(x1 - x0), -abs(y1 - y0)
+        sx, sy = (1 if x0 < x1 else -1), (1 if y0 < y1 else -1)
+        error = dx + dy
+        width, height, pixels = self.width, self.height, self.pixels
+        while True:
+            for ox, oy in ((0, 0), (0, 1)):
+                x, y = x0 + ox, y0 + oy
+                if 0 <= x < width and 0 <= y < height:
+                    pixels[y * width + x] = color
+            if x0 == x1 and y0 == y1:
+                break
+            doubled = 2 * error
+            if doubled >= dy:
+                error += dy
+                x0 += sx
+            if doubled <= dx:
+                error += dx
+                y0 += sy
+
+    def text(self, x: int, y: int, text: str, color: int) -> None:
+        for char in text:
+            glyph = _FONT.get(char, _FONT[" "])
+            for row, bits in enumerate(glyph):
+                for column, bit in enumerate(bits):
+                    if bit == "#":
+                        for sy in range(_SCALE):
+                            self.hline(x + column * _SCALE, x + column * _SCALE + _SCALE - 1,
+                                       y + row * _SCALE + sy, color)
+            x += _GLYPH_W
+
+
+def text_width(text: str) -> int:
+    return len(text) * _GLYPH_W
+
+
+def render_chart(
+    points: Sequence[Optional[Tuple[float, float, float]]],
+    low: float,
+    high: float,
+    y_labels: Sequence[str],
+    x_labels: Sequence[str],
+    width: int = 720,
+    height: int = 320,
+) -> bytes:
+    """График: полоса min–max и линия среднего.
+
+    ``points`` — (min, среднее, max) по равным интервалам времени (пропуски —
+    ``None``), ``low``/``high`` — границы оси Y, подписи оси Y идут снизу
+    вверх, оси X — слева направо, все равномерно.
+    """
+    canvas = _Canvas(width, height)
+    left, right, top, bottom = _LEFT, width - _RIGHT, _TOP, height - _BOTTOM
+    span = (high - low) or 1.0
+
+    def y_of(value: float) -> int:
+        ratio = min(1.0, max(0.0, (value - low) / span))
+        return round(bottom - ratio * (bottom - top))
+
+    # Сетка и подписи оси Y
+    for index, label in enumerate(y_labels):
+        y = round(bottom - index * (bottom - top) / max(1, len(y_labels) - 1))
+        canvas.hline(left, right, y, GRID)
+        canvas.text(left - 6 - text_width(label), y - _GLYPH_H // 2, label, TEXT)
+    # Подписи оси X
+    for index, label in enumerate(x_labels):
+        x = round(left + index * (right - left) / max(1, len(x_labels) - 1))
+        canvas.vline(x, top, bottom, GRID)
+        x_text = min(max(0, x - text_width(label) // 2), width - text_width(label))
+        canvas.text(x_text, bottom + 8, label, TEXT)
+
+    count = len(points)
+    if count:
+        column = (right - left) / count
+        previous = None
+        for index, point in enumerate(points):
+            if point is None:
+                previous = None
+                continue
+            minimum, average, maximum = point
+            x0 = round(left + index * column)
+            x1 = max(x0, round(left + (index + 1) * column) - 1)
+            y_max, y_min = y_of(maximum), y_of(minimum)
+            for x in range(x0, x1 + 1):
+                canvas.vline(x, y_max, y_min, BAND)
+            current = (round(left + (index + 0.5) * column), y_of(average))
+            if previous is not None:
+                canvas.line(previous[0], previous[1], current[0], current[1], LINE)
+            else:
+                canvas.hline(x0, x1, current[1], LINE)
+            previous = current
+
+    return encode_png(width, height, canvas.pixels)
+
+
+def nice_ceiling(value: float) -> float:
+    """Ближайшее сверху «круглое» число (1, 2, 2.5, 5 × 10^n)."""
+    if value <= 0:
+        return 1.0
+    magnitude = 10 ** math.floor(math.log10(value))
+    return next(factor * magnitude for factor in (1, 2, 2.5, 5, 10) if factor * magnitude >= value)
+
@@ -0,0 +1,330 @@
+"""
+Таблица процессов.
+
+Объекты ``psutil.Process`` хранятся между проходами по ключу
+(pid, create_time), поэтому ``cpu_percent`` считается по разнице с прошлым
+проходом и отражает реальную загрузку. Топ-K выбирается через heapq без
+полной сортировки списка.
+
+На Linux по умолчанию используется быстрый обход /proc (utils.procfs),
+на остальных системах — psutil.
+"""
+import asyncio
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+from config import PROCESS_SCAN_INTERVAL, PROC_FASTPATH
+from utils.perf import timed
+from utils.procfs import CLOCK_TICKS, PAGE_SIZE, PROC_STATES, is_available, scan_proc
+
+logger = logging.getLogger(__name__)
+
+# started — время старта (тики с загрузки для /proc, create_time для psutil):
+# вместе с pid однозначно определяет процесс
+ProcessRow = namedtuple("ProcessRow", "pid ppid name status cpu_percent memory_percent rss started")
+
+# Сводка по приложению: ключ группы, подпись, число процессов, суммы CPU%, памяти и RSS
+AppGroup = namedtuple("AppGroup", "key label count cpu_percent memory_percent rss")
+
+GROUP_MODES = ("name", "exe", "tree")
+
+_SORT_KEYS = {
+    "cpu": lambda row: row.cpu_percent,
+    "memory": lambda row: row.memory_percent,
+}
+
+_GROUP_SORT_KEYS = {
+    "cpu": lambda group: group[3],
+    "memory": lambda group: group[5],
+}
+
+
+class ProcessTable:
+    """Постоянная таблица процессов с инкрементальным обновлением."""
+
+    def __init__(
+        self,
+        interval: float = PROCESS_SCAN_INTERVAL,
+        fastpath: Optional[bool] = None,
+        procfs_root: str = "/proc",
+    ):
+        self.interval = interval
+        self.procfs_root = procfs_root
+        if fastpath is None:
+            fastpath = PROC_FASTPATH in ("1", "true", "yes") or (
+                PROC_FASTPATH == "auto" and is_available(procfs_root)
+            )
+        self.fastpath = fastpath
+        self._procs: Dict[Tuple[int, float], psutil.Process] = {}
+        # Для быстрого обхода: (pid, starttime) → utime+stime прошлого прохода
+        self._ticks: Dict[Tuple[int, int], int] = {}
+        self._ticks_time: Optional[float] = None
+        self._rows: List[ProcessRow] = []
+        # PID → строка последнего прохода; строится вместе с _rows
+        self._by_pid: Dict[int, ProcessRow] = {}
+        # (pid, started) → путь к исполняемому файлу; читается один раз на процесс
+        self._exes: Dict[Tuple[int, float], str] = {}
+        self._updated = False
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def rows(self) -> List[ProcessRow]:
+        """Строки последнего прохода (список заменяется целиком)."""
+        return self._rows
+
+    @timed("collector.process_table")
+    def update(self) -> None:
+        """Пройти по процессам: добавить новые, убрать завершившиеся."""
+        with self._lock:
+            if self.fastpath:
+                self._update_procfs()
+            else:
+                self._update_psutil()
+            self._updated = True
+
+    def _update_procfs(self) -> None:
+        scan = scan_proc(self.procfs_root)
+        now = time.monotonic()
+        total_memory = psutil.virtual_memory().total
+        previous = self._ticks
+        elapsed = now - self._ticks_time if self._ticks_time is not None else 0.0
+        ticks_by_key: Dict[Tuple[int, int], int] = {}
+        rows: List[ProcessRow] = []
+
+        for pid, ppid, ticks, rss_pages, starttime, state, comm in zip(
+            scan.pids, scan.ppids, scan.ticks, scan.rss_pages, scan.starttimes, scan.states, scan.comms
+        ):
+            key = (pid, starttime)
+            ticks_by_key[key] = ticks
+            last = previous.get(key)
+            cpu_percent = 0.0
+            if last is not None and elapsed > 0:
+                cpu_percent = round((ticks - last) / CLOCK_TICKS / elapsed * 100, 1)
+            rss = rss_pages * PAGE_SIZE
+            rows.append(ProcessRow(
+                pid=pid,
+                ppid=ppid,
+                name=comm,
+                status=PROC_STATES.get(chr(state), "?"),
+                cpu_percent=cpu_percent,
+                memory_percent=rss / total_memory * 100,
+                rss=rss,
+                started=starttime,
+            ))
+
+        self._ticks = ticks_by_key
+        self._ticks_time = now
+        self._set_rows(rows)
+
+    def _update_psutil(self) -> None:
+        total_memory = psutil.virtual_memory().total
+        known = {key[0]: key for key in self._procs}
+        procs: Dict[Tuple[int, float], psutil.Process] = {}
+        rows: List[ProcessRow] = []
+
+        for pid in psutil.pids():
+            key = known.get(pid)
+            proc = self._procs.get(key) if key else None
+            try:
+                if proc is None:
+                    proc = psutil.Process(pid)
+                with proc.oneshot():
+                    create_time = proc.create_time()
+                    if key is not None and key[1] != create_time:
+                        # PID переиспользован другим процессом
+                        proc = psutil.Process(pid)
+                        create_time = proc.create_time()
+                    cpu_percent = proc.cpu_percent(interval=None)
+                    rss = proc.memory_info().rss
+                    rows.append(ProcessRow(
+                        pid=pid,
+                        ppid=proc.ppid(),
+                        name=proc.name(),
+                        status=proc.status(),
+                        cpu_percent=cpu_percent,
+                        memory_percent=rss / total_memory * 100,
+                        rss=rss,
+                        started=create_time,
+                    ))
+                procs[(pid, create_time)] = proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+
+        self._procs = procs
+        self._set_rows(rows)
+
+    def _set_rows(self, rows: List[ProcessRow]) -> None:
+        self._by_pid = {row.pid: row for row in rows}
+        self._rows = rows
+
+    def ensure_updated(self) -> None:
+        """Заполнить таблицу, если проходов ещё не было."""
+        if not self._updated:
+            self.update()
+
+    def top(self, limit: int = 15, sort_by: str = "memory", status: Optional[str] = None) -> List[dict]:
+        """Топ-K процессов по CPU или памяти (heapq, без полной сортировки)."""
+        self.ensure_updated()
+        rows = self._rows
+        if status is not None:
+            rows = (row for row in rows if row.status == status)
+        key = _SORT_KEYS.get(sort_by, _SORT_KEYS["memory"])
+        return [row._asdict() for row in heapq.nlargest(limit, rows, key=key)]
+
+    def groups(self, by: str = "name", limit: int = 15, sort_by: str = "memory") -> List[dict]:
+        """Топ приложений: процессы, сгруппированные по имени, исполняемому
+        файлу или дереву (рабочие процессы — под своим мастером).
+
+        Один линейный проход со словарём-накопителем, затем heapq.
+        """
+        self.ensure_updated()
+        rows = self._rows
+        if by == "tree":
+            roots = _tree_roots(rows)
+            keys = (roots[row.pid] for row in rows)
+        elif by == "exe":
+            keys = self._exe_keys(rows)
+        else:
+            keys = (row.name for row in rows)
+
+        # ключ → [ключ, подпись, число, CPU%, память %, RSS]
+        totals: Dict[object, list] = {}
+        for key, row in zip(keys, rows):
+            group = totals.get(key)
+            if group is None:
+                totals[key] = [key, row.name, 1, row.cpu_percent, row.memory_percent, row.rss]
+            else:
+                group[2] += 1
+                group[3] += row.cpu_percent
+                group[4] += row.memory_percent
+                group[5] += row.rss
+
+        if by == "exe":
+            for group in totals.values():
+                group[1] = group[0]
+        elif by == "tree":
+            for group in totals.values():
+                group[1] = f"{group[1]} ({group[0]})"
+
+        top = heapq.nlargest(limit, totals.values(), key=_GROUP_SORT_KEYS.get(sort_by, _GROUP_SORT_KEYS["memory"]))
+        return [AppGroup(*group)._asdict() for group in top]
+
+    def _exe_keys(self, rows: List[ProcessRow]) -> List[str]:
+        """Исполняемые файлы процессов (новые читаются, известные — из кэша)."""
+        cache = self._exes
+        exes: Dict[Tuple[int, float], str] = {}
+        keys = []
+        for row in rows:
+            key = (row.pid, row.started)
+            exe = cache.get(key)
+            if exe is None:
+                exe = self._read_exe(row.pid) or f"[{row.name}]"
+            exes[key] = exe
+            keys.append(exe)
+        # Кэш заменяется целиком: завершившиеся процессы в него не попадают
+        self._exes = exes
+        return keys
+
+    def _read_exe(self, pid: int) -> Optional[str]:
+        try:
+            if self.fastpath:
+                exe = os.readlink(f"{self.procfs_root}/{pid}/exe")
+            else:
+                exe = psutil.Process(pid).exe()
+        except (OSError, psutil.Error):
+            # Потоки ядра и чужие процессы без прав
+            return None
+        return exe[:-10] if exe.endswith(" (deleted)") else exe or None
+
+    def find(self, pid: int, create_time: Optional[float] = None) -> Optional[ProcessRow]:
+        """Строка процесса по PID из последнего прохода.
+
+        С ``create_time`` (как у psutil) строка отдаётся, только если это тот же
+        процесс, а не прежний владелец переиспользованного PID.
+        """
+        row = self._by_pid.get(pid)
+        if row is None or create_time is None:
+            return row
+        if self.fastpath:
+            # В /proc время старта — тики с загрузки системы
+            started = round((create_time - psutil.boot_time()) * CLOCK_TICKS)
+            return row if abs(row.started - started) <= 1 else None
+        return row if row.started == create_time else None
+
+    def search(self, name: str, limit: int = 10) -> List[ProcessRow]:
+        """Процессы по имени: сначала точные совпадения, затем по подстроке."""
+        needle = name.lower()
+        exact = [row for row in self._rows if row.name.lower() == needle]
+        if exact:
+            return exact[:limit]
+        return [row for row in self._rows if needle in row.name.lower()][:limit]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def start(self) -> None:
+        """Запустить периодическое обновление таблицы."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="process-table")
+
+    async def stop(self) -> None:
+        """Остановить периодическое обновление."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        # Импорт здесь: stats импортирует этот модуль
+        from utils.stats import run_collector
+
+        while True:
+            try:
+                await run_collector(self.update)
+            except asyncio.TimeoutError:
+                logger.warning("⏳ Обход процессов не уложился в таймаут")
+            except Exception:
+                logger.exception("Ошибка обхода процессов")
+            await asyncio.sleep(self.interval)
+
+
+def _tree_roots(rows: List[ProcessRow]) -> Dict[int, int]:
+    """PID → PID мастера: ближайший сверху предок, чей родитель называется иначе.
+
+    Пройденные цепочки запоминаются, поэтому каждый процесс посещается
+    константное число раз.
+    """
+    by_pid = {row.pid: row for row in rows}
+    roots: Dict[int, int] = {}
+    for row in rows:
+        path = []
+        current = row
+        while True:
+            root = roots.get(current.pid)
+            if root is not None:
+                break
+            parent = by_pid.get(current.ppid)
+            if parent is None or parent.pid == current.pid or parent.name != current.name:
+                root = current.pid
+                break
+            path.append(current.pid)
+            current = parent
+        roots[current.pid] = root
+        for pid in path:
+            roots[pid] = root
+    return roots
+
+
+process_table = ProcessTable()
@@ -0,0 +1,83 @@
+"""
+Быстрый обход процессов через /proc (только Linux).
+
+Для каждого процесса читается один файл ``/proc/<pid>/stat``: в нём уже
+есть имя, состояние, родитель, utime+stime, время старта и RSS. Результат
+складывается в параллельные массивы без создания объектов на процесс.
+"""
+import os
+import sys
+from array import array
+from collections import namedtuple
+
+ProcScan = namedtuple("ProcScan", "pids ppids ticks rss_pages starttimes states comms")
+
+# Коды состояний из /proc/<pid>/stat в обозначениях psutil
+PROC_STATES = {
+    "R": "running",
+    "S": "sleeping",
+    "D": "disk-sleep",
+    "Z": "zombie",
+    "T": "stopped",
+    "t": "tracing-stop",
+    "X": "dead",
+    "x": "dead",
+    "I": "idle",
+    "P": "parked",
+    "W": "waking",
+    "K": "wake-kill",
+}
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def is_available(root: str = "/proc") -> bool:
+    """Доступен ли быстрый обход на этой системе."""
+    return sys.platform.startswith("linux") and os.path.exists(os.path.join(root, "self", "stat"))
+
+
+def scan_proc(root: str = "/proc") -> ProcScan:
+    """Прочитать ``stat`` всех процессов в параллельные массивы."""
+    pids = array("i")
+    ppids = array("i")
+    ticks = array("Q")
+    rss_pages = array("q")
+    starttimes = array("Q")
+    states = bytearray()
+    comms = []
+
+    for entry in os.listdir(root):
+        if not entry.isdigit():
+            continue
+        try:
+            fd = os.open(f"{root}/{entry}/stat", os.O_RDONLY)
+        except OSError:
+            # Процесс завершился между listdir и open
+            continue
+        try:
+            data = os.read(fd, 4096)
+        except OSError:
+            continue
+        finally:
+            os.close(fd)
+
+        # Имя в скобках может содержать пробелы и скобки — ищем последнюю
+        open_paren = data.find(b"(")
+        close_paren = data.rfind(b")")
+        if open_paren < 0 or close_paren < 0:
+            continue
+        fields = data[close_paren + 2:].split(b" ", 22)
+        if len(fields) < 22:
+            continue
+
+        pids.append(int(entry))
+        # Поля после имени: [0] state, [1] ppid, [11] utime, [12] stime, [19] starttime, [21] rss
+        ppids.append(int(fields[1]))
+        ticks.append(int(fields[11]) + int(fields[12]))
+        starttimes.append(int(fields[19]))
+        rss_pages.append(int(fields[21]))
+        states += fields[0][:1]
+        comms.append(data[open_paren + 1:close_paren].decode("utf-8", "replace"))
+
+    return ProcScan(pids, ppids, ticks, rss_pages, starttimes, bytes(states), comms)
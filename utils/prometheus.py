@@ -0,0 +1,196 @@
+"""
+Экспорт метрик в текстовом формате Prometheus.
+
+Эндпоинт /metrics ничего не собирает сам: значения берутся из последнего
+снимка ``sampler``, кэша дисков и таблицы процессов. Строки HELP/TYPE и
+префиксы «имя{метки} » кодируются в байты один раз, а готовое тело ответа
+переиспользуется, пока не появится новый снимок.
+"""
+import asyncio
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from config import METRICS_LISTEN
+from utils.processes import process_table
+from utils.sampler import Snapshot, sampler
+from utils.stats import stats_cache
+from utils.web import make_site
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+GB = 1024**3
+MB = 1024**2
+
+# Имя → (тип, описание)
+METRICS: Dict[str, Tuple[str, str]] = {
+    "server_stat_cpu_usage_percent": ("gauge", "CPU usage in percent"),
+    "server_stat_cpu_frequency_mhz": ("gauge", "Current CPU frequency"),
+    "server_stat_memory_total_bytes": ("gauge", "Total physical memory"),
+    "server_stat_memory_available_bytes": ("gauge", "Available physical memory"),
+    "server_stat_memory_used_bytes": ("gauge", "Used physical memory"),
+    "server_stat_swap_total_bytes": ("gauge", "Total swap"),
+    "server_stat_swap_used_bytes": ("gauge", "Used swap"),
+    "server_stat_filesystem_size_bytes": ("gauge", "Filesystem size"),
+    "server_stat_filesystem_free_bytes": ("gauge", "Filesystem free space"),
+    "server_stat_filesystem_usage_percent": ("gauge", "Filesystem usage in percent"),
+    "server_stat_filesystem_responding": ("gauge", "1 if statvfs answered within the timeout"),
+    "server_stat_disk_read_bytes_per_second": ("gauge", "Disk read throughput"),
+    "server_stat_disk_written_bytes_per_second": ("gauge", "Disk write throughput"),
+    "server_stat_network_transmit_bytes_total": ("counter", "Bytes sent by all interfaces"),
+    "server_stat_network_receive_bytes_total": ("counter", "Bytes received by all interfaces"),
+    "server_stat_network_transmit_bytes_per_second": ("gauge", "Interface transmit throughput"),
+    "server_stat_network_receive_bytes_per_second": ("gauge", "Interface receive throughput"),
+    "server_stat_processes": ("gauge", "Number of processes by state"),
+    "server_stat_boot_time_seconds": ("gauge", "System boot time, unix timestamp"),
+    "server_stat_snapshot_timestamp_seconds": ("gauge", "Time of the snapshot being exported"),
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class PrometheusExporter:
+    """Рендер /metrics с кэшем закодированных префиксов и тела ответа."""
+
+    def __init__(self):
+        self._headers: Dict[str, bytes] = {
+            name: f"# HELP {name} {help_text}\n# TYPE {name} {kind}\n".encode()
+            for name, (kind, help_text) in METRICS.items()
+        }
+        self._prefixes: Dict[Tuple[str, tuple], bytes] = {}
+        self._cached: Optional[Tuple[tuple, bytes]] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _prefix(self, name: str, labels: tuple) -> bytes:
+        key = (name, labels)
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            if labels:
+                pairs = ",".join(f'{label}="{_escape(str(value))}"' for label, value in labels)
+                prefix = f"{name}{{{pairs}}} ".encode()
+            else:
+                prefix = f"{name} ".encode()
+            self._prefixes[key] = prefix
+        return prefix
+
+    def render(self, snapshot: Snapshot, disks: list, process_rows: list) -> bytes:
+        """Собрать тело ответа из снимка."""
+        samples: Dict[str, List[Tuple[tuple, float]]] = {name: [] for name in METRICS}
+
+        def add(name: str, value, labels: tuple = ()) -> None:
+            samples[name].append((labels, value))
+
+        add("server_stat_cpu_usage_percent", snapshot.cpu["percent"])
+        try:
+            add("server_stat_cpu_frequency_mhz", float(snapshot.cpu["freq_current"]))
+        except (TypeError, ValueError):
+            pass
+        ram, swap = snapshot.ram, snapshot.swap
+        add("server_stat_memory_total_bytes", ram["total"] * GB)
+        add("server_stat_memory_available_bytes", ram["available"] * GB)
+        add("server_stat_memory_used_bytes", ram["used"] * GB)
+        add("server_stat_swap_total_bytes", swap["total"] * GB)
+        add("server_stat_swap_used_bytes", swap["used"] * GB)
+
+        for disk in disks:
+            labels = (("mountpoint", disk["mountpoint"]), ("device", disk["device"]), ("fstype", disk["fstype"]))
+            ok = disk.get("status") == "ok"
+            add("server_stat_filesystem_responding", 1 if ok else 0, labels)
+            if ok:
+                add("server_stat_filesystem_size_bytes", disk["total"] * GB, labels)
+                add("server_stat_filesystem_free_bytes", disk["free"] * GB, labels)
+                add("server_stat_filesystem_usage_percent", disk["percent"], labels)
+
+        for device, io in snapshot.disk_io.items():
+            labels = (("device", device),)
+            add("server_stat_disk_read_bytes_per_second", io["read_bytes"], labels)
+            add("server_stat_disk_written_bytes_per_second", io["write_bytes"], labels)
+
+        network = snapshot.network
+        add("server_stat_network_transmit_bytes_total", round(network["bytes_sent"] * MB))
+        add("server_stat_network_receive_bytes_total", round(network["bytes_recv"] * MB))
+        for interface, nic in network["interfaces"].items():
+            labels = (("interface", interface),)
+            add("server_stat_network_transmit_bytes_per_second", nic["bytes_sent"], labels)
+            add("server_stat_network_receive_bytes_per_second", nic["bytes_recv"], labels)
+
+        for state, count in sorted(Counter(row.status for row in process_rows).items()):
+            add("server_stat_processes", count, (("state", state),))
+
+        add("server_stat_boot_time_seconds", snapshot.system["boot_time"])
+        add("server_stat_snapshot_timestamp_seconds", snapshot.timestamp)
+
+        parts = []
+        for name, values in samples.items():
+            if not values:
+                continue
+            parts.append(self._headers[name])
+            for labels, value in values:
+                parts.append(self._prefix(name, labels))
+                parts.append(repr(value).encode() if isinstance(value, float) else b"%d" % value)
+                parts.append(b"\n")
+        return b"".join(parts)
+
+    def body(self) -> Optional[bytes]:
+        """Тело ответа для последнего снимка (кэшируется до следующего)."""
+        snapshot = sampler.latest
+        if snapshot is None:
+            return None
+        disks = stats_cache.peek("disk") or []
+        rows = process_table.rows
+        key = (snapshot.timestamp, id(disks), id(rows))
+        if self._cached is None or self._cached[0] != key:
+            self._cached = (key, self.render(snapshot, disks, rows))
+        return self._cached[1]
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        body = self.body()
+        if body is None:
+            raise web.HTTPServiceUnavailable(text="no snapshot yet")
+        return web.Response(body=body, headers={"Content-Type": CONTENT_TYPE})
+
+    async def start(self, listen: str = METRICS_LISTEN) -> None:
+        """Поднять HTTP-эндпоинт и фоновое обновление данных по дискам."""
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await make_site(self._runner, listen).start()
+        self.start_refresh()
+        logger.info(f"📡 Метрики Prometheus: {listen}/metrics")
+
+    def start_refresh(self, interval: float = 30) -> None:
+        """Только фоновое обновление дисков — когда /metrics отдаёт чужой сервер (агент)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_disks(interval), name="metrics-disks")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _refresh_disks(self, interval: float = 30) -> None:
+        # Диски собираются в фоне с кэшем stats_cache, а не на каждый запрос
+        while True:
+            try:
+                await stats_cache.get("disk")
+            except asyncio.TimeoutError:
+                logger.warning("⏳ Обновление дисков для /metrics не уложилось в таймаут")
+            await asyncio.sleep(interval)
+
+
+exporter = PrometheusExporter()
@@ -0,0 +1,162 @@
+"""
+Фоновый сборщик метрик.
+
+Сборщик работает как отдельная asyncio-задача: с фиксированным интервалом
+снимает дешёвые счётчики (CPU, RAM, сеть, ввод-вывод дисков, система) и публикует последний
+неизменяемый снимок. Обработчики читают готовый снимок и не ждут psutil.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, List, Mapping, Optional
+
+import psutil
+
+from config import SAMPLER_INTERVAL
+from utils.perf import timed
+from utils.stats import (
+    cpu_busy_percent,
+    get_cpu_stats,
+    get_ram_stats,
+    get_swap_stats,
+    get_mount_usage,
+    get_disk_io_stats,
+    get_network_stats,
+    get_system_info,
+    run_collector,
+    stats_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _freeze(value: Optional[dict]) -> Optional[Mapping]:
+    return MappingProxyType(value) if value is not None else None
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Неизменяемый снимок метрик."""
+
+    timestamp: float
+    cpu: Mapping
+    ram: Mapping
+    swap: Mapping
+    root_disk: Optional[Mapping]
+    disk_io: Mapping
+    network: Mapping
+    system: Mapping
+
+
+class Sampler:
+    """Периодический сборщик метрик с публикацией последнего снимка."""
+
+    def __init__(self, interval: float = SAMPLER_INTERVAL):
+        self.interval = interval
+        self._latest: Optional[Snapshot] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[Snapshot], None]] = []
+        # Прошлый замер cpu_times(): загрузка CPU — разница с ним. Считаем сами,
+        # а не cpu_percent(None): у psutil база своя в каждом потоке
+        self._cpu_times = None
+
+    @property
+    def latest(self) -> Optional[Snapshot]:
+        """Последний опубликованный снимок (None до первого замера)."""
+        return self._latest
+
+    def subscribe(self, listener: Callable[[Snapshot], None]) -> None:
+        """Вызывать ``listener(snapshot)`` на каждом шаге (в event loop).
+
+        Слушатель должен быть дешёвым: он выполняется синхронно.
+        """
+        self._listeners.append(listener)
+
+    @timed("collector.sampler")
+    def sample(self) -> Snapshot:
+        """Снять метрики без блокировки (CPU — разница с прошлым замером)."""
+        cpu_times = psutil.cpu_times()
+        cpu_percent = cpu_busy_percent(self._cpu_times, cpu_times)
+        self._cpu_times = cpu_times
+        return Snapshot(
+            timestamp=time.time(),
+            cpu=MappingProxyType(get_cpu_stats(percent=cpu_percent)),
+            ram=MappingProxyType(get_ram_stats()),
+            swap=MappingProxyType(get_swap_stats()),
+            root_disk=_freeze(get_mount_usage("/")),
+            disk_io=MappingProxyType(get_disk_io_stats()),
+            network=MappingProxyType(get_network_stats()),
+            system=MappingProxyType(get_system_info()),
+        )
+
+    def start(self) -> None:
+        """Запустить фоновую задачу сбора."""
+        if self._task is not None:
+            return
+        self._ready = asyncio.Event()
+        # База для первой дельты CPU
+        self._cpu_times = psutil.cpu_times()
+        self._task = asyncio.create_task(self._run(), name="stats-sampler")
+        logger.info(f"📈 Сборщик метрик запущен (интервал {self.interval} с)")
+
+    async def stop(self) -> None:
+        """Остановить фоновую задачу сбора."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def wait_latest(self) -> Snapshot:
+        """Вернуть последний снимок, дождавшись первого замера при старте."""
+        if self._latest is None:
+            if self._ready is None:
+                # Сборщик не запущен — снимаем метрики по требованию
+                return await run_collector(self.sample)
+            await self._ready.wait()
+        return self._latest
+
+    def _publish(self, snapshot: Snapshot) -> None:
+        self._latest = snapshot
+        # Свежие значения сразу доступны обработчикам через кэш
+        stats_cache.put("cpu", snapshot.cpu)
+        stats_cache.put("ram", snapshot.ram)
+        stats_cache.put("network", snapshot.network)
+        stats_cache.put("disk_io", snapshot.disk_io)
+        stats_cache.put("system", snapshot.system)
+        self._ready.set()
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception:
+                logger.exception("Ошибка обработчика снимка метрик")
+
+    async def _run(self) -> None:
+        # Небольшая пауза, чтобы первая дельта CPU была осмысленной
+        await asyncio.sleep(min(self.interval, 0.5))
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            try:
+                self._publish(await run_collector(self.sample))
+            except asyncio.TimeoutError:
+                logger.warning("⏳ Фоновый сбор метрик не уложился в таймаут")
+            except Exception:
+                logger.exception("Ошибка фонового сбора метрик")
+
+            # Держим ровный шаг независимо от времени сбора
+            next_tick += self.interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+
+sampler = Sampler()
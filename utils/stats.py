@@ -1,28 +1,190 @@
 """
 Модуль сбора статистики сервера.
 """
+import asyncio
 import psutil
-import platform
+import queue
 import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import timedelta
+from functools import partial
+from typing import Callable, Dict, Optional, Tuple
 
+from config import (
+    SAMPLER_INTERVAL,
+    COLLECTOR_WORKERS,
+    COLLECTOR_TIMEOUT,
+    MOUNT_WORKERS,
+    MOUNT_TIMEOUT,
+    MOUNT_FAILURES,
+    MOUNT_COOLDOWN,
+)
+from utils.processes import GROUP_MODES, process_table
+from utils.cgroups import cgroup_table
+from utils.network import network_rates, total_rates
+from utils.disks import mount_table, disk_io_rates
+from utils.hostfacts import host_facts
+from utils.perf import timed
 
-def get_cpu_stats() -> dict:
-    """Получить статистику CPU."""
-    cpu_percent = psutil.cpu_percent(interval=1)
+
+class _DaemonPool:
+    """Минимальный пул daemon-потоков.
+
+    В отличие от ThreadPoolExecutor его потоки не ждут при завершении
+    интерпретатора, поэтому зависший statvfs не мешает остановить бота.
+    """
+
+    def __init__(self, workers: int, name: str):
+        self._workers = workers
+        self._name = name
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._started = False
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable, *args) -> Future:
+        if not self._started:
+            self._start()
+        future: Future = Future()
+        self._queue.put((future, func, args))
+        return future
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            for i in range(self._workers):
+                threading.Thread(target=self._worker, name=f"{self._name}_{i}", daemon=True).start()
+            self._started = True
+
+    def _worker(self) -> None:
+        while True:
+            future, func, args = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args))
+            except BaseException as exc:
+                future.set_exception(exc)
+
+
+# Сборщики выполняются вне event loop в ограниченном пуле потоков.
+# Для statvfs отдельный пул: зависшая точка монтирования занимает
+# поток навсегда и не должна отнимать потоки у остальных сборщиков.
+collector_executor = ThreadPoolExecutor(max_workers=COLLECTOR_WORKERS, thread_name_prefix="collector")
+_mount_executor = _DaemonPool(MOUNT_WORKERS, "statvfs")
+
+
+async def run_collector(collector: Callable, timeout: float = COLLECTOR_TIMEOUT):
+    """Выполнить сборщик в пуле потоков с таймаутом.
+
+    При превышении таймаута выбрасывает ``asyncio.TimeoutError``;
+    сам поток продолжит работу, но event loop больше его не ждёт.
+    """
+    loop = asyncio.get_running_loop()
+    return await asyncio.wait_for(loop.run_in_executor(collector_executor, collector), timeout)
+
+
+class MountCircuitBreaker:
+    """Предохранитель для точек монтирования.
+
+    После ``threshold`` таймаутов подряд точка монтирования пропускается
+    на ``cooldown`` секунд, затем делается новая попытка.
+    """
+
+    def __init__(self, threshold: int = MOUNT_FAILURES, cooldown: float = MOUNT_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures: Dict[str, int] = {}
+        self._open_until: Dict[str, float] = {}
+
+    def is_open(self, mountpoint: str) -> bool:
+        """Пропускать ли точку монтирования сейчас."""
+        until = self._open_until.get(mountpoint)
+        if until is None:
+            return False
+        if time.monotonic() >= until:
+            # Время охлаждения вышло — даём ещё одну попытку
+            del self._open_until[mountpoint]
+            self._failures[mountpoint] = self.threshold - 1
+            return False
+        return True
+
+    def record_success(self, mountpoint: str) -> None:
+        self._failures.pop(mountpoint, None)
+
+    def record_timeout(self, mountpoint: str) -> None:
+        failures = self._failures.get(mountpoint, 0) + 1
+        self._failures[mountpoint] = failures
+        if failures >= self.threshold:
+            self._open_until[mountpoint] = time.monotonic() + self.cooldown
+
+
+mount_breaker = MountCircuitBreaker()
+
+# Незавершённые вызовы statvfs: на одну точку монтирования не больше одного
+_pending_mounts: Dict[str, Future] = {}
+
+
+def cpu_busy_percent(before, after) -> float:
+    """Загрузка CPU между двумя замерами ``psutil.cpu_times()`` (как у psutil).
+
+    Без первого замера — средняя загрузка с момента загрузки системы.
+    """
+    def busy_total(times) -> Tuple[float, float]:
+        total = sum(times)
+        # guest уже учтено в user, guest_nice — в nice
+        total -= getattr(times, "guest", 0.0) + getattr(times, "guest_nice", 0.0)
+        idle = times.idle + getattr(times, "iowait", 0.0)
+        return total - idle, total
+
+    busy, total = busy_total(after)
+    if before is not None:
+        busy_before, total_before = busy_total(before)
+        busy, total = busy - busy_before, total - total_before
+    if total <= 0:
+        return 0.0
+    return round(min(100.0, max(0.0, busy / total * 100)), 1)
+
+
+@timed("collector.get_cpu_stats")
+def get_cpu_stats(interval: Optional[float] = 1, percent: Optional[float] = None) -> dict:
+    """Получить статистику CPU.
+
+    ``percent`` — уже посчитанная загрузка (фоновый сборщик считает её сам
+    по ``cpu_times()``). Иначе загрузка замеряется за ``interval`` секунд;
+    ``interval=None`` у psutil — разница с прошлым вызовом в том же потоке,
+    поэтому из пула потоков его не вызывают.
+    """
+    cpu_percent = psutil.cpu_percent(interval=interval) if percent is None else percent
     cpu_freq = psutil.cpu_freq()
-    cpu_count = psutil.cpu_count(logical=True)
-    cpu_count_physical = psutil.cpu_count(logical=False)
+    facts = host_facts.get()
 
     return {
         "percent": cpu_percent,
         "freq_current": f"{cpu_freq.current:.0f}" if cpu_freq else "N/A",
-        "freq_max": f"{cpu_freq.max:.0f}" if cpu_freq else "N/A",
-        "cores_logical": cpu_count,
-        "cores_physical": cpu_count_physical,
+        "freq_max": facts.freq_max,
+        "cores_logical": facts.cores_logical,
+        "cores_physical": facts.cores_physical,
     }
 
 
+def get_latest_cpu_stats() -> dict:
+    """CPU из последнего снимка фонового сборщика.
+
+    Принудительное обновление не пересчитывает загрузку: базу ``cpu_times``
+    ведёт только сборщик. Пока снимка нет — средняя с загрузки системы.
+    """
+    from utils.sampler import sampler
+
+    snapshot = sampler.latest
+    if snapshot is not None:
+        return snapshot.cpu
+    return get_cpu_stats(percent=cpu_busy_percent(None, psutil.cpu_times()))
+
+
+@timed("collector.get_ram_stats")
 def get_ram_stats() -> dict:
     """Получить статистику оперативной памяти."""
     ram = psutil.virtual_memory()
@@ -35,36 +197,144 @@ def get_ram_stats() -> dict:
     }
 
 
-def get_disk_stats() -> list:
-    """Получить статистику дисков."""
+@timed("collector.get_swap_stats")
+def get_swap_stats() -> dict:
+    """Получить статистику swap."""
+    swap = psutil.swap_memory()
+
+    return {
+        "total": swap.total / (1024**3),  # GB
+        "used": swap.used / (1024**3),  # GB
+        "percent": swap.percent,
+    }
+
+
+def _submit_disk_usage(mountpoint: str) -> Future:
+    """Запустить statvfs, переиспользуя ещё не завершившийся вызов."""
+    future = _pending_mounts.get(mountpoint)
+    if future is None or future.done():
+        future = _mount_executor.submit(psutil.disk_usage, mountpoint)
+        _pending_mounts[mountpoint] = future
+    return future
+
+
+def _mount_started(mountpoint: str, future: Future) -> bool:
+    """Учесть таймаут statvfs в предохранителе, только если вызов начался.
+
+    Когда все потоки заняты зависшими точками, исправные ждут в очереди —
+    их таймаут не их вина, и предохранитель на них не срабатывает.
+    """
+    if not future.running():
+        return False
+    mount_breaker.record_timeout(mountpoint)
+    return True
+
+
+@timed("collector.get_mount_usage")
+def get_mount_usage(mountpoint: str = "/", mount_timeout: float = MOUNT_TIMEOUT) -> Optional[dict]:
+    """Получить заполненность одной точки монтирования (None при таймауте)."""
+    if mount_breaker.is_open(mountpoint):
+        return None
+    future = _submit_disk_usage(mountpoint)
+    try:
+        usage = future.result(timeout=mount_timeout)
+    except FutureTimeoutError:
+        _mount_started(mountpoint, future)
+        return None
+    except OSError:
+        return None
+    mount_breaker.record_success(mountpoint)
+    return {
+        "total": usage.total / (1024**3),  # GB
+        "used": usage.used / (1024**3),  # GB
+        "free": usage.free / (1024**3),  # GB
+        "percent": usage.percent,
+    }
+
+
+@timed("collector.get_disk_stats")
+def get_disk_stats(mount_timeout: float = MOUNT_TIMEOUT) -> list:
+    """Получить статистику дисков.
+
+    Каждая точка монтирования опрашивается с таймаутом. Для зависшей
+    возвращается строка со статусом ``timeout``, для отключённой
+    предохранителем — ``skipped``, для не дождавшейся свободного потока —
+    ``queued``; остальные диски отдаются как обычно.
+    """
+    partitions = mount_table.partitions()
+    started = time.monotonic()
+
+    # Запускаем все statvfs сразу, чтобы таймауты не складывались
+    pending = []
+    for partition in partitions:
+        if mount_breaker.is_open(partition.mountpoint):
+            pending.append((partition, None))
+        else:
+            pending.append((partition, _submit_disk_usage(partition.mountpoint)))
+
     disks = []
-    for partition in psutil.disk_partitions():
+    for partition, future in pending:
+        row = {
+            "device": partition.device,
+            "mountpoint": partition.mountpoint,
+            "fstype": partition.fstype,
+        }
+        if future is None:
+            row["status"] = "skipped"
+            disks.append(row)
+            continue
+
+        remaining = max(0.0, started + mount_timeout - time.monotonic())
         try:
-            usage = psutil.disk_usage(partition.mountpoint)
-            disks.append({
-                "device": partition.device,
-                "mountpoint": partition.mountpoint,
-                "fstype": partition.fstype,
-                "total": usage.total / (1024**3),  # GB
-                "used": usage.used / (1024**3),  # GB
-                "free": usage.free / (1024**3),  # GB
-                "percent": usage.percent,
-            })
-        except PermissionError:
+            usage = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            if _mount_started(partition.mountpoint, future):
+                row["status"] = "timeout"
+            else:
+                row["status"] = "queued"
+            disks.append(row)
+            continue
+        except (PermissionError, OSError):
             continue
+
+        mount_breaker.record_success(partition.mountpoint)
+        row.update({
+            "status": "ok",
+            "total": usage.total / (1024**3),  # GB
+            "used": usage.used / (1024**3),  # GB
+            "free": usage.free / (1024**3),  # GB
+            "percent": usage.percent,
+        })
+        disks.append(row)
+
+    # Проблемные и самые заполненные точки монтирования — первыми
+    disks.sort(key=lambda disk: (disk["status"] == "ok", -disk.get("percent", 0)))
     return disks
 
 
+@timed("collector.get_disk_io_stats")
+def get_disk_io_stats() -> dict:
+    """Получить скорости ввода-вывода по дискам (по разнице с прошлым вызовом)."""
+    return disk_io_rates.update()
+
+
+@timed("collector.get_network_stats")
 def get_network_stats() -> dict:
-    """Получить статистику сети."""
+    """Получить статистику сети.
+
+    Кроме накопительных счётчиков возвращает скорости по интерфейсам
+    (``interfaces``) и их сумму (``rates``) — по разнице с прошлым вызовом.
+    """
     net_io = psutil.net_io_counters()
-    net_if_addrs = psutil.net_if_addrs()
+    interfaces = network_rates.update()
 
-    # Получаем IP адреса
+    # Получаем IP адреса отфильтрованных интерфейсов
     ip_addresses = []
-    for iface, addrs in net_if_addrs.items():
+    for iface, addrs in psutil.net_if_addrs().items():
+        if not network_rates.filter(iface):
+            continue
         for addr in addrs:
-            if addr.family == psutil.AF_LINK and addr.address:
+            if addr.family == socket.AF_INET and addr.address:
                 ip_addresses.append(f"{iface}: {addr.address}")
 
     return {
@@ -73,13 +343,16 @@ def get_network_stats() -> dict:
         "packets_sent": net_io.packets_sent,
         "packets_recv": net_io.packets_recv,
         "ip_addresses": ip_addresses,
+        "interfaces": interfaces,
+        "rates": total_rates(interfaces),
     }
 
 
+@timed("collector.get_system_info")
 def get_system_info() -> dict:
     """Получить общую информацию о системе."""
-    boot_time = psutil.boot_time()
-    uptime = timedelta(seconds=int(psutil.time.time() - boot_time))
+    facts = host_facts.get()
+    uptime = timedelta(seconds=int(time.time() - facts.boot_time))
 
     # Форматируем uptime
     uptime_str = str(uptime)
@@ -100,65 +373,141 @@ def get_system_info() -> dict:
         pass
 
     return {
-        "platform": platform.system(),
-        "hostname": socket.gethostname(),
+        "platform": facts.platform,
+        "hostname": facts.hostname,
         "uptime": uptime_str,
-        "boot_time": psutil.boot_time(),
+        "boot_time": facts.boot_time,
         "temperature": temp,
-        "cpu_count": psutil.cpu_count(logical=False),
+        "cpu_count": facts.cores_physical,
     }
 
 
 def get_top_processes(limit: int = 5) -> list:
     """Получить топ процессов по использованию CPU."""
-    processes = []
-    for proc in psutil.process_iter(["pid", "name", "cpu_percent", "memory_percent"]):
-        try:
-            pinfo = proc.info
-            if pinfo["cpu_percent"] is not None and pinfo["memory_percent"] is not None:
-                processes.append(pinfo)
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-
-    # Сортируем по CPU
-    processes.sort(key=lambda x: x["cpu_percent"] or 0, reverse=True)
-
-    return processes[:limit]
+    return process_table.top(limit=limit, sort_by="cpu")
 
 
+@timed("collector.get_all_running_processes")
 def get_all_running_processes(sort_by: str = "memory", limit: int = 15) -> list:
     """Получить список запущенных процессов, отсортированных по CPU или памяти."""
-    processes = []
-    for proc in psutil.process_iter(["pid", "name", "cpu_percent", "memory_percent", "status"]):
-        try:
-            pinfo = proc.info
-            if pinfo["status"] == psutil.STATUS_RUNNING:
-                processes.append(pinfo)
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            continue
+    return process_table.top(limit=limit, sort_by=sort_by, status=psutil.STATUS_RUNNING)
 
-    # Сортируем по выбранному параметру
-    if sort_by == "cpu":
-        processes.sort(key=lambda x: x["cpu_percent"] or 0, reverse=True)
-    else:  # memory (по умолчанию)
-        processes.sort(key=lambda x: x["memory_percent"] or 0, reverse=True)
 
-    return processes[:limit]
+@timed("collector.get_app_groups")
+def get_app_groups(by: str = "name", sort_by: str = "memory", limit: int = 15) -> list:
+    """Получить топ приложений: процессы, сгруппированные по имени, программе или дереву."""
+    return process_table.groups(by=by, limit=limit, sort_by=sort_by)
 
 
+@timed("collector.get_process_info")
 def get_process_info(pid: int) -> dict:
-    """Получить подробную информацию о процессе по PID."""
+    """Получить подробную информацию о процессе по PID.
+
+    CPU% берётся из таблицы процессов (разница между её проходами), а не
+    замером с паузой; пока таблица не видела этот процесс — None.
+    """
     try:
         proc = psutil.Process(pid)
-        return {
-            "pid": proc.pid,
-            "name": proc.name(),
-            "status": proc.status(),
-            "cpu_percent": proc.cpu_percent(interval=0.1),
-            "memory_percent": proc.memory_percent(),
-            "memory_info": proc.memory_info().rss / (1024**2),  # MB
-            "num_threads": proc.num_threads(),
-            "create_time": proc.create_time(),
-        }
-    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        with proc.oneshot():
+            row = process_table.find(pid, proc.create_time())
+            return {
+                "pid": proc.pid,
+                "name": proc.name(),
+                "status": proc.status(),
+                "cpu_percent": row.cpu_percent if row is not None else None,
+                "memory_percent": proc.memory_percent(),
+                "memory_info": proc.memory_info().rss / (1024**2),  # MB
+                "num_threads": proc.num_threads(),
+                "create_time": proc.create_time(),
+            }
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
         return None
+
+
+class StatsCache:
+    """Кэш результатов сборщиков с TTL и объединением одновременных запросов.
+
+    Параллельные вызовы ``get`` для одного сборщика ждут одного и того же
+    сбора, а не запускают свой. ``force=True`` игнорирует TTL (кнопки
+    «Обновить»), но тоже присоединяется к уже идущему сбору.
+    """
+
+    def __init__(self):
+        self._collectors: Dict[str, Tuple[Callable, float, float]] = {}
+        self._values: Dict[str, Tuple[float, object]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def register(self, name: str, collector: Callable, ttl: float, timeout: float = COLLECTOR_TIMEOUT) -> None:
+        """Зарегистрировать сборщик с временем жизни результата и таймаутом."""
+        self._collectors[name] = (collector, ttl, timeout)
+
+    def put(self, name: str, value) -> None:
+        """Положить готовое значение (например, от фонового сборщика)."""
+        self._values[name] = (time.monotonic(), value)
+
+    def peek(self, name: str):
+        """Последнее значение без проверки TTL (None, если его нет)."""
+        entry = self._values.get(name)
+        return entry[1] if entry else None
+
+    async def get(self, name: str, force: bool = False):
+        """Получить значение сборщика из кэша или собрать заново.
+
+        Если сбор не уложился в таймаут, возвращается последнее известное
+        значение; при его отсутствии выбрасывается ``asyncio.TimeoutError``.
+        """
+        collector, ttl, timeout = self._collectors[name]
+
+        if not force:
+            entry = self._values.get(name)
+            if entry and time.monotonic() - entry[0] < ttl:
+                return entry[1]
+
+        inflight = self._inflight.get(name)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[name] = future
+        try:
+            value = await run_collector(collector, timeout)
+        except asyncio.TimeoutError as exc:
+            stale = self._values.get(name)
+            if stale is not None:
+                future.set_result(stale[1])
+                return stale[1]
+            future.set_exception(exc)
+            future.exception()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Помечаем исключение полученным, даже если ждущих не было
+            future.exception()
+            raise
+        else:
+            self.put(name, value)
+            future.set_result(value)
+            return value
+        finally:
+            del self._inflight[name]
+
+    async def get_many(self, *names: str, force: bool = False) -> list:
+        """Получить несколько значений параллельно."""
+        return list(await asyncio.gather(*(self.get(name, force=force) for name in names)))
+
+
+stats_cache = StatsCache()
+stats_cache.register("cpu", get_latest_cpu_stats, ttl=SAMPLER_INTERVAL * 2)
+stats_cache.register("ram", get_ram_stats, ttl=SAMPLER_INTERVAL * 2)
+stats_cache.register("network", get_network_stats, ttl=SAMPLER_INTERVAL * 2)
+stats_cache.register("system", get_system_info, ttl=SAMPLER_INTERVAL * 2)
+stats_cache.register("disk_io", get_disk_io_stats, ttl=SAMPLER_INTERVAL * 2)
+stats_cache.register("disk", get_disk_stats, ttl=30, timeout=MOUNT_TIMEOUT + COLLECTOR_TIMEOUT)
+stats_cache.register("processes_memory", partial(get_all_running_processes, sort_by="memory", limit=15), ttl=5)
+stats_cache.register("processes_cpu", partial(get_all_running_processes, sort_by="cpu", limit=15), ttl=5)
+for _by in GROUP_MODES:
+    for _sort_by in ("memory", "cpu"):
+        stats_cache.register(f"apps_{_by}_{_sort_by}", partial(get_app_groups, by=_by, sort_by=_sort_by), ttl=5)
+stats_cache.register("cgroups_cpu", partial(cgroup_table.top, limit=15, sort_by="cpu"), ttl=5)
+stats_cache.register("cgroups_memory", partial(cgroup_table.top, limit=15, sort_by="memory"), ttl=5)
+stats_cache.register("cgroups_io", partial(cgroup_table.top, limit=15, sort_by="io"), ttl=5)
@@ -0,0 +1,266 @@
+"""
+Постоянное хранилище метрик.
+
+Файл фиксированного размера: заголовок + кольцевой буфер записей
+одинаковой длины (время + вектор метрик). Файл отображается в память
+через mmap, поэтому запись — это ``struct.pack_into`` прямо в отображение,
+а восстановление после перезапуска — чтение одного заголовка.
+
+Данные попадают в page cache сразу при записи, так что ``kill -KILL``
+их не теряет; ``flush`` раз в несколько секунд защищает от сбоя питания.
+"""
+import logging
+import math
+import mmap
+import os
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+from config import METRICS_STORE_PATH, STORE_INTERVAL, STORE_RETENTION_DAYS, STORE_FLUSH_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SMBM"
+VERSION = 1
+
+# magic, версия, число метрик, размер записи, ёмкость, позиция записи, число записей
+_HEADER = struct.Struct("<4sHHIQQQ")
+_NAMES_SIZE = 220
+HEADER_SIZE = _HEADER.size + _NAMES_SIZE + 8  # выравнивание до 264 байт
+
+# Записей за одну проверку позиции записи при чтении
+_READ_BATCH = 1024
+
+
+class MetricsStorage:
+    """Кольцевой файл метрик, отображённый в память."""
+
+    def __init__(
+        self,
+        path: Path,
+        metrics: Sequence[str],
+        capacity: int,
+        interval: float = STORE_INTERVAL,
+        flush_interval: float = STORE_FLUSH_INTERVAL,
+    ):
+        self.path = Path(path)
+        self.metrics = tuple(metrics)
+        self.capacity = capacity
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.record = struct.Struct("<d" + "f" * len(self.metrics))
+
+        self._head = 0
+        self._count = 0
+        self._mm: Optional[mmap.mmap] = None
+        self._fd: Optional[int] = None
+
+        # Значения между записями усредняются
+        self._sums: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._window_start: Optional[float] = None
+        self._last_flush = time.monotonic()
+
+    @property
+    def file_size(self) -> int:
+        return HEADER_SIZE + self.capacity * self.record.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def open(self) -> None:
+        """Открыть (или создать) файл и восстановить позицию из заголовка."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        names = ",".join(self.metrics).encode()
+        if len(names) > _NAMES_SIZE:
+            raise ValueError("Слишком много метрик для заголовка хранилища")
+
+        if self.path.exists() and not self._compatible(names):
+            backup = self.path.with_suffix(self.path.suffix + ".old")
+            logger.warning(f"⚠️ Формат {self.path} изменился, старый файл сохранён как {backup}")
+            os.replace(self.path, backup)
+
+        fresh = not self.path.exists()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fresh:
+            # Файл выделяется сразу целиком
+            os.ftruncate(self._fd, self.file_size)
+        self._mm = mmap.mmap(self._fd, self.file_size)
+
+        if fresh:
+            self._mm[_HEADER.size:_HEADER.size + len(names)] = names
+            self._write_header()
+            self._mm.flush()
+        else:
+            _, _, _, _, _, self._head, self._count = _HEADER.unpack_from(self._mm, 0)
+        logger.info(f"💽 Хранилище метрик: {self.path} ({self._count}/{self.capacity} записей)")
+
+    def _compatible(self, names: bytes) -> bool:
+        try:
+            with open(self.path, "rb") as fh:
+                raw = fh.read(HEADER_SIZE)
+            magic, version, n_metrics, record_size, capacity, _, _ = _HEADER.unpack_from(raw, 0)
+        except (OSError, struct.error):
+            return False
+        stored_names = raw[_HEADER.size:_HEADER.size + _NAMES_SIZE].rstrip(b"\0")
+        return (
+            magic == MAGIC
+            and version == VERSION
+            and n_metrics == len(self.metrics)
+            and record_size == self.record.size
+            and capacity == self.capacity
+            and stored_names == names
+            and os.path.getsize(self.path) == self.file_size
+        )
+
+    def _write_header(self) -> None:
+        _HEADER.pack_into(
+            self._mm, 0,
+            MAGIC, VERSION, len(self.metrics), self.record.size,
+            self.capacity, self._head, self._count,
+        )
+
+    def open_readonly(self) -> None:
+        """Открыть существующий файл только для чтения (выгрузка без бота)."""
+        self._fd = os.open(self.path, os.O_RDONLY)
+        self._mm = mmap.mmap(self._fd, self.file_size, access=mmap.ACCESS_READ)
+        _, _, _, _, _, self._head, self._count = _HEADER.unpack_from(self._mm, 0)
+
+    def close(self) -> None:
+        """Сбросить изменения на диск и закрыть файл."""
+        if self._mm is None:
+            return
+        self._mm.flush()
+        # Чтение копирует порции и не держит memoryview на отображение
+        self._mm.close()
+        os.close(self._fd)
+        self._mm = None
+        self._fd = None
+
+    def append(self, ts: float, values: Dict[str, float]) -> None:
+        """Записать вектор метрик; отсутствующие метрики сохраняются как NaN."""
+        offset = HEADER_SIZE + self._head * self.record.size
+        self.record.pack_into(
+            self._mm, offset, ts,
+            *(values.get(metric, math.nan) for metric in self.metrics),
+        )
+        # Заголовок обновляется после записи: оборванная запись не учитывается
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self._write_header()
+
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            self._mm.flush()
+            self._last_flush = now
+
+    def accumulate(self, ts: float, values: Dict[str, float]) -> None:
+        """Накопить значения и раз в ``interval`` записать их средние."""
+        if self._mm is None:
+            return
+        if self._window_start is None:
+            self._window_start = ts
+        for metric, value in values.items():
+            self._sums[metric] = self._sums.get(metric, 0.0) + value
+            self._counts[metric] = self._counts.get(metric, 0) + 1
+
+        if ts - self._window_start >= self.interval:
+            self.append(ts, {m: self._sums[m] / self._counts[m] for m in self._sums})
+            self._sums.clear()
+            self._counts.clear()
+            self._window_start = ts
+
+    def span(self) -> Optional[Tuple[float, float]]:
+        """Время самой старой и самой новой записи (None, если записей нет)."""
+        if self._mm is None or not self._count:
+            return None
+        return self._timestamp_at(0), self._timestamp_at(self._count - 1)
+
+    def _timestamp_at(self, position: int) -> float:
+        """Время записи по её порядковому номеру (0 — самая старая)."""
+        index = (self._head - self._count + position) % self.capacity
+        return struct.unpack_from("<d", self._mm, HEADER_SIZE + index * self.record.size)[0]
+
+    def _lower_bound(self, since: float) -> int:
+        low, high = 0, self._count
+        while low < high:
+            mid = (low + high) // 2
+            if self._timestamp_at(mid) < since:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def _overwritten(self, head: int, count: int) -> int:
+        """Сколько записей от самой старой на момент (``head``, ``count``)
+        уже перезаписано, включая ту, что может писаться прямо сейчас.
+
+        Позиция записи читается из заголовка в отображении: так её видит и
+        отдельный процесс, открывший файл только для чтения.
+        """
+        current = _HEADER.unpack_from(self._mm, 0)[5]
+        appended = (current - head) % self.capacity
+        return max(0, appended + 1 - (self.capacity - count))
+
+    def read_range(self, since: float = 0.0, until: float = math.inf) -> Iterator[Tuple[float, ...]]:
+        """Записи за интервал в хронологическом порядке: (время, *метрики).
+
+        Начало ищется двоичным поиском, далее записи копируются из
+        отображения порциями по ``_READ_BATCH``. Запись в кольцо может идти
+        параллельно: записи, перезаписанные с начала чтения, пропускаются
+        (позиция записи проверяется после копирования каждой порции).
+        """
+        if self._mm is None or not self._count:
+            return
+        head, count = self._head, self._count
+        position = self._lower_bound(since)
+        size = self.record.size
+        last = -math.inf
+
+        while position < count:
+            index = (head - count + position) % self.capacity
+            # Порция не длиннее _READ_BATCH и не через конец кольца
+            batch = min(count - position, self.capacity - index, _READ_BATCH)
+            begin = HEADER_SIZE + index * size
+            data = self._mm[begin:begin + batch * size]
+            stale = min(batch, max(0, self._overwritten(head, count) - position))
+            for row in self.record.iter_unpack(memoryview(data)[stale * size:]):
+                # Время не идёт назад и не выходит за интервал — иначе запись
+                # успели переписать (отдельный процесс пишет без общего GIL)
+                if row[0] < since or row[0] > until or row[0] < last:
+                    continue
+                last = row[0]
+                yield row
+            position += batch
+
+
+def default_capacity(interval: float = STORE_INTERVAL, retention_days: float = STORE_RETENTION_DAYS) -> int:
+    """Ёмкость кольца для заданного шага записи и срока хранения."""
+    return max(1, int(retention_days * 86400 / interval))
+
+
+def open_default_storage(metrics: Sequence[str]) -> MetricsStorage:
+    """Открыть хранилище по настройкам из конфигурации."""
+    storage = MetricsStorage(METRICS_STORE_PATH, metrics, default_capacity())
+    storage.open()
+    return storage
+
+
+def load_storage(path: Path = METRICS_STORE_PATH) -> MetricsStorage:
+    """Открыть файл хранилища только для чтения; метрики и ёмкость — из заголовка."""
+    try:
+        with open(path, "rb") as fh:
+            raw = fh.read(HEADER_SIZE)
+        magic, version, _, _, capacity, _, _ = _HEADER.unpack_from(raw, 0)
+    except struct.error:
+        raise ValueError(f"{path}: файл повреждён") from None
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: не файл хранилища метрик")
+    metrics = raw[_HEADER.size:_HEADER.size + _NAMES_SIZE].rstrip(b"\0").decode().split(",")
+    storage = MetricsStorage(path, metrics, capacity)
+    if os.path.getsize(path) != storage.file_size:
+        raise ValueError(f"{path}: размер не совпадает с заголовком")
+    storage.open_readonly()
+    return storage
@@ -0,0 +1,213 @@
+"""
+Наблюдение за выбранными процессами.
+
+Процессы из списка наблюдения опрашиваются на каждом шаге ``sampler``
+в пуле сборщиков, а не в event loop: CPU%, RSS/USS, потоки, открытые
+файлы, скорость ввода-вывода и переключения контекста. Дорогие вызовы
+(``memory_full_info`` читает smaps) выполняются один раз за шаг, результат
+хранится до следующего шага, обработчики только читают готовый замер.
+Если прошлый проход ещё идёт, шаг пропускается, а размер списка ограничен
+``WATCH_LIMIT`` — стоимость шага не растёт без предела.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import namedtuple
+from functools import partial
+from typing import Dict, List, Optional
+
+import psutil
+
+from config import WATCH_LIMIT
+from utils.perf import timed
+from utils.stats import run_collector
+
+logger = logging.getLogger(__name__)
+
+# Скорости — в секунду; None — нет данных (первый замер или нет прав)
+ProcessSample = namedtuple(
+    "ProcessSample",
+    "pid name status cpu_percent rss uss threads fds read_bps write_bps ctx_voluntary ctx_involuntary timestamp",
+)
+
+_GONE = (psutil.NoSuchProcess, psutil.ZombieProcess)
+
+
+class WatchedProcess:
+    """Процесс из списка наблюдения и его счётчики с прошлого шага."""
+
+    __slots__ = ("proc", "name", "cmdline", "username", "create_time", "counters", "sample")
+
+    def __init__(self, proc: psutil.Process):
+        with proc.oneshot():
+            self.proc = proc
+            self.name = proc.name()
+            self.create_time = proc.create_time()
+            try:
+                self.cmdline = " ".join(proc.cmdline())
+                self.username = proc.username()
+            except psutil.AccessDenied:
+                self.cmdline, self.username = "", ""
+        # (время, CPU-секунды, прочитано, записано, добровольные, вынужденные)
+        self.counters: Optional[tuple] = None
+        self.sample: Optional[ProcessSample] = None
+
+
+def _optional(call):
+    try:
+        return call()
+    except (psutil.AccessDenied, AttributeError, NotImplementedError):
+        return None
+
+
+def _rate(current, previous, elapsed: float) -> Optional[float]:
+    if current is None or previous is None or elapsed <= 0:
+        return None
+    return max(0.0, (current - previous) / elapsed)
+
+
+class ProcessWatcher:
+    """Список наблюдения и его опрос по шагам фонового сборщика."""
+
+    def __init__(self, limit: int = WATCH_LIMIT):
+        self.limit = limit
+        self._watched: Dict[int, WatchedProcess] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"ticks": 0, "skipped": 0, "gone": 0}
+
+    def __contains__(self, pid: int) -> bool:
+        return pid in self._watched
+
+    def __len__(self) -> int:
+        return len(self._watched)
+
+    def get(self, pid: int) -> Optional[WatchedProcess]:
+        return self._watched.get(pid)
+
+    def watched(self) -> List[WatchedProcess]:
+        return list(self._watched.values())
+
+    async def add(self, pid: int) -> WatchedProcess:
+        """Добавить процесс; имя и командная строка читаются вне event loop.
+
+        ``ValueError`` — список заполнен, ``psutil.Error`` — процесса нет или нет прав.
+        """
+        if pid in self._watched:
+            return self._watched[pid]
+        if len(self._watched) >= self.limit:
+            raise ValueError(f"В списке наблюдения уже {self.limit} процессов")
+        watched = await run_collector(partial(self._open, pid))
+        with self._lock:
+            self._watched[pid] = watched
+        logger.info(f"👁 Наблюдение за процессом {pid} ({watched.name})")
+        return watched
+
+    def _open(self, pid: int) -> WatchedProcess:
+        watched = WatchedProcess(psutil.Process(pid))
+        # Первый замер запоминает счётчики: скорости появятся уже на следующем шаге
+        watched.sample = self._sample_one(watched)
+        return watched
+
+    def remove(self, pid: int) -> bool:
+        with self._lock:
+            return self._watched.pop(pid, None) is not None
+
+    def on_snapshot(self, snapshot) -> None:
+        """Подписчик ``sampler``: запустить проход, если прошлый уже закончен."""
+        if not self._watched:
+            return
+        if self._task is not None and not self._task.done():
+            self.stats["skipped"] += 1
+            return
+        self._task = asyncio.create_task(self._run(), name="process-watch")
+
+    async def _run(self) -> None:
+        try:
+            await run_collector(self.sample)
+        except asyncio.TimeoutError:
+            logger.warning("⏳ Опрос наблюдаемых процессов не уложился в таймаут")
+        except Exception:
+            logger.exception("Ошибка опроса наблюдаемых процессов")
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    @timed("collector.process_watch")
+    def sample(self) -> None:
+        """Опросить все наблюдаемые процессы (в потоке сборщиков)."""
+        with self._lock:
+            watched = list(self._watched.items())
+        gone = []
+        for pid, item in watched:
+            try:
+                item.sample = self._sample_one(item)
+            except _GONE:
+                gone.append((pid, item))
+            except psutil.AccessDenied:
+                continue
+        self.stats["ticks"] += 1
+        if gone:
+            with self._lock:
+                for pid, item in gone:
+                    # За время прохода PID могли убрать и добавить заново
+                    if self._watched.get(pid) is item:
+                        del self._watched[pid]
+            self.stats["gone"] += len(gone)
+            logger.info(f"👁 Процессы завершились и убраны из наблюдения: {', '.join(str(pid) for pid, _ in gone)}")
+
+    @staticmethod
+    def _sample_one(item: WatchedProcess) -> ProcessSample:
+        proc = item.proc
+        now = time.monotonic()
+        with proc.oneshot():
+            if proc.create_time() != item.create_time:
+                # PID достался другому процессу
+                raise psutil.NoSuchProcess(proc.pid)
+            cpu_times = proc.cpu_times()
+            cpu_seconds = cpu_times.user + cpu_times.system
+            memory = _optional(proc.memory_full_info) or proc.memory_info()
+            io = _optional(proc.io_counters)
+            ctx = _optional(proc.num_ctx_switches)
+            status = proc.status()
+            threads = proc.num_threads()
+            # На Windows вместо дескрипторов файлов — handles
+            fds = _optional(getattr(proc, "num_fds", None) or proc.num_handles)
+
+        counters = (
+            now,
+            cpu_seconds,
+            io.read_bytes if io else None,
+            io.write_bytes if io else None,
+            ctx.voluntary if ctx else None,
+            ctx.involuntary if ctx else None,
+        )
+        previous = item.counters or (None,) * len(counters)
+        elapsed = now - previous[0] if previous[0] is not None else 0.0
+        item.counters = counters
+        cpu_rate = _rate(cpu_seconds, previous[1], elapsed)
+        return ProcessSample(
+            pid=proc.pid,
+            name=item.name,
+            cpu_percent=round(cpu_rate * 100, 1) if cpu_rate is not None else None,
+            rss=memory.rss,
+            uss=getattr(memory, "uss", None),
+            read_bps=_rate(counters[2], previous[2], elapsed),
+            write_bps=_rate(counters[3], previous[3], elapsed),
+            ctx_voluntary=_rate(counters[4], previous[4], elapsed),
+            ctx_involuntary=_rate(counters[5], previous[5], elapsed),
+            status=status,
+            threads=threads,
+            fds=fds,
+            timestamp=time.time(),
+        )
+
+
+process_watcher = ProcessWatcher()
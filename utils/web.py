@@ -0,0 +1,12 @@
+"""
+Общие помощники для встроенных HTTP-серверов (aiohttp).
+"""
+from aiohttp import web
+
+
+def make_site(runner: web.AppRunner, listen: str) -> web.BaseSite:
+    """Сайт aiohttp по строке адреса «host:port» или «unix:/путь»."""
+    if listen.startswith("unix:"):
+        return web.UnixSite(runner, listen[5:])
+    host, _, port = listen.rpartition(":")
+    return web.TCPSite(runner, host or "0.0.0.0", int(port))
@@ -0,0 +1,135 @@
+"""
+Приём обновлений через webhook вместо long polling.
+
+Telegram присылает обновления POST-запросами на ``WEBHOOK_PATH``; запрос
+без правильного ``X-Telegram-Bot-Api-Secret-Token`` отклоняется. Ответ
+200 уходит сразу, а обновление обрабатывается в фоне, но не больше
+``WEBHOOK_CONCURRENCY`` одновременно: когда все слоты заняты, сервер
+придерживает ответ, и Telegram сам снижает темп. При остановке новые
+обновления получают 503 (Telegram повторит их позже), а начатые
+дорабатываются в пределах ``WEBHOOK_DRAIN_TIMEOUT``.
+"""
+import asyncio
+import hmac
+import logging
+import secrets
+from typing import Optional, Set
+
+from aiogram import Bot, Dispatcher
+from aiogram.exceptions import TelegramAPIError
+from aiogram.types import Update
+from aiohttp import web
+from pydantic import ValidationError
+
+from config import (
+    WEBHOOK_CONCURRENCY,
+    WEBHOOK_DRAIN_TIMEOUT,
+    WEBHOOK_LISTEN,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
+    WEBHOOK_URL,
+)
+from utils.web import make_site
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """HTTP-приёмник обновлений с ограниченной параллельностью."""
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        path: str = WEBHOOK_PATH,
+        secret: str = WEBHOOK_SECRET,
+        concurrency: int = WEBHOOK_CONCURRENCY,
+        drain_timeout: float = WEBHOOK_DRAIN_TIMEOUT,
+    ):
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.path = path
+        # Без заданного секрета — случайный на каждый запуск (передаётся в setWebhook)
+        self.secret = secret or secrets.token_urlsafe(32)
+        self.concurrency = concurrency
+        self.drain_timeout = drain_timeout
+        self.draining = False
+        self._slots = asyncio.Semaphore(concurrency)
+        self._tasks: Set[asyncio.Task] = set()
+        self._runner: Optional[web.AppRunner] = None
+        self.stats = {"received": 0, "rejected": 0, "failed": 0}
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(self.path, self.handle_update)
+        return app
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), self.secret):
+            self.stats["rejected"] += 1
+            raise web.HTTPUnauthorized()
+        if self.draining:
+            raise web.HTTPServiceUnavailable()
+        try:
+            update = Update.model_validate(await request.json(), context={"bot": self.bot})
+        except (ValueError, ValidationError):
+            raise web.HTTPBadRequest()
+
+        # Свободный слот ждём до ответа: так Telegram видит, что мы не успеваем
+        await self._slots.acquire()
+        if self.draining:
+            self._slots.release()
+            raise web.HTTPServiceUnavailable()
+        self.stats["received"] += 1
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.Response()
+
+    async def _process(self, update: Update) -> None:
+        try:
+            await self.dispatcher.feed_update(self.bot, update)
+        except TelegramAPIError as e:
+            self.stats["failed"] += 1
+            logger.warning(f"⚠️ Обновление {update.update_id}: ошибка Bot API: {e}")
+        except Exception:
+            self.stats["failed"] += 1
+            logger.exception(f"❌ Ошибка обработки обновления {update.update_id}")
+        finally:
+            self._slots.release()
+
+    async def start(self, listen: str = WEBHOOK_LISTEN, url: str = WEBHOOK_URL) -> None:
+        """Поднять сервер и (если задан внешний адрес) зарегистрировать webhook."""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await make_site(self._runner, listen).start()
+        logger.info(f"🪝 Webhook слушает {listen}{self.path}")
+        if url:
+            await self.bot.set_webhook(
+                url.rstrip("/") + self.path,
+                secret_token=self.secret,
+                max_connections=self.concurrency,
+                allowed_updates=self.dispatcher.resolve_used_update_types(),
+            )
+            logger.info(f"🪝 Webhook зарегистрирован: {url.rstrip('/')}{self.path}")
+        else:
+            logger.warning(
+                "⚠️ WEBHOOK_URL не задан: setWebhook не вызывается (локальный режим, "
+                "для запросов вручную задайте WEBHOOK_SECRET)"
+            )
+
+    async def stop(self) -> None:
+        """Перестать принимать обновления и дождаться начатых."""
+        self.draining = True
+        if self._tasks:
+            logger.info(f"⏳ Дожидаемся обработки {len(self._tasks)} обновлений")
+            _, pending = await asyncio.wait(set(self._tasks), timeout=self.drain_timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(f"⚠️ Не дождались {len(pending)} обновлений за {self.drain_timeout} с")
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None